@@ -10,7 +10,7 @@ BASE_DIR = os.path.dirname(os.path.abspath(SPEC))
 
 a = Analysis(
     ['main.py'],
-    pathex=[BASE_DIR],
+    pathex=[BASE_DIR, os.path.join(BASE_DIR, 'src')],
     binaries=[
         ('tools/r6-dissect.exe', 'tools'),
     ],
@@ -29,6 +29,26 @@ a = Analysis(
         'markupsafe',
         'web',
         'web.app',
+        'match_catalog',
+        'rec_header',
+        'match_metadata',
+        'dissect_pool',
+        'round_cache',
+        'jobs',
+        'pipeline',
+        'aggregate_store',
+        'report_cache',
+        'result_store',
+        'report_index',
+        'replay_index',
+        'metrics',
+        'event_store',
+        'replay_watcher',
+        'report_writer',
+        'player_stats',
+        'round_loader',
+        'analyze_match_complete',
+        'batch_analyze',
     ],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,537 @@
+"""
+Benchmarks du moteur de stats, de l'ecriture Excel et des endpoints Flask
+Temps (plusieurs repetitions) et pic memoire (tracemalloc) de chaque cas,
+ecrits en JSON pour comparer deux executions
+
+Utilisation:
+    python benchmarks/run_benchmarks.py                          # echelle 'small', toutes les suites
+    python benchmarks/run_benchmarks.py --scale medium --suite engine,excel
+    python benchmarks/run_benchmarks.py --matches 50 --rounds 14 --events 80 --repeat 5
+    python benchmarks/run_benchmarks.py --suite startup           # imports au demarrage (-X importtime)
+    python benchmarks/run_benchmarks.py --compare avant.json apres.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(BASE_DIR, 'src')
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic  # noqa: E402
+
+RESULTS_VERSION = 1
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Echelles predefinies (surchargeables par --matches, --rounds, ...)
+SCALES = {
+    'small': {'matches': 3, 'rounds': 9, 'players': 10, 'events': 25, 'player_pool': 30},
+    'medium': {'matches': 20, 'rounds': 12, 'players': 10, 'events': 40, 'player_pool': 120},
+    'large': {'matches': 100, 'rounds': 14, 'players': 10, 'events': 60, 'player_pool': 1000},
+}
+
+
+class Context:
+    """Donnees partagees par les suites: saison synthetique en memoire et sur disque"""
+
+    def __init__(self, params, seed, workdir):
+        self.params = params
+        self.workdir = workdir
+        self.season = synthetic.generate_season(
+            params['matches'], params['rounds'], params['players'], params['events'],
+            params['player_pool'], seed
+        )
+        self.rounds_root = os.path.join(workdir, 'rounds')
+        self.match_dirs = [synthetic.write_match(self.rounds_root, meta, rounds_data)
+                           for meta, rounds_data in self.season]
+
+
+class Runner:
+    def __init__(self, repeat, warmup):
+        self.repeat = repeat
+        self.warmup = warmup
+        self.results = []
+        self.failures = []  # verifications echouees: le run se termine en erreur
+
+    def measure(self, suite, name, fn, setup=None, params=None, trace_memory=True, details=None):
+        """Chronometrer fn (repeat fois apres warmup), puis une execution sous tracemalloc pour le pic memoire
+
+        setup (optionnel) est appele avant chaque execution, hors chronometre.
+        trace_memory=False: pas de pic memoire (ex: fn lance un autre processus).
+        details: informations libres ajoutees au resultat.
+        Les sorties [DEBUG]/[OK] du code mesure sont masquees.
+        """
+        times = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(self.warmup + self.repeat):
+                if setup:
+                    setup()
+                t0 = time.perf_counter()
+                fn()
+                elapsed = time.perf_counter() - t0
+                if i >= self.warmup:
+                    times.append(elapsed)
+
+            peak = None
+            if trace_memory:
+                if setup:
+                    setup()
+                tracemalloc.start()
+                try:
+                    fn()
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+
+        result = {
+            'suite': suite,
+            'name': name,
+            'params': params or {},
+            'repeat': len(times),
+            'times_s': [round(t, 6) for t in times],
+            'min_s': round(min(times), 6),
+            'median_s': round(statistics.median(times), 6),
+            'mean_s': round(statistics.fmean(times), 6),
+            'peak_memory_bytes': peak,
+        }
+        if details:
+            result['details'] = details
+        self.results.append(result)
+        memory = f"   peak {peak / 1024 / 1024:8.2f} MB" if peak is not None else ''
+        print(f"  {suite:<10} {name:<40} median {result['median_s'] * 1000:10.2f} ms{memory}")
+        return result
+
+
+# -- suites ------------------------------------------------------------------
+
+def suite_engine(ctx, runner):
+    import analyze_match_complete as engine
+
+    options = engine.build_options()
+    first_dir = ctx.match_dirs[0]
+    first_rounds = ctx.season[0][1]
+    all_rounds = [rounds_data for _, rounds_data in ctx.season]
+    n_rounds = sum(len(r) for r in all_rounds)
+
+    runner.measure('engine', 'load_rounds (1 match)', lambda: engine.load_rounds(first_dir),
+                   params={'rounds': len(first_rounds)})
+    runner.measure('engine', 'build_round_record (all rounds)',
+                   lambda: [engine.build_round_record(r) for rounds in all_rounds for r in rounds],
+                   params={'rounds': n_rounds})
+    runner.measure('engine', 'compute_player_stats (1 match)', lambda: engine.compute_player_stats(first_rounds),
+                   params={'rounds': len(first_rounds)})
+    runner.measure('engine', 'analyze (each match)', lambda: [engine.analyze(r, options) for r in all_rounds],
+                   params={'matches': len(all_rounds), 'rounds': n_rounds})
+
+    def aggregate():
+        matches = [(meta['folder'], engine.compute_player_stats(rounds_data), len(rounds_data))
+                   for meta, rounds_data in ctx.season]
+        return engine.analyze_aggregate(matches, options)
+
+    runner.measure('engine', 'analyze_aggregate (season)', aggregate,
+                   params={'matches': len(all_rounds), 'rounds': n_rounds})
+
+
+def suite_excel(ctx, runner):
+    import analyze_match_complete as engine
+
+    options = engine.build_options(stats=['kills', 'kost', 'survival', 'headshots', 'opening',
+                                          'multikills', 'trades', 'clutches', 'plants', 'teamkills', 'rating'])
+    out_dir = os.path.join(ctx.workdir, 'excel')
+    os.makedirs(out_dir, exist_ok=True)
+
+    match_df = engine.analyze(ctx.season[0][1], options)['dataframe']
+    runner.measure('excel', 'write_report (1 match)',
+                   lambda: engine.write_report(match_df, os.path.join(out_dir, 'match.xlsx')),
+                   params={'rows': len(match_df), 'columns': len(match_df.columns)})
+
+    matches = [(meta['folder'], engine.compute_player_stats(rounds_data), len(rounds_data))
+               for meta, rounds_data in ctx.season]
+    result = engine.analyze_aggregate(matches, options)
+    season_df = result['dataframe']
+    runner.measure('excel', 'write_report (season, totals only)',
+                   lambda: engine.write_report(season_df, os.path.join(out_dir, 'season.xlsx')),
+                   params={'rows': len(season_df), 'columns': len(season_df.columns)})
+    runner.measure('excel', 'write_report (season + breakdown)',
+                   lambda: engine.write_report(season_df, os.path.join(out_dir, 'season_breakdown.xlsx'),
+                                               breakdown=result['breakdown']),
+                   params={'rows': len(season_df), 'sheets': 3 + len(result['breakdown'])})
+
+
+def suite_endpoints(ctx, runner):
+    """Endpoints Flask (client de test), avec un dossier de donnees temporaire
+
+    Les .rec synthetiques contiennent le JSON du round et le cache de rounds est
+    pre-rempli: r6-dissect n'est jamais lance, on mesure le chemin 'cache chaud'
+    (celui que garantit la surveillance des replays).
+    """
+    import web.app as webapp
+    from jobs import DONE
+    from match_catalog import MatchCatalog
+
+    root = os.path.join(ctx.workdir, 'web')
+    data_dir = os.path.join(root, 'data')
+    replay_path = os.path.join(root, 'MatchReplay')
+    tools_dir = os.path.join(root, 'tools')
+    for folder in (data_dir, replay_path, tools_dir):
+        os.makedirs(folder, exist_ok=True)
+
+    app = webapp.app
+    app.config.update({
+        'UPLOAD_FOLDER': os.path.join(data_dir, 'uploads'),
+        'MATCH_DATA_FOLDER': os.path.join(data_dir, 'match_data'),
+        'REPORTS_FOLDER': os.path.join(data_dir, 'reports'),
+        'RESULTS_FOLDER': os.path.join(data_dir, 'results'),
+        'ROUND_CACHE_FOLDER': os.path.join(data_dir, 'cache', 'rounds'),
+        'AGGREGATES_FOLDER': os.path.join(data_dir, 'aggregates'),
+        'REPORT_INDEX_FILE': os.path.join(data_dir, 'cache', 'reports.json'),
+        'CONFIG_FILE': os.path.join(data_dir, 'config.json'),
+        'CATALOG_FILE': os.path.join(data_dir, 'catalog.json'),
+        'EVENTS_DB': os.path.join(data_dir, 'events.db'),
+        'TOOLS_DIR': tools_dir,
+    })
+    for key in ('UPLOAD_FOLDER', 'REPORTS_FOLDER', 'RESULTS_FOLDER'):
+        os.makedirs(app.config[key], exist_ok=True)
+    webapp.match_catalog = MatchCatalog(app.config['CATALOG_FILE'])
+    with open(app.config['CONFIG_FILE'], 'w', encoding='utf-8') as f:
+        json.dump({'game_path': root, 'replay_path': replay_path}, f)
+
+    # Executable factice: seule son empreinte sert (cle du cache de rounds)
+    r6_dissect = os.path.join(tools_dir, 'r6-dissect.exe')
+    with open(r6_dissect, 'w', encoding='utf-8') as f:
+        f.write('benchmark placeholder\n')
+
+    cache = webapp.get_round_cache()
+    for meta, rounds_data in ctx.season:
+        match_dir = synthetic.write_match(replay_path, meta, rounds_data, layout='replay')
+        for rec_file, round_data in zip(sorted(os.listdir(match_dir)), rounds_data):
+            rec_path = os.path.join(match_dir, rec_file)
+            cache.put(cache.key(rec_path, r6_dissect), json.dumps(round_data).encode('utf-8'))
+
+    client = app.test_client()
+    n_matches = len(ctx.season)
+
+    def list_replays():
+        res = client.get('/api/replays')
+        assert res.status_code == 200 and len(res.get_json()['matches']) == n_matches, res.get_json()
+
+    def clear_catalog():
+        webapp.match_catalog.clear()
+        webapp.match_catalog.save()
+
+    def reset_catalog():
+        # Catalogue neuf: noms de maps inconnus, metadonnees extraites par r6-dissect (cache de rounds)
+        if os.path.exists(app.config['CATALOG_FILE']):
+            os.remove(app.config['CATALOG_FILE'])
+        webapp.match_catalog = MatchCatalog(app.config['CATALOG_FILE'])
+
+    runner.measure('endpoints', 'GET /api/replays (new catalog, r6-dissect)', list_replays, setup=reset_catalog,
+                   params={'matches': n_matches})
+    # Noms appris: les metadonnees sont lues dans l'en-tete des .rec
+    runner.measure('endpoints', 'GET /api/replays (cold catalog)', list_replays, setup=clear_catalog,
+                   params={'matches': n_matches})
+    runner.measure('endpoints', 'GET /api/replays (warm catalog)', list_replays, params={'matches': n_matches})
+
+    def replays_page(query):
+        res = client.get('/api/replays?' + query)
+        assert res.status_code == 200, res.get_json()
+
+    # Pages suivantes et changements de filtres: servis par l'index, sans re-scanner le dossier
+    runner.measure('endpoints', 'GET /api/replays?limit=50 (next page)',
+                   lambda: replays_page('limit=50&offset=50'), params={'matches': n_matches})
+    runner.measure('endpoints', 'GET /api/replays (filtered, sorted)',
+                   lambda: replays_page('refresh=0&limit=50&category=ranked&min_rounds=1&sort=map'),
+                   params={'matches': n_matches})
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        matches = client.get('/api/replays').get_json()['matches']
+
+    def run_job(payload):
+        res = client.post('/api/analyze', json=payload)
+        assert res.status_code == 202, res.get_json()
+        job_id = res.get_json()['job_id']
+        job = webapp.job_manager.get(job_id)
+        seq = 0
+        while not job.is_finished():
+            seq += len(job.events_since(seq, timeout=1))
+        assert job.status == DONE, job.error
+
+    def clear_reports():
+        # Sans son resultat, une entree du cache de rapports n'est plus servie
+        for key in ('REPORTS_FOLDER', 'RESULTS_FOLDER'):
+            for name in os.listdir(app.config[key]):
+                os.remove(os.path.join(app.config[key], name))
+
+    runner.measure('endpoints', 'POST /api/analyze (1 match, job)', lambda: run_job({'matches': matches[:1]}),
+                   setup=clear_reports)
+    runner.measure('endpoints', 'POST /api/analyze (all, per match)', lambda: run_job({'matches': matches}),
+                   setup=clear_reports, params={'matches': n_matches})
+    # Meme requete que la precedente: rapports servis par le cache de rapports
+    runner.measure('endpoints', 'POST /api/analyze (all, repeat)', lambda: run_job({'matches': matches}),
+                   params={'matches': n_matches})
+
+    def clear_aggregates():
+        clear_reports()
+        webapp.get_aggregate_store().clear()
+
+    runner.measure('endpoints', 'POST /api/analyze (aggregate, cold)',
+                   lambda: run_job({'matches': matches, 'aggregate': True}),
+                   setup=clear_aggregates, params={'matches': n_matches})
+    runner.measure('endpoints', 'POST /api/analyze (aggregate, warm)',
+                   lambda: run_job({'matches': matches, 'aggregate': True}),
+                   setup=clear_reports, params={'matches': n_matches})
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_job({'matches': matches})
+    result_name = webapp.get_result_store().list()[0]['name']
+
+    def remove_excel():
+        excel_path = webapp.get_result_store().excel_file(result_name)
+        if os.path.exists(excel_path):
+            os.remove(excel_path)
+
+    def download_excel():
+        res = client.get(f'/download/{result_name}.xlsx')
+        assert res.status_code == 200, res.status_code
+        res.close()
+
+    # L'Excel n'est ecrit qu'au premier telechargement, les suivants servent le fichier
+    runner.measure('endpoints', 'GET /download (first, writes xlsx)', download_excel, setup=remove_excel)
+    runner.measure('endpoints', 'GET /download (cached xlsx)', download_excel)
+    runner.measure('endpoints', 'GET /api/results/<name>', lambda: client.get(f'/api/results/{result_name}').get_json())
+    runner.measure('endpoints', 'GET /reports', lambda: client.get('/reports').get_json())
+
+    def revalidate_reports(etag=client.get('/reports').headers['ETag']):
+        res = client.get('/reports', headers={'If-None-Match': etag})
+        assert res.status_code == 304, res.status_code
+
+    runner.measure('endpoints', 'GET /reports (If-None-Match, 304)', revalidate_reports)
+    runner.measure('endpoints', 'GET /api/metrics', lambda: client.get('/api/metrics').get_data())
+
+    # Dossier de plusieurs milliers de rapports: premiere page seulement
+    n_reports = 2000
+    result_df, _ = webapp.get_result_store().frames(result_name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(n_reports):
+            webapp.get_result_store().save(f'{result_name}_bulk{i}', result_df)
+    runner.measure('endpoints', 'GET /reports?limit=50 (many reports)',
+                   lambda: client.get('/reports?limit=50').get_json(), params={'reports': n_reports})
+
+    player = ctx.season[0][1][0]['players'][0]['username']
+    map_name = ctx.season[0][0]['map']
+    runner.measure('endpoints', 'GET /api/events (player, map, opening)',
+                   lambda: client.get('/api/events', query_string={'player': player, 'map': map_name,
+                                                                   'type': 'Kill', 'opening': 1}).get_json())
+
+
+# Imports mesures par la suite startup (nouvel interpreteur a chaque fois), et si
+# l'import doit laisser DEFERRED_MODULES non charges
+STARTUP_IMPORTS = [
+    ('import web.app (serveur)', 'import web.app', True),
+    ('import analyze_match_complete', 'import analyze_match_complete', False),
+    ('import openpyxl', 'import openpyxl', False),
+]
+# Ne doivent pas etre charges par le demarrage du serveur (importes au premier besoin)
+DEFERRED_MODULES = ('pandas', 'numpy', 'openpyxl', 'analyze_match_complete')
+
+
+def _child_env():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([SRC_DIR, BASE_DIR] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    return env
+
+
+def importtime_report(statement, top=10):
+    """Executer statement dans un nouvel interpreteur sous -X importtime
+
+    Retourne {'total_ms', 'top': [(module, cumule ms, propre ms)], 'loaded': modules de
+    DEFERRED_MODULES presents apres l'import}.
+    """
+    code = (f"{statement}\nimport sys, json\n"
+            f"print(json.dumps([m for m in {list(DEFERRED_MODULES)!r} if m in sys.modules]))")
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=BASE_DIR, env=_child_env(),
+                          capture_output=True, text=True, check=True)
+    modules = []  # (module, cumule ms, propre ms, profondeur)
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", indentation = profondeur
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(cumulative_us) / 1000, int(self_us) / 1000, depth))
+
+    return {
+        'total_ms': round(sum(cumulative for _, cumulative, _, depth in modules if depth == 0), 1),
+        'top': [(name, round(cumulative, 1), round(own, 1))
+                for name, cumulative, own, _ in sorted(modules, key=lambda m: -m[1])[:top]],
+        'loaded': json.loads(proc.stdout.strip().splitlines()[-1]),
+    }
+
+
+def suite_startup(ctx, runner):
+    """Temps de demarrage: un interpreteur neuf par import, comme l'executable PyInstaller
+
+    Le demarrage du serveur qui charge un module de DEFERRED_MODULES fait echouer le run
+    (details.deferred_ok dans le JSON).
+    """
+    for name, statement, deferred in STARTUP_IMPORTS:
+        def run(statement=statement):
+            subprocess.run([sys.executable, '-c', statement], cwd=BASE_DIR, env=_child_env(), check=True,
+                           capture_output=True)
+
+        report = importtime_report(statement)
+        if deferred:
+            report['deferred_ok'] = not report['loaded']
+        runner.measure('startup', name, run, trace_memory=False, details=report)
+        for module, cumulative, own in report['top'][:5]:
+            print(f"      {module:<44} {cumulative:9.1f} ms (propre {own:.1f} ms)")
+        if report['loaded']:
+            print(f"      charges: {', '.join(report['loaded'])}")
+        if deferred and report['loaded']:
+            print(f"[WARNING] {statement} charge des modules differes: {', '.join(report['loaded'])}")
+            runner.failures.append(f"startup: {name} charge {', '.join(report['loaded'])}")
+
+
+SUITES = {
+    'engine': suite_engine,
+    'excel': suite_excel,
+    'endpoints': suite_endpoints,
+    'startup': suite_startup,
+}
+
+
+# -- resultats ---------------------------------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def package_versions():
+    versions = {}
+    for name in ('pandas', 'openpyxl', 'flask', 'numpy'):
+        try:
+            from importlib.metadata import version
+            versions[name] = version(name)
+        except Exception:
+            versions[name] = None
+    return versions
+
+
+def compare(base_path, new_path):
+    """Afficher le ratio des medianes (et des pics memoire) entre deux fichiers de resultats"""
+    with open(base_path, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    base_results = {(r['suite'], r['name']): r for r in base['results']}
+    print(f"Base: {base.get('git_commit')} ({base['created']})   Nouveau: {new.get('git_commit')} ({new['created']})")
+    if base.get('params') != new.get('params'):
+        print(f"[WARNING] Echelles differentes: {base.get('params')} / {new.get('params')}")
+    print(f"{'suite':<10} {'cas':<40} {'base ms':>10} {'nouveau ms':>11} {'ratio':>7} {'memoire':>8}")
+    for r in new['results']:
+        b = base_results.get((r['suite'], r['name']))
+        if b is None:
+            print(f"{r['suite']:<10} {r['name']:<40} {'-':>10} {r['median_s'] * 1000:11.2f}")
+            continue
+        ratio = r['median_s'] / b['median_s'] if b['median_s'] else float('inf')
+        mem = r['peak_memory_bytes'] / b['peak_memory_bytes'] if b['peak_memory_bytes'] else float('inf')
+        print(f"{r['suite']:<10} {r['name']:<40} {b['median_s'] * 1000:10.2f} {r['median_s'] * 1000:11.2f}"
+              f" {ratio:6.2f}x {mem:7.2f}x")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks R6 Analyst')
+    parser.add_argument('--suite', type=str, default=','.join(SUITES),
+                        help=f"Suites a executer (separees par virgule): {','.join(SUITES)}")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--matches', type=int)
+    parser.add_argument('--rounds', type=int)
+    parser.add_argument('--players', type=int, help='Joueurs par match')
+    parser.add_argument('--events', type=int, help='Entrees de matchFeedback par round')
+    parser.add_argument('--player-pool', type=int, help='Joueurs distincts sur la saison')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--output', type=str, help='Fichier JSON de resultats (defaut: benchmarks/results/bench_<date>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NOUVEAU'), help='Comparer deux fichiers de resultats')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    params = dict(SCALES[args.scale])
+    for key in ('matches', 'rounds', 'players', 'events', 'player_pool'):
+        value = getattr(args, key)
+        if value:
+            params[key] = value
+
+    suites = [s.strip() for s in args.suite.split(',') if s.strip()]
+    unknown = [s for s in suites if s not in SUITES]
+    if unknown:
+        print(f"[ERROR] Suite(s) inconnue(s): {', '.join(unknown)}")
+        return 1
+
+    print(f"[DEBUG] Echelle: {params} | repetitions: {args.repeat} | suites: {', '.join(suites)}")
+    workdir = tempfile.mkdtemp(prefix='r6bench-')
+    runner = Runner(args.repeat, args.warmup)
+    try:
+        ctx = Context(params, args.seed, workdir)
+        for suite in suites:
+            SUITES[suite](ctx, runner)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    payload = {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': package_versions(),
+        'params': params,
+        'seed': args.seed,
+        'results': runner.results,
+        'failures': runner.failures,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    if runner.failures:
+        print(f"[ERROR] Resultats ecrits dans {output}, verification(s) echouee(s): {'; '.join(runner.failures)}")
+        return 1
+    print(f"[OK] Resultats ecrits dans {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
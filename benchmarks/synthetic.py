@@ -0,0 +1,228 @@
+"""
+Generateur de rounds synthetiques au format JSON de r6-dissect
+Echelle configurable (matchs, rounds, joueurs, events) et resultat deterministe (seed)
+
+Utilisation en ligne de commande:
+    python benchmarks/synthetic.py OUTPUT_DIR --matches 20 --rounds 12 --events 40
+    python benchmarks/synthetic.py OUTPUT_DIR --layout replay   # dossiers Match-*/*.rec
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from rec_header import encode_header  # noqa: E402
+
+MAPS = [
+    ('Villa', 373), ('Clubhouse', 237), ('Oregon', 185), ('Bank', 246), ('Chalet', 265),
+    ('Kafe Dostoyevsky', 338), ('Border', 203), ('Coastline', 307), ('Consulate', 175),
+    ('Skyscraper', 229), ('Theme Park', 305), ('Nighthaven Labs', 412),
+]
+MATCH_TYPES = [('Ranked', 2), ('Unranked', 1), ('CustomGameOnline', 7)]
+OPERATORS = ['Ash', 'Thermite', 'Sledge', 'Hibana', 'Zofia', 'Ace', 'Iana', 'Buck',
+             'Jager', 'Bandit', 'Mute', 'Kaid', 'Valkyrie', 'Smoke', 'Mira', 'Azami']
+
+# Events sans effet sur les stats, ajoutes pour atteindre le volume demande
+NOISE_EVENTS = [('DefuserPlantStart', 2), ('DefuserDisableStart', 4), ('LocateObjective', 6),
+                ('OperatorSwap', 7), ('Other', 8)]
+
+ROUND_DURATION = 180
+
+
+def player_pool(size, seed=1):
+    """Noms de joueurs distincts (un rapport agrege a autant de lignes que de joueurs vus)"""
+    rng = random.Random(seed)
+    return [f"Player{i:05d}_{rng.randint(0, 99):02d}" for i in range(size)]
+
+
+def _clock(seconds):
+    return f"{int(seconds) // 60}:{int(seconds) % 60:02d}"
+
+
+def generate_round(rng, round_num, roster, map_info, match_type, timestamp, events=30):
+    """Un round au format r6-dissect: teams, players, matchFeedback (events dans l'ordre), stats
+
+    roster: noms des joueurs, la premiere moitie dans l'equipe 0.
+    events: nombre approximatif d'entrees de matchFeedback (kills + objectifs + bruit).
+    """
+    half = len(roster) // 2
+    attack_team = (round_num - 1) // 3 % 2  # changement de side tous les 3 rounds
+    teams = [
+        {'name': 'YOUR TEAM', 'score': 0, 'won': False, 'role': 'Attack' if attack_team == 0 else 'Defense'},
+        {'name': 'OPPONENTS', 'score': 0, 'won': False, 'role': 'Defense' if attack_team == 0 else 'Attack'},
+    ]
+    team_of = {username: 0 if i < half else 1 for i, username in enumerate(roster)}
+    players = [
+        {
+            'id': i,
+            'profileID': f"{rng.getrandbits(64):016x}",
+            'username': username,
+            'teamIndex': team_of[username],
+            'operator': {'name': rng.choice(OPERATORS), 'id': rng.randint(1, 10 ** 12)},
+            'spawn': '',
+        }
+        for i, username in enumerate(roster)
+    ]
+
+    alive = {0: [p for p in roster if team_of[p] == 0], 1: [p for p in roster if team_of[p] == 1]}
+    kills = {p: 0 for p in roster}
+    headshots = {p: 0 for p in roster}
+    feed = []
+    remaining = ROUND_DURATION
+    planted = False
+
+    # Kills jusqu'a ce qu'une equipe soit eliminee ou que le temps soit ecoule
+    while alive[0] and alive[1] and remaining > 5:
+        remaining -= rng.randint(1, 20)
+        if remaining <= 0:
+            break
+        killer_team = rng.randint(0, 1)
+        killer = rng.choice(alive[killer_team])
+        if rng.random() < 0.02 and len(alive[killer_team]) > 1:
+            victim_team = killer_team  # teamkill
+            victim = rng.choice([p for p in alive[victim_team] if p != killer])
+        else:
+            victim_team = 1 - killer_team
+            victim = rng.choice(alive[victim_team])
+        alive[victim_team].remove(victim)
+        headshot = rng.random() < 0.4
+        kills[killer] += 1
+        headshots[killer] += headshot
+        feed.append({'type': {'name': 'Kill', 'id': 0}, 'username': killer, 'target': victim,
+                     'headshot': headshot, 'time': _clock(remaining), 'timeInSeconds': remaining})
+
+        # Plante puis eventuellement diffuse
+        attackers = alive[attack_team]
+        if not planted and attackers and rng.random() < 0.12:
+            planted = True
+            feed.append({'type': {'name': 'DefuserPlantComplete', 'id': 3}, 'username': rng.choice(attackers),
+                         'time': _clock(remaining), 'timeInSeconds': remaining})
+        elif planted and alive[1 - attack_team] and rng.random() < 0.08:
+            feed.append({'type': {'name': 'DefuserDisableComplete', 'id': 5},
+                         'username': rng.choice(alive[1 - attack_team]),
+                         'time': _clock(remaining), 'timeInSeconds': remaining})
+            break
+
+    # Bruit: events que le moteur doit ignorer
+    for _ in range(max(0, events - len(feed))):
+        event_type, event_id = rng.choice(NOISE_EVENTS)
+        position = rng.randint(0, len(feed))
+        at = feed[position - 1]['timeInSeconds'] if position else ROUND_DURATION
+        feed.insert(position, {'type': {'name': event_type, 'id': event_id}, 'username': rng.choice(roster),
+                               'time': _clock(at), 'timeInSeconds': at})
+
+    dead = set(roster) - set(alive[0]) - set(alive[1])
+    stats = [{'username': p, 'score': kills[p] * 100, 'kills': kills[p], 'headshots': headshots[p],
+              'died': p in dead} for p in roster]
+
+    return {
+        'gameVersion': 'Y9S4',
+        'codeVersion': 8925425,
+        'timestamp': timestamp,
+        'matchType': {'name': match_type[0], 'id': match_type[1]},
+        'map': {'name': map_info[0], 'id': map_info[1]},
+        'site': '',
+        'recordingPlayerID': players[0]['profileID'],
+        'gamemode': {'name': 'Bomb', 'id': 3},
+        'roundsPerMatch': 12,
+        'roundsPerMatchOvertime': 3,
+        'roundNumber': round_num - 1,
+        'overtimeRoundNumber': 0,
+        'teams': teams,
+        'players': players,
+        'matchFeedback': feed,
+        'stats': stats,
+    }
+
+
+def generate_match(rng, rounds=12, players=10, events=30, pool=None, start=None):
+    """Tous les rounds d'un match (liste de dicts) et ses metadonnees"""
+    pool = pool or player_pool(max(players, 10))
+    roster = rng.sample(pool, players)
+    map_info = rng.choice(MAPS)
+    match_type = rng.choice(MATCH_TYPES)
+    start = start or datetime(2024, 1, 1, 16, 45)
+    timestamp = start.strftime('%Y-%m-%dT%H:%M:%SZ')
+    meta = {
+        'folder': start.strftime('Match-%Y-%m-%d_%H-%M-%S') + f"-{rng.randint(0, 99):02d}",
+        'map': map_info[0],
+        'matchType': match_type[0],
+        'date': start.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    rounds_data = [generate_round(rng, r, roster, map_info, match_type, timestamp, events)
+                   for r in range(1, rounds + 1)]
+    return meta, rounds_data
+
+
+def generate_season(matches=10, rounds=12, players=10, events=30, pool_size=50, seed=1):
+    """Liste de (metadonnees, rounds) pour une saison de matchs"""
+    rng = random.Random(seed)
+    pool = player_pool(max(pool_size, players), seed)
+    start = datetime(2024, 1, 1, 16, 45)
+    return [generate_match(rng, rounds, players, events, pool, start + timedelta(hours=6 * i))
+            for i in range(matches)]
+
+
+def rec_header(round_data):
+    """En-tete .rec (format lu par rec_header.read_header) correspondant a un round"""
+    properties = {
+        'version': round_data['gameVersion'],
+        'code': round_data['codeVersion'],
+        'datetime': round_data['timestamp'],
+        'matchtype': round_data['matchType']['id'],
+        'worldid': round_data['map']['id'],
+        'roundnumber': round_data['roundNumber'],
+        'teamname0': round_data['teams'][0]['name'],
+        'teamname1': round_data['teams'][1]['name'],
+    }
+    players = [{'username': p['username'], 'team': p['teamIndex']} for p in round_data['players']]
+    return encode_header(properties, players)
+
+
+def write_match(output_dir, meta, rounds_data, layout='rounds'):
+    """Ecrire un match sur le disque, retourne son dossier
+
+    layout 'rounds': roundNN.json (entree du moteur, comme data/match_data)
+    layout 'replay': Match-*/Match-RNN.rec (en-tete .rec suivi du JSON du round, pour les
+    benchmarks avec cache de rounds)
+    """
+    match_dir = os.path.join(output_dir, meta['folder'])
+    os.makedirs(match_dir, exist_ok=True)
+    for i, round_data in enumerate(rounds_data, 1):
+        if layout == 'rounds':
+            with open(os.path.join(match_dir, f"round{i:02d}.json"), 'w', encoding='utf-8') as f:
+                json.dump(round_data, f)
+        else:
+            with open(os.path.join(match_dir, f"Match-R{i:02d}.rec"), 'wb') as f:
+                f.write(rec_header(round_data) + json.dumps(round_data).encode('utf-8'))
+    return match_dir
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generer des rounds r6-dissect synthetiques')
+    parser.add_argument('output_dir', help='Dossier de sortie (un sous-dossier par match)')
+    parser.add_argument('--matches', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--players', type=int, default=10, help='Joueurs par match')
+    parser.add_argument('--events', type=int, default=30, help='Entrees de matchFeedback par round')
+    parser.add_argument('--player-pool', type=int, default=50, help='Joueurs distincts sur toute la saison')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--layout', choices=['rounds', 'replay'], default='rounds')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    season = generate_season(args.matches, args.rounds, args.players, args.events, args.player_pool, args.seed)
+    for meta, rounds_data in season:
+        write_match(args.output_dir, meta, rounds_data, args.layout)
+    print(f"[OK] {len(season)} matchs generes dans {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()
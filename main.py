@@ -61,7 +61,10 @@ if __name__ == '__main__':
     browser_thread.start()
 
     # Import and run Flask app
-    from web.app import app
+    from web.app import app, start_background_services
+
+    # Surveillance des replays (si activee dans la configuration)
+    start_background_services()
 
     # Run without debug mode for production
     app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False)
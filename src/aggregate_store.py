@@ -0,0 +1,109 @@
+"""
+Agregats partiels par match, persistes sur disque
+Ajouter un match a une saison deja analysee ne traite que ce match:
+les autres sont relus depuis leur agregat partiel puis re-fusionnes
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+# Incrementer quand la forme des agregats enregistres change. Les compteurs calcules
+# suivent ENGINE_VERSION du moteur: pas de seconde version a incrementer a la main
+AGGREGATE_FORMAT = 1
+
+
+def aggregate_version():
+    """Version des agregats partiels (liste: comparee a celle relue depuis le JSON)
+
+    Le moteur n'est importe qu'ici: importer ce module ne charge ni pandas ni NumPy
+    (web/app.py l'importe au demarrage).
+    """
+    import analyze_match_complete
+    return [AGGREGATE_FORMAT, analyze_match_complete.ENGINE_VERSION]
+
+
+def files_signature(paths):
+    """Signature d'un ensemble de fichiers: nom, taille et mtime de chacun"""
+    signature = []
+    for path in paths:
+        st = os.stat(path)
+        signature.append([os.path.basename(path), st.st_size, st.st_mtime_ns])
+    signature.sort()
+    return signature
+
+
+class AggregateStore:
+    """Stats des joueurs d'un match (serialize_player_stats) stockees dans store_dir/<cle>.json
+
+    La cle couvre le dossier du match, la signature des fichiers analyses (donc la
+    selection de rounds) et une chaine libre (ex: version de r6-dissect): un match
+    modifie, ou analyse avec d'autres rounds, est recalcule.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(store_dir, exist_ok=True)
+
+    def key(self, match_dir, signature, extra=''):
+        """Cle d'un agregat partiel"""
+        raw = json.dumps([aggregate_version(), os.path.normcase(os.path.abspath(match_dir)), signature, extra])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.store_dir, f"{key}.json")
+
+    def get(self, key):
+        """Agregat partiel {'match', 'rounds', 'players'} ou None s'il est absent ou illisible"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = None
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Agregat partiel illisible, recalcul ({e})")
+            data = None
+
+        with self._lock:
+            if data is None or data.get('version') != aggregate_version():
+                self.misses += 1
+                return None
+            self.hits += 1
+        return data
+
+    def put(self, key, match_name, rounds, players):
+        """Enregistrer l'agregat partiel d'un match (ecriture atomique)"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        payload = {
+            'version': aggregate_version(),
+            'match': match_name,
+            'rounds': rounds,
+            'players': players,
+        }
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARNING] Impossible d'enregistrer l'agregat de {match_name} ({e})")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self):
+        """Supprimer tous les agregats partiels"""
+        for entry in os.scandir(self.store_dir):
+            if entry.name.endswith('.json') or entry.name.endswith('.tmp'):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
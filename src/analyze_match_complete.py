@@ -1,543 +1,714 @@
-import json
+"""
+R6 Siege Match Stats Analyzer - Moteur de statistiques
+Utilisable comme module (analyze) ou en ligne de commande (meme options qu'avant)
+"""
+
 import os
 import sys
 import argparse
-from collections import defaultdict
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
-# Fix encoding for Windows console
-if sys.platform == 'win32':
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'replace')
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'replace')
-
-# Parse command line arguments
-parser = argparse.ArgumentParser(description='Analyse des matchs R6 Siege')
-parser.add_argument('--output-name', type=str, help='Nom du fichier de sortie (ex: Villa_2024-01-29_Ranked_2024-01-29-16-45.xlsx)')
-parser.add_argument('--stats', type=str, default='kills,kost,survival,headshots,opening,multikills,plants,rating',
-                    help='Stats a inclure (separes par virgule): kills,kost,survival,headshots,opening,multikills,plants,teamkills,rating')
-parser.add_argument('--players-mode', type=str, choices=['team', 'specific'], help='Mode de filtrage des joueurs')
-parser.add_argument('--players', type=str, help='Liste de joueurs (separes par virgule)')
-parser.add_argument('--no-atk', action='store_true', help='Exclure les stats ATK')
-parser.add_argument('--no-def', action='store_true', help='Exclure les stats DEF')
-parser.add_argument('--no-global', action='store_true', help='Exclure les stats GLOBAL')
-args = parser.parse_args()
-
-# Parser les stats demandees
-ENABLED_STATS = set(args.stats.split(',')) if args.stats else set(['kills', 'kost', 'survival', 'headshots', 'opening', 'multikills', 'plants', 'rating'])
-
-# Options de filtrage
-PLAYERS_MODE = args.players_mode
-PLAYERS_LIST = args.players.split(',') if args.players else []
-PLAYERS_LIST = [p.strip() for p in PLAYERS_LIST]
-
-INCLUDE_ATK = not args.no_atk
-INCLUDE_DEF = not args.no_def
-INCLUDE_GLOBAL = not args.no_global
-
-# Charger tous les rounds
-rounds_data = []
-MAX_ROUNDS = 20  # Support jusqu'à 20 rounds (overtime inclus)
-
-for i in range(1, MAX_ROUNDS + 1):
-    filename = f"data/match_data/round{i:02d}.json"
-    if os.path.exists(filename) and os.path.getsize(filename) > 0:
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Validation basique de la structure JSON
-                if isinstance(data, dict) and 'players' in data and 'teams' in data:
-                    rounds_data.append(data)
-                    print(f"[OK] Round {i:02d} charge")
-                else:
-                    print(f"[WARNING] Round {i:02d} structure JSON invalide, ignore")
-        except json.JSONDecodeError as e:
-            print(f"[WARNING] Round {i:02d} JSON invalide ({e}), ignore")
-        except Exception as e:
-            print(f"[WARNING] Round {i:02d} erreur de lecture ({e}), ignore")
-    elif i > 13:
-        # Arrêter la recherche après 13 rounds si aucun fichier trouvé
-        break
-    else:
-        print(f"[WARNING] Round {i:02d} vide ou manquant, ignore")
+# Rapport Excel en flux (styles nommes, une passe): reexporte pour les appelants du moteur
+from report_writer import write_report
+from player_stats import PlayerStats, STAT_COUNTERS, STAT_INDEX, FLOAT_COUNTERS
+from round_loader import ATK, DEF, RoundRecord, RoundFormatError, build_round_record, load_round
 
-print(f"\nTotal rounds charges: {len(rounds_data)}")
+# Incrementer quand le contenu des rapports change (invalide les rapports deja generes, voir report_cache,
+# et les agregats partiels par match, voir aggregate_store)
+ENGINE_VERSION = 3
 
-# Structure pour stats par side (ATK / DEF / GLOBAL)
-player_stats = defaultdict(lambda: {
-    'atk': defaultdict(int),
-    'def': defaultdict(int),
-    'global': defaultdict(int),
-    'team': None,
-    'atk_kost_rounds': [],  # Liste des rounds où KOST est rempli en ATK
-    'def_kost_rounds': [],  # Liste des rounds où KOST est rempli en DEF
-})
+DEFAULT_STATS = ['kills', 'kost', 'survival', 'headshots', 'opening', 'multikills', 'trades', 'clutches', 'plants',
+                 'rating']
 
+MAX_ROUNDS = 20  # Support jusqu'à 20 rounds (overtime inclus)
 ROUND_DURATION = 180  # secondes
 
-# Parcourir tous les rounds
-for round_num, round_data in enumerate(rounds_data, 1):
-    # Déterminer qui est ATK et qui est DEF
-    team_roles = {}
-    for team in round_data['teams']:
-        team_roles[team['name']] = team['role']  # "Attack" ou "Defense"
-
-    # Mapper chaque joueur à son rôle dans ce round
-    player_roles = {}
-    for player in round_data['players']:
-        username = player['username']
-        team_index = player['teamIndex']
-        team_name = round_data['teams'][team_index]['name']
-        role = team_roles[team_name]  # "Attack" ou "Defense"
-        player_roles[username] = role
-
-        # Stocker l'équipe du joueur
-        if player_stats[username]['team'] is None:
-            player_stats[username]['team'] = team_index
-
-    # Collecter les kills par joueur pour détecter les multi-kills
-    round_kills_by_player = defaultdict(list)
-
-    # Analyser les events du round
-    for event in round_data.get('matchFeedback', []):
-        event_type = event['type']['name']
-
-        if event_type == 'Kill':
-            killer = event['username']
-            victim = event['target']
-            headshot = event['headshot']
-            time_sec = event['timeInSeconds']
-
-            # Enregistrer le kill pour multi-kill detection
-            round_kills_by_player[killer].append(time_sec)
-
-            # Déterminer le side du killer
-            if killer in player_roles:
-                side = 'atk' if player_roles[killer] == 'Attack' else 'def'
-
-                # Incrémenter kills
-                player_stats[killer][side]['kills'] += 1
-                player_stats[killer]['global']['kills'] += 1
-
-                # Headshots
-                if headshot:
-                    player_stats[killer][side]['headshots'] += 1
-                    player_stats[killer]['global']['headshots'] += 1
-
-            # Vérifier si c'est un teamkill
-            if killer in player_roles and victim in player_roles:
-                if player_roles[killer] == player_roles[victim]:
-                    side = 'atk' if player_roles[killer] == 'Attack' else 'def'
-                    player_stats[killer][side]['teamkills'] += 1
-                    player_stats[killer]['global']['teamkills'] += 1
-
-        elif event_type == 'DefuserPlantComplete':
-            planter = event['username']
-            if planter in player_roles:
-                side = 'atk' if player_roles[planter] == 'Attack' else 'def'
-                player_stats[planter][side]['plants'] += 1
-                player_stats[planter]['global']['plants'] += 1
-
-        elif event_type == 'DefuserDisableComplete':
-            disabler = event['username']
-            if disabler in player_roles:
-                side = 'atk' if player_roles[disabler] == 'Attack' else 'def'
-                player_stats[disabler][side]['diffuses'] += 1
-                player_stats[disabler]['global']['diffuses'] += 1
-
-    # Détecter les multi-kills (2+ kills en 10 secondes)
-    for killer, kill_times in round_kills_by_player.items():
-        if len(kill_times) >= 2:
-            # Trier par ordre croissant pour faciliter la comparaison
-            kill_times_sorted = sorted(kill_times)
-
-            # Vérifier si au moins 2 kills sont dans une fenêtre de 10 secondes
-            has_multikill = False
-            for i in range(len(kill_times_sorted) - 1):
-                # Calculer la différence avec le kill suivant
-                time_diff = kill_times_sorted[i + 1] - kill_times_sorted[i]
-                if time_diff <= 10:
-                    has_multikill = True
-                    break
-
-            if has_multikill and killer in player_roles:
-                side = 'atk' if player_roles[killer] == 'Attack' else 'def'
-                player_stats[killer][side]['multikills'] += 1
-                player_stats[killer]['global']['multikills'] += 1
 
-    # Opening kills/deaths (premier kill du round)
-    if round_data.get('matchFeedback'):
-        for event in round_data['matchFeedback']:
-            if event.get('type', {}).get('name') == 'Kill':
-                opener = event.get('username')
-                victim = event.get('target')
-
-                if opener and opener in player_roles:
-                    side = 'atk' if player_roles[opener] == 'Attack' else 'def'
-                    player_stats[opener][side]['opening_kills'] += 1
-                    player_stats[opener]['global']['opening_kills'] += 1
-
-                if victim and victim in player_roles:
-                    side = 'atk' if player_roles[victim] == 'Attack' else 'def'
-                    player_stats[victim][side]['opening_deaths'] += 1
-                    player_stats[victim]['global']['opening_deaths'] += 1
-
-                break  # Seulement le premier kill
-
-    # Calculer temps de mort par joueur
-    death_times = {}
-    for event in round_data.get('matchFeedback', []):
-        if event['type']['name'] == 'Kill':
-            victim = event['target']
-            time_of_death = event['timeInSeconds']
-            death_times[victim] = time_of_death
-
-    # Stats individuelles du round
-    for stat in round_data.get('stats', []):
-        username = stat['username']
-        if username not in player_roles:
-            continue
-
-        side = 'atk' if player_roles[username] == 'Attack' else 'def'
-
-        # Rounds joués
-        player_stats[username][side]['rounds'] += 1
-        player_stats[username]['global']['rounds'] += 1
-
-        # Deaths
-        if stat['died']:
-            player_stats[username][side]['deaths'] += 1
-            player_stats[username]['global']['deaths'] += 1
-
-            # Temps de survie
-            if username in death_times:
-                survival_time = ROUND_DURATION - death_times[username]
-                player_stats[username][side]['survival_time'] += survival_time
-                player_stats[username]['global']['survival_time'] += survival_time
+def build_options(stats=None, players_mode=None, players=None,
+                  include_atk=True, include_def=True, include_global=True):
+    """Construire le dictionnaire d'options attendu par analyze()"""
+    return {
+        'stats': set(stats) if stats else set(DEFAULT_STATS),
+        'players_mode': players_mode,
+        'players': [p.strip() for p in (players or [])],
+        'sides': {'atk': include_atk, 'def': include_def, 'global': include_global},
+    }
+
+
+def round_files(input_dir):
+    """(numero, chemin) des fichiers roundNN.json lus par load_rounds, dans l'ordre
+
+    Seuls les fichiers presents et non vides comptent; au-dela du round 13, la
+    recherche s'arrete au premier round manquant.
+    """
+    files = []
+    for i in range(1, MAX_ROUNDS + 1):
+        filename = os.path.join(input_dir, f"round{i:02d}.json")
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            files.append((i, filename))
+        elif i > 13:
+            # Arrêter la recherche après 13 rounds si aucun fichier trouvé
+            break
+    return files
+
+
+def load_rounds(input_dir):
+    """Charger tous les fichiers roundNN.json d'un dossier (voir round_files)
+
+    Chaque round est reduit a son RoundRecord des sa lecture (voir round_loader):
+    seul un JSON complet est en memoire a la fois.
+    """
+    rounds_data = []
+    files = dict(round_files(input_dir))
+    # Rounds manquants signales jusqu'au 13e (ou jusqu'au dernier present)
+    last = max(13, max(files, default=0))
+
+    for i in range(1, last + 1):
+        filename = files.get(i)
+        if filename is not None:
+            try:
+                rounds_data.append(load_round(filename))
+                print(f"[OK] Round {i:02d} charge")
+            except RoundFormatError as e:
+                print(f"[WARNING] Round {i:02d} structure JSON invalide ({e}), ignore")
+            except ValueError as e:
+                print(f"[WARNING] Round {i:02d} JSON invalide ({e}), ignore")
+            except Exception as e:
+                print(f"[WARNING] Round {i:02d} erreur de lecture ({e}), ignore")
         else:
-            # A survécu
-            player_stats[username][side]['rounds_survived'] += 1
-            player_stats[username]['global']['rounds_survived'] += 1
-            player_stats[username][side]['survival_time'] += ROUND_DURATION
-            player_stats[username]['global']['survival_time'] += ROUND_DURATION
-
-        # KOST: Kill, Objective, Survived, or Traded
-        kost_fulfilled = False
-        if stat['kills'] > 0:  # Kill
-            kost_fulfilled = True
-        elif not stat['died']:  # Survived
-            kost_fulfilled = True
-        # Note: Objective et Traded nécessitent plus d'analyse, simplifié ici
-
-        if kost_fulfilled:
-            player_stats[username][f'{side}_kost_rounds'].append(round_num)
-
-# Filtrer les joueurs selon les options
-filtered_players = set(player_stats.keys())
-
-if PLAYERS_MODE == 'team':
-    # Garder seulement les joueurs de l'équipe 0 (VOTRE EQUIPE)
-    filtered_players = {username for username, stats in player_stats.items() if stats.get('team') == 0}
-elif PLAYERS_MODE == 'specific' and PLAYERS_LIST:
-    # Garder seulement les joueurs spécifiés
-    filtered_players = {username for username in player_stats.keys() if username in PLAYERS_LIST}
-
-# Calculer les métriques finales
-results = []
-for username, stats in player_stats.items():
-    # Filtrer les joueurs
-    if username not in filtered_players:
-        continue
-    
-    row = {'Joueur': username}
+            print(f"[WARNING] Round {i:02d} vide ou manquant, ignore")
+
+    print(f"\nTotal rounds charges: {len(rounds_data)}")
+    return rounds_data
+
+
+SIDE_KEYS = ('atk', 'def')
+
+# Paliers de kills d'adversaires dans un round (5 et plus: ace)
+KILL_TIERS = ((2, 'kills_2k'), (3, 'kills_3k'), (4, 'kills_4k'), (5, 'aces'))
+
+
+def flatten_rounds(rounds_data, on_round=None):
+    """Aplatir les rounds en tables (un seul passage Python par round, le reste est vectorise)
+
+    Retourne un dict de DataFrames, tous indexes par numero de round:
+    roster (round, username, side, team), kills (round, seq, killer, victim, headshot, time, trade, quick),
+    objectives (round, username, stat), player_rounds (round, username, kills, died),
+    traded (round, username), clutches (round, username, opponents, won).
+    rounds_data: RoundRecords (load_rounds) ou rounds JSON deja charges (dicts).
+    on_round(round_num, record), optionnel, recoit le RoundRecord de chaque round.
+    """
+    roster = []
+    kills = []
+    objectives = []
+    player_rounds = []
+    traded = []
+    clutches = []
+
+    for round_num, round_data in enumerate(rounds_data, 1):
+        record = round_data if isinstance(round_data, RoundRecord) else build_round_record(round_data)
+        if on_round is not None:
+            on_round(round_num, record)
+
+        sides = record.sides
+        roster.extend((round_num, username, sides[username], team) for username, team in record.teams.items())
+        kills.extend((round_num, seq, killer, victim, bool(headshot), time_sec, trade, quick)
+                     for seq, ((killer, victim, headshot, time_sec), trade, quick)
+                     in enumerate(zip(record.kills, record.trades, record.quick_kills)))
+        objectives.extend((round_num, username, 'plants') for username, _ in record.plants)
+        objectives.extend((round_num, username, 'diffuses') for username, _ in record.defuses)
+        player_rounds.extend((round_num, username, stat_kills, bool(died)) for username, stat_kills, died in record.stats)
+        traded.extend((round_num, username) for username in record.traded)
+        clutches.extend((round_num, username, opponents, record.winner is not None and record.teams[username] == record.winner)
+                        for username, opponents in record.clutches)
+
+    return {
+        'roster': pd.DataFrame(roster, columns=['round', 'username', 'side', 'team']),
+        'kills': pd.DataFrame(kills, columns=['round', 'seq', 'killer', 'victim', 'headshot', 'time', 'trade', 'quick']),
+        'objectives': pd.DataFrame(objectives, columns=['round', 'username', 'stat']),
+        'player_rounds': pd.DataFrame(player_rounds, columns=['round', 'username', 'kills', 'died']),
+        'traded': pd.DataFrame(traded, columns=['round', 'username']),
+        'clutches': pd.DataFrame(clutches, columns=['round', 'username', 'opponents', 'won']),
+    }
+
+
+def empty_player_stats():
+    """Stats vides au format de compute_player_stats"""
+    return PlayerStats()
+
+
+def _last_per_key(keys, values, size):
+    """Tableau de taille size: valeur de la derniere occurrence de chaque cle (NaN si absente)"""
+    result = np.full(size, np.nan)
+    if len(keys):
+        reversed_keys = keys[::-1]
+        unique_keys, first_in_reversed = np.unique(reversed_keys, return_index=True)
+        result[unique_keys] = values[len(keys) - 1 - first_in_reversed]
+    return result
+
+
+def stats_from_tables(tables):
+    """Compteurs par joueur et par side a partir des tables de flatten_rounds (NumPy, sans boucle par event)
+
+    Les joueurs sont codes en entiers (pd.factorize), le side de chaque joueur dans
+    chaque round est lu dans une grille rounds x joueurs, et chaque compteur est une
+    somme par (joueur, side) calculee par np.bincount.
+    Retourne un PlayerStats (joueurs du roster dans l'ordre de premiere apparition,
+    equipe du premier round joue).
+    """
+    roster = tables['roster']
+    if roster.empty:
+        return empty_player_stats()
+
+    kills = tables['kills']
+    objectives = tables['objectives']
+    played = tables['player_rounds']
+    traded = tables['traded']
+    clutches = tables['clutches']
+
+    # Codes joueurs: ceux du roster d'abord, dans l'ordre de premiere apparition
+    names = [roster['username'], kills['killer'], kills['victim'], objectives['username'], played['username'],
+             traded['username'], clutches['username']]
+    codes, uniques = pd.factorize(np.concatenate([column.to_numpy(dtype=object) for column in names]))
+    bounds = np.cumsum([0] + [len(column) for column in names])
+    roster_code, killer, victim, objective_player, played_player, traded_player, clutch_player = (
+        codes[bounds[i]:bounds[i + 1]] for i in range(len(names))
+    )
+    n_players = len(uniques)
+    n_roster = int(roster_code.max()) + 1
+
+    # Side de chaque joueur dans chaque round (-1: absent du round)
+    n_rounds = int(roster['round'].max()) + 1
+    side_grid = np.full((n_rounds, n_players), -1, dtype=np.int8)
+    side_grid[roster['round'].to_numpy(), roster_code] = roster['side'].to_numpy()
+
+    def side_of(rounds, players):
+        # Code -1: nom absent (None) dans l'event
+        return np.where(players >= 0, side_grid[rounds, players], -1)
+
+    totals = np.zeros((n_players * len(SIDE_KEYS), len(STAT_COUNTERS)))
+
+    def add(players, sides, stat, weights=None):
+        """Ajouter weights (1 par defaut) au compteur stat des (joueur, side) valides"""
+        valid = sides >= 0
+        slots = players[valid] * len(SIDE_KEYS) + sides[valid]
+        totals[:, STAT_INDEX[stat]] += np.bincount(slots, None if weights is None else weights[valid],
+                                                   minlength=len(totals))
+
+    # Kills, headshots, teamkills (killer et victime du meme side)
+    kill_round = kills['round'].to_numpy(dtype=np.int64)
+    kill_time = kills['time'].to_numpy(dtype=float)
+    killer_side = side_of(kill_round, killer)
+    victim_side = side_of(kill_round, victim)
+    add(killer, killer_side, 'kills')
+    add(killer, killer_side, 'headshots', kills['headshot'].to_numpy(dtype=float))
+    add(killer, killer_side, 'teamkills', (victim_side == killer_side).astype(float))
+
+    # Multi-kills: au moins un kill a MULTIKILL_WINDOW secondes ou moins du precedent du meme joueur
+    # (drapeau quick pose par le passage lineaire de round_loader.scan_kills)
+    named_killer = killer >= 0
+    quick = kills['quick'].to_numpy(dtype=bool) & named_killer
+    multikill_groups = np.unique(kill_round[quick] * n_players + killer[quick])
+    multikill_round, multikill_player = np.divmod(multikill_groups, n_players)
+    add(multikill_player, side_of(multikill_round, multikill_player), 'multikills')
+
+    # Paliers 2K/3K/4K/ace: kills d'adversaires par (round, joueur)
+    enemy_kill = named_killer & (killer_side >= 0) & (victim_side >= 0) & (victim_side != killer_side)
+    round_kills = np.bincount(kill_round[enemy_kill] * n_players + killer[enemy_kill], minlength=n_rounds * n_players)
+    tier_groups = np.flatnonzero(round_kills >= KILL_TIERS[0][0])
+    tier_round, tier_player = np.divmod(tier_groups, n_players)
+    tier_side = side_of(tier_round, tier_player)
+    tier_kills = np.minimum(round_kills[tier_groups], KILL_TIERS[-1][0])
+    for count, stat in KILL_TIERS:
+        add(tier_player, tier_side, stat, (tier_kills == count).astype(float))
+
+    # Trades: kill qui venge un coequipier, et morts vengees
+    add(killer, killer_side, 'trades', kills['trade'].to_numpy(dtype=float))
+    traded_round = traded['round'].to_numpy(dtype=np.int64)
+    add(traded_player, side_of(traded_round, traded_player), 'traded_deaths')
+
+    # Clutchs (dernier en vie de son equipe) tentes et gagnes
+    clutch_round = clutches['round'].to_numpy(dtype=np.int64)
+    clutch_side = side_of(clutch_round, clutch_player)
+    add(clutch_player, clutch_side, 'clutch_attempts')
+    add(clutch_player, clutch_side, 'clutch_wins', clutches['won'].to_numpy(dtype=float))
 
+    # Opening kills/deaths (premier kill du round)
+    first = kills['seq'].to_numpy() == 0
+    opener_named = kills['killer'].to_numpy(dtype=object).astype(bool)
+    victim_named = kills['victim'].to_numpy(dtype=object).astype(bool)
+    add(killer[first & opener_named], killer_side[first & opener_named], 'opening_kills')
+    add(victim[first & victim_named], victim_side[first & victim_named], 'opening_deaths')
+
+    # Plantes / diffuses
+    objective_round = objectives['round'].to_numpy(dtype=np.int64)
+    objective_side = side_of(objective_round, objective_player)
+    for stat in ('plants', 'diffuses'):
+        mask = objectives['stat'].to_numpy() == stat
+        add(objective_player[mask], objective_side[mask], stat)
+
+    # Stats individuelles du round: rounds joues, morts, survie, KOST
+    played_round = played['round'].to_numpy(dtype=np.int64)
+    played_side = side_of(played_round, played_player)
+    died = played['died'].to_numpy(dtype=bool)
+    # Temps de mort = dernier kill subi dans le round
+    known_victim = victim >= 0
+    death_time = _last_per_key(kill_round[known_victim] * n_players + victim[known_victim], kill_time[known_victim],
+                               n_rounds * n_players)
+    death_time = death_time[played_round * n_players + played_player]
+    survival_time = np.where(died, np.nan_to_num(ROUND_DURATION - death_time, nan=0.0), ROUND_DURATION)
+    add(played_player, played_side, 'rounds')
+    add(played_player, played_side, 'deaths', died.astype(float))
+    add(played_player, played_side, 'rounds_survived', (~died).astype(float))
+    add(played_player, played_side, 'survival_time', survival_time)
+    # KOST: Kill, Objective (plante / diffuse), Survived, or Traded
+    credit = np.zeros((n_rounds, n_players), dtype=bool)
+    credited = (played['kills'].to_numpy() > 0) | ~died
+    for rounds, players in ((played_round[credited], played_player[credited]),
+                            (objective_round, objective_player), (traded_round, traded_player)):
+        known = players >= 0
+        credit[rounds[known], players[known]] = True
+    add(played_player, played_side, 'kost_rounds', credit[played_round, played_player].astype(float))
+
+    # Les joueurs hors roster (noms vus seulement dans les events) n'ont aucun compteur
+    _, first_row = np.unique(roster_code, return_index=True)
+    return PlayerStats(uniques[:n_roster], roster['team'].to_numpy()[first_row],
+                       totals.reshape(n_players, len(SIDE_KEYS), len(STAT_COUNTERS))[:n_roster])
+
+
+def compute_player_stats(rounds_data, on_round=None):
+    """Agreger les compteurs par joueur et par side (ATK / DEF) sur tous les rounds
+
+    Les rounds sont aplatis en tables (flatten_rounds) puis reduits par NumPy
+    (stats_from_tables): pas de boucle Python par event.
+    on_round(round_num, record), optionnel, recoit chaque RoundRecord (ex:
+    alimentation de la base d'evenements). Voir stats_from_tables() pour le format.
+    """
+    return stats_from_tables(flatten_rounds(rounds_data, on_round))
+
+
+def serialize_player_stats(player_stats):
+    """Stats des joueurs d'un match sous forme JSON (agregat partiel persiste)"""
+    return player_stats.to_dict()
+
+
+def deserialize_player_stats(data):
+    """Inverse de serialize_player_stats: retrouve le PlayerStats de compute_player_stats"""
+    return PlayerStats.from_dict(data)
+
+
+def merge_player_stats(partials):
+    """Additionner les compteurs de plusieurs matchs (voir PlayerStats.merge)"""
+    return PlayerStats.merge(partials)
+
+
+def side_counters(player_stats, side_key):
+    """Compteurs d'un side (atk, def ou global = atk + def) sous forme de tableaux NumPy"""
+    values = player_stats.side(None if side_key == 'global' else SIDE_KEYS.index(side_key))
+    return {
+        stat: values[:, i] if stat in FLOAT_COUNTERS else values[:, i].astype(np.int64)
+        for i, stat in enumerate(STAT_COUNTERS)
+    }
+
+
+def _round(values, digits):
+    """round() Python valeur par valeur: memes arrondis que le calcul ligne par ligne (np.round differe, ex: 0.15)"""
+    return [round(value, digits) for value in values.tolist()]
+
+
+def get_sides(options):
+    """Liste des (cle, label) des sides a inclure, dans l'ordre ATK / DEF / GLOBAL"""
+    sides = options['sides']
     sides_to_process = []
-    if INCLUDE_ATK:
+    if sides.get('atk', True):
         sides_to_process.append(('atk', 'ATK'))
-    if INCLUDE_DEF:
+    if sides.get('def', True):
         sides_to_process.append(('def', 'DEF'))
-    if INCLUDE_GLOBAL:
+    if sides.get('global', True):
         sides_to_process.append(('global', 'GLOBAL'))
-
-    for side_key, side_label in sides_to_process:
-        s = stats[side_key]
+    return sides_to_process
+
+
+def get_columns(options):
+    """Ordre des colonnes du rapport selon les stats activees et les sides selectionnes"""
+    enabled_stats = options['stats']
+
+    cols = ['Joueur', 'Equipe']
+    for _, side in get_sides(options):
+        if 'rating' in enabled_stats:
+            cols.append(f'{side} Rating')
+        if 'kills' in enabled_stats:
+            cols.extend([
+                f'{side} Kills',
+                f'{side} Deaths',
+                f'{side} K/D',
+                f'{side} +/-',
+                f'{side} Rounds',
+                f'{side} KPR',
+            ])
+        if 'kost' in enabled_stats:
+            cols.extend([
+                f'{side} KOST%',
+                f'{side} Rounds KOST',
+            ])
+        if 'survival' in enabled_stats:
+            cols.extend([
+                f'{side} Rounds Survie',
+                f'{side} Temps Vie',
+                f'{side} Temps Moy (s)',
+            ])
+        if 'headshots' in enabled_stats:
+            cols.extend([
+                f'{side} HS',
+                f'{side} HS%',
+            ])
+        if 'opening' in enabled_stats:
+            cols.extend([
+                f'{side} Opening K',
+                f'{side} Opening D',
+                f'{side} Opening Ratio',
+            ])
+        if 'multikills' in enabled_stats:
+            cols.extend([
+                f'{side} Multi-kills',
+                f'{side} 2K',
+                f'{side} 3K',
+                f'{side} 4K',
+                f'{side} Ace',
+            ])
+        if 'trades' in enabled_stats:
+            cols.extend([
+                f'{side} Trades',
+                f'{side} Morts tradees',
+            ])
+        if 'clutches' in enabled_stats:
+            cols.extend([
+                f'{side} Clutchs',
+                f'{side} Clutchs gagnes',
+            ])
+        if 'plants' in enabled_stats:
+            cols.extend([
+                f'{side} Plantes',
+                f'{side} Diffuses',
+            ])
+        if 'teamkills' in enabled_stats:
+            cols.append(f'{side} Teamkills')
+
+    return cols
+
+
+def build_dataframe(player_stats, options):
+    """Calculer les metriques finales (une operation NumPy par colonne) et construire le DataFrame trie du rapport"""
+    enabled_stats = options['stats']
+    players_mode = options.get('players_mode')
+    players_list = options.get('players') or []
+
+    # Filtrer les joueurs selon les options
+    if players_mode == 'team':
+        # Garder seulement les joueurs de l'équipe 0 (VOTRE EQUIPE)
+        player_stats = player_stats.subset(player_stats.teams == 0)
+    elif players_mode == 'specific' and players_list:
+        # Garder seulement les joueurs spécifiés
+        wanted = set(players_list)
+        player_stats = player_stats.subset([username in wanted for username in player_stats.names])
+
+    if not len(player_stats):
+        return pd.DataFrame()
+
+    columns = {'Joueur': np.array(player_stats.names, dtype=object)}
+
+    for side_key, side_label in get_sides(options):
+        s = side_counters(player_stats, side_key)
 
         # Calculs de base
-        kills = s.get('kills', 0)
-        deaths = s.get('deaths', 0)
-        rounds = s.get('rounds', 0)
-        headshots = s.get('headshots', 0)
-        rounds_survived = s.get('rounds_survived', 0)
-        survival_time = s.get('survival_time', 0)
-        opening_kills = s.get('opening_kills', 0)
-        opening_deaths = s.get('opening_deaths', 0)
+        kills = s['kills']
+        deaths = s['deaths']
+        rounds = s['rounds']
+        headshots = s['headshots']
+        rounds_survived = s['rounds_survived']
+        survival_time = s['survival_time']
+        opening_kills = s['opening_kills']
+        opening_deaths = s['opening_deaths']
+        played = rounds > 0
+        safe_rounds = np.maximum(rounds, 1)
 
         # K/D
-        kd = kills / max(deaths, 1)
+        kd = kills / np.maximum(deaths, 1)
 
         # +/-
         plus_minus = kills - deaths
 
         # KPR
-        kpr = kills / max(rounds, 1)
+        kpr = kills / safe_rounds
 
         # HS%
-        hs_pct = (headshots / max(kills, 1)) * 100 if kills > 0 else 0
+        hs_pct = np.where(kills > 0, (headshots / np.maximum(kills, 1)) * 100, 0)
 
         # Survival rate
-        survival_rate = (rounds_survived / max(rounds, 1)) * 100 if rounds > 0 else 0
+        survival_rate = np.where(played, (rounds_survived / safe_rounds) * 100, 0)
 
         # KOST
-        kost_rounds_key = f'{side_key}_kost_rounds'
-        kost_rounds_count = len(stats.get(kost_rounds_key, []))
-        kost_pct = (kost_rounds_count / max(rounds, 1)) * 100 if rounds > 0 else 0
+        kost_rounds_count = s['kost_rounds']
+        kost_pct = np.where(played, (kost_rounds_count / safe_rounds) * 100, 0)
 
         # Temps de survie moyen
-        avg_survival = survival_time / max(rounds, 1) if rounds > 0 else 0
+        avg_survival = np.where(played, survival_time / safe_rounds, 0)
 
         # Ratio opening
-        opening_ratio = opening_kills / max(opening_deaths, 1) if opening_deaths > 0 else opening_kills
+        opening_ratio = np.where(opening_deaths > 0, opening_kills / np.maximum(opening_deaths, 1), opening_kills)
 
         # Rating (formule simplifiée)
-        rating = (kpr * 0.7 + survival_rate/100 * 0.3) * 100 if rounds > 0 else 0
+        rating = np.where(played, (kpr * 0.7 + survival_rate/100 * 0.3) * 100, 0)
 
         # Ajouter colonnes selon les stats activees
         # Rating toujours en premier si active
-        if 'rating' in ENABLED_STATS:
-            row[f'{side_label} Rating'] = round(rating, 1)
+        if 'rating' in enabled_stats:
+            columns[f'{side_label} Rating'] = _round(rating, 1)
 
         # Kills/Deaths/K-D
-        if 'kills' in ENABLED_STATS:
-            row[f'{side_label} Kills'] = kills
-            row[f'{side_label} Deaths'] = deaths
-            row[f'{side_label} K/D'] = round(kd, 2)
-            row[f'{side_label} +/-'] = plus_minus
-            row[f'{side_label} Rounds'] = rounds
-            row[f'{side_label} KPR'] = round(kpr, 2)
+        if 'kills' in enabled_stats:
+            columns[f'{side_label} Kills'] = kills
+            columns[f'{side_label} Deaths'] = deaths
+            columns[f'{side_label} K/D'] = _round(kd, 2)
+            columns[f'{side_label} +/-'] = plus_minus
+            columns[f'{side_label} Rounds'] = rounds
+            columns[f'{side_label} KPR'] = _round(kpr, 2)
 
         # KOST
-        if 'kost' in ENABLED_STATS:
-            row[f'{side_label} KOST%'] = round(kost_pct, 1)
-            row[f'{side_label} Rounds KOST'] = kost_rounds_count
+        if 'kost' in enabled_stats:
+            columns[f'{side_label} KOST%'] = _round(kost_pct, 1)
+            columns[f'{side_label} Rounds KOST'] = kost_rounds_count
 
         # Survie
-        if 'survival' in ENABLED_STATS:
-            row[f'{side_label} Rounds Survie'] = rounds_survived
-            row[f'{side_label} Temps Vie'] = f"{int(survival_time//60)}m{int(survival_time%60):02d}s"
-            row[f'{side_label} Temps Moy (s)'] = round(avg_survival, 1)
+        if 'survival' in enabled_stats:
+            minutes = (survival_time // 60).astype(int)
+            seconds = (survival_time % 60).astype(int)
+            columns[f'{side_label} Rounds Survie'] = rounds_survived
+            columns[f'{side_label} Temps Vie'] = [f"{m}m{sec:02d}s" for m, sec in zip(minutes.tolist(), seconds.tolist())]
+            columns[f'{side_label} Temps Moy (s)'] = _round(avg_survival, 1)
 
         # Headshots
-        if 'headshots' in ENABLED_STATS:
-            row[f'{side_label} HS'] = headshots
-            row[f'{side_label} HS%'] = round(hs_pct, 1)
+        if 'headshots' in enabled_stats:
+            columns[f'{side_label} HS'] = headshots
+            columns[f'{side_label} HS%'] = _round(hs_pct, 1)
 
         # Opening
-        if 'opening' in ENABLED_STATS:
-            row[f'{side_label} Opening K'] = opening_kills
-            row[f'{side_label} Opening D'] = opening_deaths
-            row[f'{side_label} Opening Ratio'] = round(opening_ratio, 2)
+        if 'opening' in enabled_stats:
+            columns[f'{side_label} Opening K'] = opening_kills
+            columns[f'{side_label} Opening D'] = opening_deaths
+            columns[f'{side_label} Opening Ratio'] = _round(opening_ratio, 2)
 
         # Multi-kills
-        if 'multikills' in ENABLED_STATS:
-            row[f'{side_label} Multi-kills'] = s.get('multikills', 0)
+        if 'multikills' in enabled_stats:
+            columns[f'{side_label} Multi-kills'] = s['multikills']
+            columns[f'{side_label} 2K'] = s['kills_2k']
+            columns[f'{side_label} 3K'] = s['kills_3k']
+            columns[f'{side_label} 4K'] = s['kills_4k']
+            columns[f'{side_label} Ace'] = s['aces']
+
+        # Trades
+        if 'trades' in enabled_stats:
+            columns[f'{side_label} Trades'] = s['trades']
+            columns[f'{side_label} Morts tradees'] = s['traded_deaths']
+
+        # Clutchs
+        if 'clutches' in enabled_stats:
+            columns[f'{side_label} Clutchs'] = s['clutch_attempts']
+            columns[f'{side_label} Clutchs gagnes'] = s['clutch_wins']
 
         # Plantes/Defuses
-        if 'plants' in ENABLED_STATS:
-            row[f'{side_label} Plantes'] = s.get('plants', 0)
-            row[f'{side_label} Diffuses'] = s.get('diffuses', 0)
+        if 'plants' in enabled_stats:
+            columns[f'{side_label} Plantes'] = s['plants']
+            columns[f'{side_label} Diffuses'] = s['diffuses']
 
         # Teamkills
-        if 'teamkills' in ENABLED_STATS:
-            row[f'{side_label} Teamkills'] = s.get('teamkills', 0)
-
-    row['Equipe'] = 'VOTRE EQUIPE' if stats['team'] == 0 else 'EQUIPE ENNEMIE'
-    results.append(row)
-
-# Créer DataFrame
-df = pd.DataFrame(results)
-
-# Trier par équipe puis par Rating (utiliser le premier side disponible)
-sort_columns = ['Equipe']
-if INCLUDE_GLOBAL and 'GLOBAL Rating' in df.columns:
-    sort_columns.append('GLOBAL Rating')
-elif INCLUDE_ATK and 'ATK Rating' in df.columns:
-    sort_columns.append('ATK Rating')
-elif INCLUDE_DEF and 'DEF Rating' in df.columns:
-    sort_columns.append('DEF Rating')
-
-if len(sort_columns) > 1 and sort_columns[1] in df.columns:
-    df = df.sort_values(sort_columns, ascending=[True, False])
-else:
-    df = df.sort_values(['Equipe'], ascending=[True])
-
-# Reorganiser colonnes selon les stats activees et les sides selectionnes
-cols = ['Joueur', 'Equipe']
-sides_to_include = []
-if INCLUDE_ATK:
-    sides_to_include.append('ATK')
-if INCLUDE_DEF:
-    sides_to_include.append('DEF')
-if INCLUDE_GLOBAL:
-    sides_to_include.append('GLOBAL')
-
-for side in sides_to_include:
-    if 'rating' in ENABLED_STATS:
-        cols.append(f'{side} Rating')
-    if 'kills' in ENABLED_STATS:
-        cols.extend([
-            f'{side} Kills',
-            f'{side} Deaths',
-            f'{side} K/D',
-            f'{side} +/-',
-            f'{side} Rounds',
-            f'{side} KPR',
-        ])
-    if 'kost' in ENABLED_STATS:
-        cols.extend([
-            f'{side} KOST%',
-            f'{side} Rounds KOST',
-        ])
-    if 'survival' in ENABLED_STATS:
-        cols.extend([
-            f'{side} Rounds Survie',
-            f'{side} Temps Vie',
-            f'{side} Temps Moy (s)',
-        ])
-    if 'headshots' in ENABLED_STATS:
-        cols.extend([
-            f'{side} HS',
-            f'{side} HS%',
-        ])
-    if 'opening' in ENABLED_STATS:
-        cols.extend([
-            f'{side} Opening K',
-            f'{side} Opening D',
-            f'{side} Opening Ratio',
-        ])
-    if 'multikills' in ENABLED_STATS:
-        cols.append(f'{side} Multi-kills')
-    if 'plants' in ENABLED_STATS:
-        cols.extend([
-            f'{side} Plantes',
-            f'{side} Diffuses',
-        ])
-    if 'teamkills' in ENABLED_STATS:
-        cols.append(f'{side} Teamkills')
-
-# Filtrer les colonnes qui existent dans le DataFrame
-cols = [c for c in cols if c in df.columns]
-df = df[cols]
-
-# Sauvegarder avec mise en forme
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-
-# Generer le nom de fichier
-if args.output_name:
-    # Utiliser le nom fourni en parametre
-    output_file = args.output_name
-else:
-    # Nom par defaut avec date et heure
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    output_file = f'Match_Stats_Complete_{timestamp}.xlsx'
-
-def format_worksheet(ws, df, is_team_sheet=False):
-    """Applique la mise en forme à une feuille Excel"""
-
-    # Couleurs
-    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")  # Bleu marine
-    atk_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")     # Rouge clair
-    def_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")     # Vert clair
-    global_fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")  # Jaune clair
-    team0_fill = PatternFill(start_color="DAEEF3", end_color="DAEEF3", fill_type="solid")   # Bleu très clair
-    team1_fill = PatternFill(start_color="F2DCDB", end_color="F2DCDB", fill_type="solid")   # Rouge très clair
-
-    header_font = Font(color="FFFFFF", bold=True, size=11)
-    border = Border(
-        left=Side(style='thin', color='000000'),
-        right=Side(style='thin', color='000000'),
-        top=Side(style='thin', color='000000'),
-        bottom=Side(style='thin', color='000000')
-    )
+        if 'teamkills' in enabled_stats:
+            columns[f'{side_label} Teamkills'] = s['teamkills']
 
-    # Formater les en-têtes
-    for col_idx, col_name in enumerate(df.columns, 1):
-        cell = ws.cell(row=1, column=col_idx)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        cell.border = border
-
-        # Couleur de fond selon le type de colonne
-        if 'ATK' in col_name:
-            cell.fill = PatternFill(start_color="E74C3C", end_color="E74C3C", fill_type="solid")
-        elif 'DEF' in col_name:
-            cell.fill = PatternFill(start_color="27AE60", end_color="27AE60", fill_type="solid")
-        elif 'GLOBAL' in col_name:
-            cell.fill = PatternFill(start_color="F39C12", end_color="F39C12", fill_type="solid")
-
-    # Formater les données
-    for row_idx in range(2, ws.max_row + 1):
-        # Alterner les couleurs par équipe
-        equipe_cell = ws.cell(row=row_idx, column=2)  # Colonne Equipe
-        row_fill = team0_fill if equipe_cell.value == 'VOTRE EQUIPE' else team1_fill
-
-        for col_idx in range(1, ws.max_column + 1):
-            cell = ws.cell(row=row_idx, column=col_idx)
-            cell.border = border
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-
-            # Appliquer la couleur de ligne
-            if col_idx <= 2:  # Joueur et Equipe
-                cell.fill = row_fill
-                if col_idx == 1:  # Nom du joueur en gras
-                    cell.font = Font(bold=True, size=10)
-
-    # Ajuster automatiquement la largeur des colonnes
-    for col_idx, col_name in enumerate(df.columns, 1):
-        column_letter = get_column_letter(col_idx)
-
-        # Largeur par défaut selon le type de colonne
-        if col_name == 'Joueur':
-            width = 20
-        elif col_name == 'Equipe':
-            width = 18
-        elif 'Temps Vie' in col_name:
-            width = 12
-        elif 'Rating' in col_name or 'KOST' in col_name:
-            width = 10
-        else:
-            width = 9
+    columns['Equipe'] = np.where(player_stats.teams == 0, 'VOTRE EQUIPE', 'EQUIPE ENNEMIE')
+
+    # Créer DataFrame
+    df = pd.DataFrame(columns)
+
+    if df.empty:
+        return df
+
+    # Trier par équipe puis par Rating (utiliser le premier side disponible)
+    sort_columns = ['Equipe']
+    sides = options['sides']
+    if sides.get('global', True) and 'GLOBAL Rating' in df.columns:
+        sort_columns.append('GLOBAL Rating')
+    elif sides.get('atk', True) and 'ATK Rating' in df.columns:
+        sort_columns.append('ATK Rating')
+    elif sides.get('def', True) and 'DEF Rating' in df.columns:
+        sort_columns.append('DEF Rating')
 
-        ws.column_dimensions[column_letter].width = width
+    if len(sort_columns) > 1 and sort_columns[1] in df.columns:
+        df = df.sort_values(sort_columns, ascending=[True, False])
+    else:
+        df = df.sort_values(['Equipe'], ascending=[True])
+
+    # Filtrer les colonnes qui existent dans le DataFrame
+    cols = [c for c in get_columns(options) if c in df.columns]
+    return df[cols]
+
+
+def analyze(rounds, options=None, on_round=None):
+    """Analyser une liste de rounds (RoundRecords de load_rounds ou JSON r6-dissect deja charges)
+
+    options: dictionnaire produit par build_options() (defauts si None).
+    on_round: voir compute_player_stats().
+    Retourne un dict: dataframe (rapport trie), columns, players, rounds.
+    """
+    if options is None:
+        options = build_options()
+
+    player_stats = compute_player_stats(rounds, on_round)
+    df = build_dataframe(player_stats, options)
+
+    return {
+        'dataframe': df,
+        'columns': list(df.columns),
+        'players': len(df),
+        'rounds': len(rounds),
+    }
+
+
+def analyze_aggregate(matches, options=None):
+    """Agreger plusieurs matchs dans un seul rapport
+
+    matches: liste de (nom, player_stats, nombre de rounds), player_stats venant de
+    compute_player_stats() ou d'un agregat partiel persiste.
+    Retourne un dict: dataframe (totaux), breakdown [(nom, dataframe du match)],
+    columns, players, rounds, matches.
+    """
+    if options is None:
+        options = build_options()
+
+    df = build_dataframe(merge_player_stats(stats for _, stats, _ in matches), options)
+    breakdown = [(name, build_dataframe(stats, options)) for name, stats, _ in matches]
+
+    return {
+        'dataframe': df,
+        'breakdown': [(name, match_df) for name, match_df in breakdown if not match_df.empty],
+        'columns': list(df.columns),
+        'players': len(df),
+        'rounds': sum(rounds for _, _, rounds in matches),
+        'matches': len(matches),
+    }
+
+
+def parse_args(argv=None):
+    """Options de la ligne de commande"""
+    parser = argparse.ArgumentParser(description='Analyse des matchs R6 Siege')
+    parser.add_argument('--output-name', type=str, help='Nom du fichier de sortie (ex: Villa_2024-01-29_Ranked_2024-01-29-16-45.xlsx)')
+    parser.add_argument('--input-dir', type=str, nargs='+', default=[os.path.join('data', 'match_data')],
+                        help='Dossier contenant les fichiers roundNN.json (defaut: data/match_data); plusieurs dossiers avec --aggregate')
+    parser.add_argument('--output-dir', type=str, default='.', help='Dossier ou ecrire le rapport Excel (defaut: repertoire courant)')
+    parser.add_argument('--stats', type=str, default=','.join(DEFAULT_STATS),
+                        help='Stats a inclure (separes par virgule): kills,kost,survival,headshots,opening,multikills,trades,clutches,plants,teamkills,rating')
+    parser.add_argument('--players-mode', type=str, choices=['team', 'specific'], help='Mode de filtrage des joueurs')
+    parser.add_argument('--players', type=str, help='Liste de joueurs (separes par virgule)')
+    parser.add_argument('--no-atk', action='store_true', help='Exclure les stats ATK')
+    parser.add_argument('--no-def', action='store_true', help='Exclure les stats DEF')
+    parser.add_argument('--no-global', action='store_true', help='Exclure les stats GLOBAL')
+    parser.add_argument('--aggregate', action='store_true',
+                        help='Un seul rapport pour tous les --input-dir (totaux + une feuille par match)')
+    parser.add_argument('--aggregate-dir', type=str, default=os.path.join('data', 'aggregates'),
+                        help='Dossier des agregats partiels par match (defaut: data/aggregates)')
+    args = parser.parse_args(argv)
+    if len(args.input_dir) > 1 and not args.aggregate:
+        parser.error('plusieurs --input-dir necessitent --aggregate')
+    return args
+
+
+def load_match_partials(input_dirs, store):
+    """Stats des joueurs de chaque dossier de match, relues depuis store quand les rounds n'ont pas change
+
+    Retourne la liste des (nom, player_stats, nombre de rounds) attendue par analyze_aggregate().
+    """
+    from aggregate_store import files_signature
+
+    matches = []
+    for input_dir in input_dirs:
+        name = os.path.basename(os.path.normpath(input_dir))
+        # Signature des seuls fichiers lus par load_rounds
+        key = store.key(input_dir, files_signature(path for _, path in round_files(input_dir)))
+        partial = store.get(key)
+        if partial is not None:
+            print(f"[OK] {name}: agregat partiel deja calcule")
+            matches.append((name, deserialize_player_stats(partial['players']), partial['rounds']))
+            continue
 
-    # Figer la première ligne
-    ws.freeze_panes = 'A2'
+        rounds_data = load_rounds(input_dir)
+        if not rounds_data:
+            print(f"[WARNING] {name}: aucun round, ignore")
+            continue
+        player_stats = compute_player_stats(rounds_data)
+        store.put(key, name, len(rounds_data), serialize_player_stats(player_stats))
+        matches.append((name, player_stats, len(rounds_data)))
+    return matches
+
+
+def main(argv=None):
+    """Point d'entree CLI: charge les rounds, analyse et ecrit le rapport Excel"""
+    # Fix encoding for Windows console
+    if sys.platform == 'win32':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'replace')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'replace')
+
+    args = parse_args(argv)
+
+    # Parser les stats demandees
+    options = build_options(
+        stats=args.stats.split(',') if args.stats else None,
+        players_mode=args.players_mode,
+        players=args.players.split(',') if args.players else [],
+        include_atk=not args.no_atk,
+        include_def=not args.no_def,
+        include_global=not args.no_global,
+    )
 
-    # Hauteur de ligne pour l'en-tête
-    ws.row_dimensions[1].height = 30
+    if args.aggregate:
+        from aggregate_store import AggregateStore
+        matches = load_match_partials(args.input_dir, AggregateStore(args.aggregate_dir))
+        result = analyze_aggregate(matches, options)
+    else:
+        rounds_data = load_rounds(args.input_dir[0])
+        result = analyze(rounds_data, options)
+    df = result['dataframe']
+
+    if df.empty:
+        print("[ERROR] Aucun joueur a analyser")
+        return 1
+
+    # Generer le nom de fichier
+    if args.output_name:
+        # Utiliser le nom fourni en parametre
+        output_file = args.output_name
+    else:
+        # Nom par defaut avec date et heure
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        output_file = f'Match_Stats_Complete_{timestamp}.xlsx'
 
-with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-    # Stats complètes
-    df.to_excel(writer, sheet_name='Stats Completes', index=False)
-    format_worksheet(writer.sheets['Stats Completes'], df)
+    output_file = os.path.join(args.output_dir, output_file)
+    os.makedirs(args.output_dir, exist_ok=True)
 
-    # Feuille par équipe
-    df_team0 = df[df['Equipe'] == 'VOTRE EQUIPE'].copy()
-    df_team1 = df[df['Equipe'] == 'EQUIPE ENNEMIE'].copy()
+    write_report(df, output_file, breakdown=result.get('breakdown'))
 
-    if not df_team0.empty:
-        df_team0.to_excel(writer, sheet_name='VOTRE EQUIPE', index=False)
-        format_worksheet(writer.sheets['VOTRE EQUIPE'], df_team0, is_team_sheet=True)
+    print(f"\n{'='*60}")
+    print(f"[SUCCESS] Rapport complet genere: {output_file}")
+    print(f"{'='*60}")
+    if args.aggregate:
+        print(f"\n{result['matches']} matchs agreges ({result['rounds']} rounds)")
+    print(f"\n{len(df)} joueurs analyses")
+    print(f"Colonnes par side: ATK / DEF / GLOBAL")
+    print(f"Total de {len(result['columns'])-2} statistiques par joueur")
+    return 0
 
-    if not df_team1.empty:
-        df_team1.to_excel(writer, sheet_name='EQUIPE ENNEMIE', index=False)
-        format_worksheet(writer.sheets['EQUIPE ENNEMIE'], df_team1, is_team_sheet=True)
 
-print(f"\n{'='*60}")
-print(f"[SUCCESS] Rapport complet genere: {output_file}")
-print(f"{'='*60}")
-print(f"\n{len(df)} joueurs analyses")
-print(f"Colonnes par side: ATK / DEF / GLOBAL")
-print(f"Total de {len(cols)-2} statistiques par joueur")
+if __name__ == '__main__':
+    sys.exit(main())
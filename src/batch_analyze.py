@@ -0,0 +1,293 @@
+"""
+Analyse en lot d'un dossier MatchReplay, sans l'interface web (backfill nocturne)
+Chaque match est passe a r6-dissect (pool sur tous les coeurs), analyse et
+enregistre dans data/results comme depuis l'interface. Les matchs deja analyses
+avec les memes rounds et options sont ignores (cache de rapports): relancer la
+commande ne traite que les nouveaux matchs
+
+Utilisation:
+    python src/batch_analyze.py                                  # dossier MatchReplay de data/config.json
+    python src/batch_analyze.py "C:/.../MatchReplay" --workers 8
+    python src/batch_analyze.py Match-2024-01-29_16-45-12-42 --force --export xlsx,csv
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SRC_DIR)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from dissect_pool import get_dissect_pool  # noqa: E402
+from event_store import EventStore  # noqa: E402
+from jobs import JobManager, DONE, ERROR, CANCELLED  # noqa: E402
+from match_catalog import MatchCatalog  # noqa: E402
+from match_metadata import list_rec_files, dissect_match_metadata, scan_match_dirs  # noqa: E402
+from metrics import STAGES  # noqa: E402
+from pipeline import analyze_selection, load_engine  # noqa: E402
+from report_cache import ReportCache  # noqa: E402
+from result_store import ResultStore, ExportUnavailable, EXPORT_FORMATS  # noqa: E402
+from round_cache import RoundCache, DEFAULT_MAX_BYTES  # noqa: E402
+
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+DEFAULT_R6_DISSECT = os.path.join(BASE_DIR, 'tools', 'r6-dissect.exe')
+
+# Matchs par job: borne la memoire (RoundRecords en attente d'analyse); deux jobs
+# tournent a la fois pour que le pool r6-dissect ait toujours des rounds a traiter
+DEFAULT_BATCH_SIZE = 25
+CONCURRENT_BATCHES = 2
+
+
+def parse_args(argv=None):
+    """Options de la ligne de commande"""
+    parser = argparse.ArgumentParser(description='Analyse en lot des replays R6 Siege')
+    parser.add_argument('paths', nargs='*',
+                        help='Dossiers MatchReplay ou dossiers Match-* (defaut: replay_path de data/config.json)')
+    parser.add_argument('--r6-dissect', type=str, default=DEFAULT_R6_DISSECT,
+                        help='Chemin de r6-dissect.exe (defaut: tools/r6-dissect.exe)')
+    parser.add_argument('--workers', type=int,
+                        help="r6-dissect en parallele (defaut: 'dissect_workers' de data/config.json, sinon nombre de coeurs)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Matchs par job d\'analyse (defaut: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-analyser aussi les matchs deja traites (cache de rapports ignore)')
+    parser.add_argument('--export', type=str, default='',
+                        help=f"Formats a ecrire dans data/reports pour chaque resultat ({','.join(EXPORT_FORMATS)})")
+    parser.add_argument('--no-events', action='store_true', help='Ne pas alimenter la base d\'evenements (data/events.db)')
+    parser.add_argument('--stats', type=str, help='Stats a inclure (separes par virgule, defaut: celles de l\'interface)')
+    parser.add_argument('--players-mode', type=str, choices=['team', 'specific'], help='Mode de filtrage des joueurs')
+    parser.add_argument('--players', type=str, help='Liste de joueurs (separes par virgule)')
+    parser.add_argument('--no-atk', action='store_true', help='Exclure les stats ATK')
+    parser.add_argument('--no-def', action='store_true', help='Exclure les stats DEF')
+    parser.add_argument('--no-global', action='store_true', help='Exclure les stats GLOBAL')
+    args = parser.parse_args(argv)
+
+    args.export = [fmt.strip() for fmt in args.export.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in args.export if fmt not in EXPORT_FORMATS]
+    if unknown:
+        parser.error(f"format d'export inconnu: {', '.join(unknown)}")
+    if args.batch_size < 1:
+        parser.error('--batch-size doit etre positif')
+    if args.players_mode == 'specific' and not args.players:
+        parser.error('--players-mode specific necessite --players')
+    return args
+
+
+def load_config():
+    """data/config.json de l'interface web (dossier MatchReplay, taille du pool et du cache)"""
+    try:
+        with open(os.path.join(DATA_DIR, 'config.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def find_match_dirs(paths):
+    """Dossiers de matchs designes par paths (dossier Match-* ou dossier qui en contient), sans doublon"""
+    match_dirs = []
+    seen = set()
+    for path in paths:
+        path = os.path.abspath(path)
+        if not os.path.isdir(path):
+            print(f"[WARNING] Dossier introuvable, ignore: {path}")
+            continue
+        if list_rec_files(path):
+            candidates = [path]
+        else:
+            candidates = sorted(os.path.join(path, item) for item in os.listdir(path)
+                                if item.startswith('Match-') and os.path.isdir(os.path.join(path, item)))
+        for match_dir in candidates:
+            if match_dir not in seen:
+                seen.add(match_dir)
+                match_dirs.append(match_dir)
+    return match_dirs
+
+
+def export_result(results, name, formats):
+    """Ecrire les exports demandes d'un resultat dans le dossier des rapports
+
+    Retourne les formats indisponibles (dependance optionnelle absente); les autres
+    formats sont ecrits quand meme.
+    """
+    unavailable = []
+    for fmt in formats:
+        try:
+            if fmt == 'xlsx':
+                results.excel(name)
+                continue
+            exported = results.export(name, fmt)
+        except ExportUnavailable as e:
+            print(f"[WARNING] {e}")
+            unavailable.append(fmt)
+            continue
+        if exported is None:
+            continue
+        content, _, filename = exported
+        with open(os.path.join(results.reports_folder, filename), 'wb') as f:
+            f.write(content)
+    return unavailable
+
+
+def follow_job(job, counters):
+    """Afficher la progression d'un job jusqu'a sa fin (une ligne par match termine)"""
+    seq = 0
+    while True:
+        events = job.events_since(seq, timeout=1.0)
+        seq += len(events)
+        for event_type, data in events:
+            if event_type != 'match' or data['status'] not in (DONE, ERROR):
+                continue
+            counters['finished'] += 1
+            progress = f"({counters['finished']}/{counters['total']})"
+            if data['status'] == ERROR:
+                print(f"[ERROR] {progress} {data['folder']}: {data.get('error', 'echec')}")
+            elif data.get('cached'):
+                print(f"[OK] {progress} {data['folder']}: deja analyse")
+            else:
+                print(f"[OK] {progress} {data['folder']}: {data['report']}")
+        if not events and job.is_finished():
+            return
+
+
+def summarize(jobs, total, elapsed):
+    """Totaux de l'execution: matchs analyses, deja traites, en erreur, rounds et temps par etape"""
+    summary = {'analyzed': 0, 'cached': 0, 'errors': 0, 'rounds': 0, 'stages': {}}
+    for job in jobs:
+        snapshot = job.snapshot()
+        for match in snapshot['matches']:
+            if match['status'] == DONE and match.get('cached'):
+                summary['cached'] += 1
+            elif match['status'] == DONE:
+                summary['analyzed'] += 1
+                # Rounds parses (rounds_done compte aussi les rounds en echec)
+                summary['rounds'] += match.get('rounds', 0)
+            elif match['status'] == ERROR:
+                summary['errors'] += 1
+        for stage, seconds in ((job.result or {}).get('timings') or {}).items():
+            if stage in STAGES:
+                summary['stages'][stage] = summary['stages'].get(stage, 0.0) + seconds
+    # Matchs des jobs annules (interruption) ou dont le dossier a disparu
+    summary['skipped'] = total - summary['analyzed'] - summary['cached'] - summary['errors']
+    summary['elapsed'] = elapsed
+    return summary
+
+
+def print_summary(summary, workers, interrupted=False):
+    elapsed = summary['elapsed']
+    print(f"\n{'='*60}")
+    if interrupted:
+        print(f"[WARNING] Analyse en lot interrompue apres {elapsed:.1f} s ({workers} workers r6-dissect)")
+    else:
+        print(f"[SUCCESS] Analyse en lot terminee en {elapsed:.1f} s ({workers} workers r6-dissect)")
+    print(f"{'='*60}")
+    print(f"Matchs analyses: {summary['analyzed']}  deja traites: {summary['cached']}  "
+          f"erreurs: {summary['errors']}" + (f"  non traites: {summary['skipped']}" if summary['skipped'] else ''))
+    print(f"Rounds analyses: {summary['rounds']}")
+    if elapsed > 0:
+        print(f"Debit: {summary['analyzed'] / elapsed:.2f} matchs/s, {summary['rounds'] / elapsed:.1f} rounds/s")
+    if summary['stages']:
+        # Temps cumules par tous les workers: peut depasser la duree totale
+        print("Temps par etape (cumules): " + ', '.join(
+            f"{stage} {summary['stages'][stage]:.1f} s" for stage in STAGES if stage in summary['stages']))
+
+
+def main(argv=None):
+    """Point d'entree CLI: catalogue, analyse par lots et resume du debit"""
+    # Fix encoding for Windows console
+    if sys.platform == 'win32':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'replace')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'replace')
+
+    args = parse_args(argv)
+    config = load_config()
+
+    paths = args.paths or ([config['replay_path']] if config.get('replay_path') else [])
+    if not paths:
+        print("[ERROR] Aucun dossier a analyser (argument ou replay_path de data/config.json)")
+        return 2
+    if not os.path.exists(args.r6_dissect):
+        print(f"[ERROR] r6-dissect introuvable: {args.r6_dissect}")
+        return 2
+
+    started = time.perf_counter()
+    match_dirs = find_match_dirs(paths)
+    if not match_dirs:
+        print("[WARNING] Aucun match trouve")
+        return 0
+
+    # Memes dossiers que l'interface web: les rapports apparaissent dans /reports
+    max_mb = config.get('round_cache_max_mb')
+    round_cache = RoundCache(os.path.join(DATA_DIR, 'cache', 'rounds'),
+                             int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES)
+    pool = get_dissect_pool(args.workers or config.get('dissect_workers'), cache=round_cache)
+    results = ResultStore(os.path.join(DATA_DIR, 'results'), os.path.join(DATA_DIR, 'reports'))
+    report_cache = None if args.force else ReportCache(os.path.join(DATA_DIR, 'cache', 'reports.json'),
+                                                        results.results_folder)
+    events = None if args.no_events else EventStore(os.path.join(DATA_DIR, 'events.db'))
+    options = load_engine().build_options(
+        stats=args.stats.split(',') if args.stats else None,
+        players_mode=args.players_mode,
+        players=args.players.split(',') if args.players else [],
+        include_atk=not args.no_atk,
+        include_def=not args.no_def,
+        include_global=not args.no_global,
+    )
+
+    # Metadonnees (map, type, date) depuis l'en-tete des .rec, r6-dissect pour les maps inconnues
+    catalog = MatchCatalog(os.path.join(DATA_DIR, 'catalog.json'))
+
+    def submit(match_dir, rec_files):
+        return pool.submit(dissect_match_metadata, catalog, args.r6_dissect, match_dir, rec_files, cache=round_cache)
+
+    try:
+        matches = scan_match_dirs(catalog, match_dirs, submit=submit)
+    finally:
+        catalog.save()
+    matches.sort(key=lambda m: (m.get('date') or '', m['folder']))
+    print(f"[OK] {len(matches)} match(s) a traiter sur {len(match_dirs)} dossier(s) "
+          f"({time.perf_counter() - started:.1f} s de catalogue)")
+
+    manager = JobManager(max_concurrent=CONCURRENT_BATCHES)
+    jobs = [
+        manager.submit(analyze_selection, matches[i:i + args.batch_size], {'mode': 'all'}, options,
+                       args.r6_dissect, pool, results, events=events, report_cache=report_cache, kind='batch')
+        for i in range(0, len(matches), args.batch_size)
+    ]
+    counters = {'finished': 0, 'total': len(matches)}
+    interrupted = False
+    try:
+        for job in jobs:
+            follow_job(job, counters)
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\n[WARNING] Interruption: arret apres les matchs en cours...")
+        for job in jobs:
+            job.cancel()
+        # Les jobs annules abandonnent eux-memes leurs rounds pas encore demarres; le pool
+        # n'est arrete qu'ensuite (un job encore en phase 1 soumet des rounds au pool)
+        for job in jobs:
+            while not job.is_finished():
+                time.sleep(0.2)
+        pool.shutdown(cancel_futures=True)
+
+    formats = list(args.export)
+    for job in jobs:
+        for report in (job.result or {}).get('reports', []):
+            for fmt in export_result(results, report['result'], formats):
+                formats.remove(fmt)
+
+    interrupted = interrupted or any(job.status == CANCELLED for job in jobs)
+    summary = summarize(jobs, len(matches), time.perf_counter() - started)
+    print_summary(summary, pool.max_workers, interrupted)
+    if interrupted:
+        return 130
+    return 1 if summary['errors'] and not (summary['analyzed'] or summary['cached']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
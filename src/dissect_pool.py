@@ -0,0 +1,289 @@
+"""
+Pool borne d'executions de r6-dissect
+Les rounds de tous les matchs selectionnes sont parses en parallele. La sortie de
+r6-dissect est lue sur stdout et reduite en memoire (RoundRecord), sans fichier
+JSON intermediaire (sauf pour une version de l'outil qui n'ecrit que via -o);
+l'ecriture sur disque ne sert qu'au cache de rounds et au mode debug (keep_dir)
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import get_metrics
+from round_loader import parse_round
+
+
+def default_max_workers():
+    """Nombre de workers par defaut: un r6-dissect par coeur"""
+    return max(1, os.cpu_count() or 1)
+
+
+# Increment de nice de r6-dissect en travail de fond (POSIX)
+LOW_PRIORITY_NICE = 10
+
+
+# Outils r6-dissect deja vus, selon l'endroit ou ils ecrivent le JSON (stdout ou fichier -o)
+_stdout_tools = set()
+_file_output_tools = set()
+
+
+def _looks_like_json(data):
+    return data.lstrip()[:1] in (b'{', b'[')
+
+
+def _run_tool(args, timeout, low_priority):
+    """Lancer r6-dissect, sortie capturee; low_priority: sous la priorite normale (travail de fond)
+
+    Sous POSIX la priorite du processus est baissee juste apres son lancement
+    (os.setpriority): preexec_fn n'est pas sur quand d'autres threads tournent.
+    """
+    if not low_priority or sys.platform == 'win32':
+        options = {'creationflags': subprocess.BELOW_NORMAL_PRIORITY_CLASS} if low_priority else {}
+        return subprocess.run(args, capture_output=True, timeout=timeout, **options)
+
+    with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+        try:
+            niceness = min(os.getpriority(os.PRIO_PROCESS, 0) + LOW_PRIORITY_NICE, 19)
+            os.setpriority(os.PRIO_PROCESS, proc.pid, niceness)
+        except OSError:
+            pass  # processus deja termine
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise
+    return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
+
+
+def _run_with_output_file(r6_dissect, rec_path, timeout, low_priority):
+    """r6-dissect avec -o vers un fichier temporaire, retourne (completed, JSON lu)"""
+    fd, out_path = tempfile.mkstemp(prefix='r6-dissect-', suffix='.json')
+    os.close(fd)
+    try:
+        completed = _run_tool([r6_dissect, rec_path, '-o', out_path], timeout, low_priority)
+        data = b''
+        if completed.returncode == 0:
+            try:
+                with open(out_path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                pass
+        return completed, data
+    finally:
+        try:
+            os.remove(out_path)
+        except OSError:
+            pass
+
+
+def run_dissect(r6_dissect, rec_path, timeout=None, low_priority=False):
+    """Parser un fichier .rec, retourne le JSON produit par r6-dissect (bytes), ou None
+
+    Le JSON est lu sur stdout; si l'outil n'y ecrit rien d'exploitable, il est relance avec
+    -o vers un fichier temporaire (retenu pour les rounds suivants).
+    low_priority: r6-dissect tourne avec une priorite reduite (ne ralentit pas les analyses interactives).
+    """
+    metrics = get_metrics()
+    try:
+        if r6_dissect in _file_output_tools:
+            completed, data = _run_with_output_file(r6_dissect, rec_path, timeout, low_priority)
+        else:
+            completed = _run_tool([r6_dissect, rec_path], timeout, low_priority)
+            data = completed.stdout
+            if completed.returncode == 0 and _looks_like_json(data):
+                _stdout_tools.add(r6_dissect)
+            elif r6_dissect not in _stdout_tools:
+                completed, data = _run_with_output_file(r6_dissect, rec_path, timeout, low_priority)
+                if completed.returncode == 0 and _looks_like_json(data):
+                    print("[DEBUG] r6-dissect n'ecrit pas le JSON sur stdout, sortie par fichier (-o)")
+                    _file_output_tools.add(r6_dissect)
+    except subprocess.TimeoutExpired:
+        print(f"[WARNING] r6-dissect timeout sur {os.path.basename(rec_path)}")
+        metrics.inc('rounds_dissected_total', result='timeout')
+        metrics.inc('errors_total', stage='dissect')
+        return None
+
+    if completed.returncode != 0:
+        stderr = completed.stderr.decode('utf-8', 'replace').strip()
+        print(f"[WARNING] r6-dissect a echoue sur {os.path.basename(rec_path)} (code {completed.returncode})"
+              + (f": {stderr[-500:]}" if stderr else ''))
+    if completed.returncode != 0 or not data.strip():
+        metrics.inc('rounds_dissected_total', result='failed')
+        metrics.inc('errors_total', stage='dissect')
+        return None
+    metrics.inc('rounds_dissected_total', result='ok')
+    return data
+
+
+def dissect_round(r6_dissect, rec_path, timeout=None, cache=None, low_priority=False, timings=None):
+    """Comme run_dissect, mais sert le round depuis le cache (RoundCache) quand le .rec est connu
+
+    timings: JobTimings optionnel qui recoit la duree de r6-dissect (sinon metriques globales).
+    """
+    add_timing = timings.add if timings is not None else get_metrics().observe_stage
+    key = None
+    if cache is not None:
+        try:
+            key = cache.key(rec_path, r6_dissect)
+        except OSError as e:
+            print(f"[WARNING] Empreinte impossible pour {os.path.basename(rec_path)} ({e})")
+        else:
+            data = cache.get(key)
+            if data is not None:
+                return data
+
+    t0 = time.perf_counter()
+    data = run_dissect(r6_dissect, rec_path, timeout, low_priority)
+    add_timing('dissect', time.perf_counter() - t0)
+    if data is not None and key is not None:
+        cache.put(key, data)
+    return data
+
+
+def load_round_record(r6_dissect, rec_path, timeout=None, cache=None, keep_path=None, timings=None):
+    """r6-dissect puis reduction du JSON en RoundRecord (None si le round est illisible)
+
+    keep_path: ecrire aussi le JSON sur disque (mode debug, relisible par la CLI du moteur).
+    """
+    data = dissect_round(r6_dissect, rec_path, timeout, cache, timings=timings)
+    if data is None:
+        return None
+
+    metrics = get_metrics()
+    add_timing = timings.add if timings is not None else metrics.observe_stage
+    if keep_path:
+        try:
+            with open(keep_path, 'wb') as f:
+                f.write(data)
+        except OSError as e:
+            print(f"[WARNING] JSON de {os.path.basename(rec_path)} non conserve ({e})")
+
+    t0 = time.perf_counter()
+    try:
+        record = parse_round(data)
+    except ValueError as e:
+        print(f"[WARNING] {os.path.basename(rec_path)}: JSON invalide ({e}), ignore")
+        metrics.inc('errors_total', stage='load')
+        return None
+    add_timing('load', time.perf_counter() - t0)
+    metrics.inc('rounds_parsed_total')
+    metrics.inc('bytes_parsed_total', len(data))
+    return record
+
+
+class DissectPool:
+    """Pool de threads qui lance les r6-dissect en parallele (max_workers a la fois)
+
+    Les threads attendent surtout les sous-processus (le travail reel est reparti
+    sur les coeurs par le systeme), puis reduisent le JSON de leur round.
+    """
+
+    def __init__(self, max_workers=None, cache=None):
+        self.max_workers = max_workers or default_max_workers()
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='r6-dissect'
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+
+    def _track(self, fn, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _forget(self, future):
+        # Tache annulee avant d'avoir demarre: elle ne passera jamais par _track
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def submit(self, fn, *args, **kwargs):
+        """Executer une tache quelconque dans le pool (retourne un Future)"""
+        with self._lock:
+            self._queued += 1
+        future = self._executor.submit(self._track, fn, args, kwargs)
+        future.add_done_callback(self._forget)
+        return future
+
+    def load_rounds(self, r6_dissect, rounds, timeout=None, keep_dir=None, timings=None):
+        """Soumettre une liste de (numero, rec_path) a r6-dissect
+
+        Chaque round est reduit en RoundRecord dans le pool, des que r6-dissect a
+        termine (les rounds deja parses sont servis par le cache de rounds).
+        keep_dir: dossier ou conserver les roundNN.json (mode debug).
+        Retourne la liste des (numero, future) dans l'ordre des rounds, a attendre
+        avec gather_rounds().
+        """
+        submitted = []
+        for idx, rec_path in rounds:
+            keep_path = os.path.join(keep_dir, f"round{idx:02d}.json") if keep_dir else None
+            submitted.append((idx, self.submit(load_round_record, r6_dissect, rec_path, timeout,
+                                               self.cache, keep_path, timings)))
+        return submitted
+
+    def stats(self):
+        """Workers, taches en attente d'un worker et taches en cours"""
+        with self._lock:
+            return {'workers': self.max_workers, 'queued': self._queued, 'running': self._running}
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """Arreter le pool; cancel_futures: abandonner les rounds pas encore demarres"""
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def gather_rounds(submitted):
+    """Attendre les rounds soumis, retourne les (numero, RoundRecord) lus avec succes, dans l'ordre"""
+    parsed = []
+    for idx, future in submitted:
+        try:
+            record = future.result()
+        except Exception as e:
+            print(f"[WARNING] Round {idx:02d}: echec de r6-dissect ({e})")
+            record = None
+        if record is not None:
+            parsed.append((idx, record))
+    return parsed
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_dissect_pool(max_workers=None, cache=None):
+    """Pool partage par tout le processus (cree au premier appel)
+
+    max_workers: valeur configuree (config.json 'dissect_workers'), sinon la variable
+    d'environnement R6_DISSECT_WORKERS, sinon le nombre de coeurs.
+    cache: RoundCache optionnel utilise par dissect().
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if not max_workers:
+                try:
+                    max_workers = int(os.environ.get('R6_DISSECT_WORKERS', 0))
+                except ValueError:
+                    max_workers = 0
+            _pool = DissectPool(max_workers or None, cache=cache)
+        return _pool
+
+
+def pool_stats():
+    """stats() du pool partage, ou None s'il n'a pas encore ete cree"""
+    with _pool_lock:
+        pool = _pool
+    return pool.stats() if pool is not None else None
@@ -0,0 +1,199 @@
+"""
+Base d'evenements de tous les matchs analyses (SQLite)
+Une ligne par kill, plante et diffuse, avec joueur, side, map, match et round:
+les requetes multi-matchs ne relancent plus r6-dissect
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+# Incrementer quand le schema change: la base est alors reconstruite
+SCHEMA_VERSION = 1
+
+EVENT_KILL = 'Kill'
+EVENT_PLANT = 'DefuserPlantComplete'
+EVENT_DEFUSE = 'DefuserDisableComplete'
+
+SIDE_LABELS = ('atk', 'def')  # index = side du RoundRecord (ATK, DEF)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id          INTEGER PRIMARY KEY,
+    match_key   TEXT NOT NULL UNIQUE,
+    folder      TEXT,
+    map         TEXT,
+    match_type  TEXT,
+    date        TEXT,
+    rounds      INTEGER,
+    ingested    REAL
+);
+CREATE TABLE IF NOT EXISTS events (
+    match_id    INTEGER NOT NULL,
+    round       INTEGER NOT NULL,
+    seq         INTEGER NOT NULL,
+    type        TEXT NOT NULL,
+    time_sec    REAL,
+    player      TEXT,
+    side        TEXT,
+    team        INTEGER,
+    target      TEXT,
+    target_side TEXT,
+    headshot    INTEGER,
+    opening     INTEGER NOT NULL DEFAULT 0,
+    map         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_player ON events (player, type, map);
+CREATE INDEX IF NOT EXISTS idx_events_target ON events (target, type, map);
+CREATE INDEX IF NOT EXISTS idx_events_map ON events (map, type);
+CREATE INDEX IF NOT EXISTS idx_events_match ON events (match_id, round);
+"""
+
+# Filtres acceptes par query_events(): nom -> expression SQL
+FILTERS = {
+    'player': 'e.player = ?',
+    'target': 'e.target = ?',
+    'type': 'e.type = ?',
+    'side': 'e.side = ?',
+    'map': 'e.map = ?',
+    'round': 'e.round = ?',
+    'opening': 'e.opening = ?',
+    'headshot': 'e.headshot = ?',
+    'match': 'm.folder = ?',
+    'match_type': 'm.match_type = ?',
+}
+
+
+class EventRecorder:
+    """Collecte les evenements d'un match, a passer comme on_round au moteur"""
+
+    def __init__(self):
+        self.rows = []
+        self.rounds = 0
+
+    def __call__(self, round_num, record):
+        self.rounds = max(self.rounds, round_num)
+        sides = record.sides
+        teams = record.teams
+
+        def side_of(username):
+            side = sides.get(username)
+            return SIDE_LABELS[side] if side is not None else None
+
+        seq = 0
+        for i, (killer, victim, headshot, time_sec) in enumerate(record.kills):
+            seq += 1
+            self.rows.append((round_num, seq, EVENT_KILL, time_sec, killer, side_of(killer), teams.get(killer),
+                              victim, side_of(victim), 1 if headshot else 0, 1 if i == 0 else 0))
+        for event_type, entries in ((EVENT_PLANT, record.plants), (EVENT_DEFUSE, record.defuses)):
+            for username, time_sec in entries:
+                seq += 1
+                self.rows.append((round_num, seq, event_type, time_sec, username, side_of(username),
+                                  teams.get(username), None, None, None, 0))
+
+
+class EventStore:
+    """Evenements indexes par joueur, map, type et match dans une base SQLite
+
+    Re-analyser un match remplace ses evenements (cle: dossier du match).
+    Une seule connexion partagee, protegee par un verrou: les ecritures sont
+    courtes (une transaction par match) et les lectures passent par les index.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._lock, self._conn:
+            version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                print(f"[WARNING] Base d'evenements en version {version}, reconstruction")
+                self._conn.execute('DROP TABLE IF EXISTS events')
+                self._conn.execute('DROP TABLE IF EXISTS matches')
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def save_match(self, match_key, recorder, folder=None, map_name=None, match_type=None, date=None):
+        """Remplacer les evenements d'un match par ceux collectes par recorder (EventRecorder)"""
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT id FROM matches WHERE match_key = ?', (match_key,)).fetchone()
+            if row is not None:
+                match_id = row['id']
+                self._conn.execute('DELETE FROM events WHERE match_id = ?', (match_id,))
+                self._conn.execute(
+                    'UPDATE matches SET folder = ?, map = ?, match_type = ?, date = ?, rounds = ?, ingested = ? '
+                    'WHERE id = ?',
+                    (folder, map_name, match_type, date, recorder.rounds, time.time(), match_id)
+                )
+            else:
+                match_id = self._conn.execute(
+                    'INSERT INTO matches (match_key, folder, map, match_type, date, rounds, ingested) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (match_key, folder, map_name, match_type, date, recorder.rounds, time.time())
+                ).lastrowid
+
+            self._conn.executemany(
+                'INSERT INTO events (match_id, round, seq, type, time_sec, player, side, team, target, '
+                'target_side, headshot, opening, map) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(match_id,) + event + (map_name,) for event in recorder.rows]
+            )
+        return len(recorder.rows)
+
+    def query_events(self, limit=1000, offset=0, **filters):
+        """Evenements filtres (voir FILTERS), tries par match, round et ordre dans le round
+
+        Ex: query_events(player='X', map='Villa', type='Kill', opening=1)
+        """
+        where = []
+        params = []
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name not in FILTERS:
+                raise ValueError(f"Filtre inconnu: {name}")
+            where.append(FILTERS[name])
+            params.append(value)
+
+        sql = ('SELECT m.folder AS match, m.match_type, m.date, e.map, e.round, e.seq, e.type, e.time_sec, '
+               'e.player, e.side, e.team, e.target, e.target_side, e.headshot, e.opening '
+               'FROM events e JOIN matches m ON m.id = e.match_id')
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY m.date, m.folder, e.round, e.seq LIMIT ? OFFSET ?'
+        params.extend([int(limit), int(offset)])
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def list_matches(self):
+        """Matchs presents dans la base"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT m.folder, m.map, m.match_type, m.date, m.rounds, m.ingested, COUNT(e.rowid) AS events '
+                'FROM matches m LEFT JOIN events e ON e.match_id = m.id GROUP BY m.id ORDER BY m.date, m.folder'
+            )
+            return [dict(row) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            matches = self._conn.execute('SELECT COUNT(*) FROM matches').fetchone()[0]
+            events = self._conn.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+        return {'matches': matches, 'events': events}
+
+    def clear(self):
+        """Vider la base"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM events')
+            self._conn.execute('DELETE FROM matches')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,214 @@
+"""
+Jobs d'analyse asynchrones
+Le POST retourne immediatement un identifiant, le travail tourne en arriere-plan
+et la progression est publiee sous forme d'evenements (polling ou Server-Sent Events)
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import get_metrics
+
+# Etats d'un job
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+ERROR = 'error'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, ERROR, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Levee dans le job quand l'utilisateur a demande l'annulation"""
+
+
+class Job:
+    """Un job d'analyse: etat, progression par match et par round, evenements
+
+    Utilisable sans JobManager (ex: ligne de commande) pour suivre une analyse.
+    """
+
+    def __init__(self, kind='analyze'):
+        self.id = uuid.uuid4().hex[:16]
+        self.kind = kind
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.error = None
+        self.result = None
+        self.matches = []  # progression par match (dicts)
+        self._events = []
+        self._cond = threading.Condition(threading.RLock())
+        self._cancel = threading.Event()
+
+    # -- evenements -------------------------------------------------------
+
+    def emit(self, event_type, **data):
+        """Publier un evenement (thread-safe) et reveiller les lecteurs"""
+        with self._cond:
+            data['seq'] = len(self._events) + 1
+            data['time'] = round(time.time() - self.created, 3)
+            self._events.append((event_type, data))
+            self._cond.notify_all()
+
+    def events_since(self, seq, timeout=None):
+        """Evenements publies apres seq; attend jusqu'a timeout s'il n'y en a aucun"""
+        with self._cond:
+            if len(self._events) <= seq and not self.is_finished() and timeout:
+                self._cond.wait(timeout)
+            return self._events[seq:]
+
+    # -- progression ------------------------------------------------------
+
+    def add_match(self, folder, rounds_total):
+        """Declarer un match du job, retourne son index"""
+        with self._cond:
+            self.matches.append({
+                'folder': folder,
+                'status': QUEUED,
+                'rounds_total': rounds_total,
+                'rounds_done': 0,
+                'timings': {},
+                'report': None,
+            })
+            return len(self.matches) - 1
+
+    def update_match(self, index, **fields):
+        with self._cond:
+            self.matches[index].update(fields)
+
+    def round_done(self, index, round_num, ok):
+        """Un round d'un match est parse (ou en echec)"""
+        with self._cond:
+            match = self.matches[index]
+            match['rounds_done'] += 1
+            rounds_done = match['rounds_done']
+        self.emit('round', match=index, round=round_num, ok=ok,
+                  rounds_done=rounds_done, rounds_total=match['rounds_total'])
+
+    def set_status(self, status, **data):
+        with self._cond:
+            self.status = status
+            if status == RUNNING:
+                self.started = time.time()
+            elif status in FINISHED_STATES:
+                self.finished = time.time()
+            # Meme verrou: un lecteur ne voit jamais l'etat final sans son evenement
+            self.emit('status', status=status, **data)
+
+    # -- annulation -------------------------------------------------------
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        """A appeler entre deux etapes: leve JobCancelled si l'annulation est demandee"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def is_finished(self):
+        return self.status in FINISHED_STATES
+
+    def snapshot(self):
+        """Etat complet du job, serialisable en JSON"""
+        with self._cond:
+            matches = [dict(m, timings=dict(m['timings'])) for m in self.matches]
+            rounds_total = sum(m['rounds_total'] for m in matches)
+            rounds_done = sum(m['rounds_done'] for m in matches)
+            end = self.finished or time.time()
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'error': self.error,
+                'result': self.result,
+                'matches': matches,
+                'progress': {
+                    'matches_total': len(matches),
+                    'matches_done': sum(1 for m in matches if m['status'] in FINISHED_STATES),
+                    'rounds_total': rounds_total,
+                    'rounds_done': rounds_done,
+                    'percent': round(100.0 * rounds_done / rounds_total, 1) if rounds_total else 0.0,
+                },
+                'elapsed': round(end - (self.started or self.created), 3),
+                'events': len(self._events),
+            }
+
+
+class JobManager:
+    """Execute les jobs en arriere-plan (max_concurrent a la fois) et garde les derniers termines"""
+
+    def __init__(self, max_concurrent=2, keep_finished=100):
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, kind='analyze', **kwargs):
+        """Lancer fn(job, *args, **kwargs) en arriere-plan, retourne le Job
+
+        La valeur de retour de fn devient job.result; JobCancelled termine le job
+        en 'cancelled', toute autre exception en 'error'.
+        """
+        job = Job(kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_old_locked()
+        job.emit('status', status=QUEUED)
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            job.set_status(CANCELLED)
+            return
+
+        job.set_status(RUNNING)
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.set_status(DONE, result=job.result)
+        except JobCancelled:
+            job.set_status(CANCELLED)
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+            job.set_status(ERROR, error=job.error)
+            get_metrics().inc('errors_total', stage='job')
+        finally:
+            get_metrics().inc('jobs_total', kind=job.kind, status=job.status)
+
+    def _forget_old_locked(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished()]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Demander l'annulation d'un job, retourne le job (ou None s'il est inconnu)"""
+        job = self.get(job_id)
+        if job is not None and not job.is_finished():
+            job.cancel()
+            job.emit('cancelling')
+        return job
+
+    def active_count(self):
+        """Nombre de jobs en attente ou en cours"""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.is_finished())
+
+    def list(self):
+        with self._lock:
+            return [job.snapshot() for job in self._jobs.values()]
@@ -0,0 +1,154 @@
+"""
+Catalogue persistant des metadonnees de matchs
+Evite de relancer r6-dissect sur chaque dossier Match-* a chaque listing. Les noms
+de maps et de types de match vus dans les sorties de r6-dissect y sont aussi
+appris: l'en-tete des .rec ne contient que leurs identifiants
+"""
+
+import json
+import os
+import threading
+
+# Incrementer pour invalider les catalogues ecrits par une version incompatible
+CATALOG_VERSION = 1
+
+
+def normalize_match_path(match_dir):
+    """Cle stable pour un dossier de match (chemin absolu, casse normalisee sous Windows)"""
+    return os.path.normcase(os.path.abspath(match_dir))
+
+
+def folder_signature(match_dir):
+    """Signature d'un dossier de match: nom, taille et mtime de chaque fichier .rec"""
+    signature = []
+    with os.scandir(match_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.rec') and entry.is_file():
+                st = entry.stat()
+                signature.append([entry.name, st.st_size, st.st_mtime_ns])
+    signature.sort()
+    return signature
+
+
+class MatchCatalog:
+    """Metadonnees des matchs indexees par dossier, persistees dans un fichier JSON
+
+    Une entree n'est valide que si la signature des .rec (noms, tailles, mtimes)
+    est identique a celle enregistree: un dossier nouveau ou modifie est re-analyse.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._names = {}  # 'map' / 'matchType' -> {identifiant (str): nom}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """Charger le catalogue depuis le disque (catalogue vide si absent ou invalide)"""
+        entries = {}
+        names = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CATALOG_VERSION:
+                    entries = data.get('matches', {})
+                    names = data.get('names', {})
+        except Exception as e:
+            print(f"[WARNING] Catalogue illisible, reconstruction ({e})")
+
+        with self._lock:
+            self._entries = entries
+            self._names = names
+            self._dirty = False
+
+    def save(self):
+        """Ecrire le catalogue sur le disque si modifie (ecriture atomique)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {
+                'version': CATALOG_VERSION,
+                'matches': dict(self._entries),
+                'names': {kind: dict(names) for kind, names in self._names.items()},
+            }
+            self._dirty = False
+
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"[ERROR] Erreur lors de la sauvegarde du catalogue: {e}")
+            with self._lock:
+                self._dirty = True
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def lookup(self, match_dir, signature):
+        """Retourner (trouve, metadonnees) pour un dossier dont la signature n'a pas change"""
+        with self._lock:
+            entry = self._entries.get(normalize_match_path(match_dir))
+
+        if entry is None or entry.get('signature') != signature:
+            return False, None
+
+        return True, entry.get('metadata')
+
+    def store(self, match_dir, signature, metadata):
+        """Enregistrer les metadonnees d'un dossier (None = dossier illisible par r6-dissect)"""
+        with self._lock:
+            self._entries[normalize_match_path(match_dir)] = {
+                'signature': signature,
+                'metadata': metadata,
+            }
+            self._dirty = True
+
+    def prune(self, replay_path, existing_dirs):
+        """Supprimer les entrees des dossiers de replay_path qui n'existent plus
+
+        Les entrees d'un autre dossier MatchReplay (ancienne configuration) sont conservees.
+        Retourne le nombre d'entrees supprimees.
+        """
+        root = os.path.join(normalize_match_path(replay_path), '')
+        keep = {normalize_match_path(d) for d in existing_dirs}
+        with self._lock:
+            stale = [key for key in self._entries if key.startswith(root) and key not in keep]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._dirty = True
+        return len(stale)
+
+    def learn_name(self, kind, ident, name):
+        """Memoriser le nom d'une map ou d'un type de match (kind: 'map', 'matchType')"""
+        if ident is None or not name:
+            return
+        with self._lock:
+            names = self._names.setdefault(kind, {})
+            if names.get(str(ident)) != name:
+                names[str(ident)] = name
+                self._dirty = True
+
+    def name_for(self, kind, ident):
+        """Nom appris pour un identifiant, ou None"""
+        if ident is None:
+            return None
+        with self._lock:
+            return self._names.get(kind, {}).get(str(ident))
+
+    def clear(self):
+        """Vider le catalogue (reconstruction complete au prochain listing)
+
+        Les noms appris sont conserves: ils ne dependent d'aucun dossier.
+        """
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,198 @@
+"""
+Metadonnees des matchs (map, type, date, rounds, equipes, joueurs)
+Lues dans l'en-tete du premier .rec quand les noms de la map et du type de match
+sont connus du catalogue, sinon extraites par r6-dissect (qui les apprend au
+passage). Independant de Flask: utilise par l'interface web et le mode batch
+"""
+
+import os
+import re
+
+from dissect_pool import dissect_round
+from match_catalog import folder_signature
+from metrics import get_metrics
+from rec_header import read_header, HeaderError
+from round_loader import loads_json
+
+
+def list_rec_files(match_dir):
+    """Fichiers .rec d'un match, dans l'ordre des rounds"""
+    return sorted(f for f in os.listdir(match_dir) if f.endswith('.rec'))
+
+
+def build_match_metadata(match_dir, rec_files, map_name, match_type_raw, match_type_id, timestamp,
+                         teams=None, players=None):
+    """Metadonnees d'un match affichees dans la liste (en-tete du .rec ou sortie de r6-dissect)"""
+    folder_name = os.path.basename(match_dir)
+
+    # Nombre de rounds (fichiers .rec)
+    num_rounds = len(rec_files)
+
+    # Classification du type de match
+    if match_type_id == 2 or (num_rounds >= 4 and num_rounds <= 9):
+        match_category = 'ranked'
+    elif num_rounds == 12:
+        match_category = 'scrim'
+    else:
+        match_category = 'custom'
+
+    # Parser le timestamp du nom de dossier (Match-YYYY-MM-DD_HH-MM-SS-XX)
+    match_date = None
+    match_pattern = re.match(r'Match-(\d{4}-\d{2}-\d{2})_(\d{2})-(\d{2})-(\d{2})', folder_name)
+    if match_pattern:
+        date_str = match_pattern.group(1)
+        time_str = f"{match_pattern.group(2)}:{match_pattern.group(3)}:{match_pattern.group(4)}"
+        match_date = f"{date_str} {time_str}"
+
+    return {
+        'folder': folder_name,
+        'path': match_dir,
+        'map': map_name,
+        'matchType': match_type_raw,
+        'matchCategory': match_category,
+        'numRounds': num_rounds,
+        'date': match_date or timestamp,
+        'timestamp': timestamp,
+        'teams': teams or [],
+        'players': players or [],
+    }
+
+
+def read_match_header(match_dir, rec_files):
+    """En-tete du premier .rec d'un match (rec_header.read_header), ou None s'il est illisible"""
+    try:
+        return read_header(os.path.join(match_dir, rec_files[0]))
+    except (OSError, HeaderError) as e:
+        print(f"[DEBUG] En-tete illisible ({os.path.basename(match_dir)}): {e}")
+        return None
+
+
+def header_match_metadata(catalog, match_dir, rec_files, header=None, allow_unknown=False):
+    """Metadonnees lues dans l'en-tete du premier .rec, sans lancer r6-dissect
+
+    Retourne None si l'en-tete est illisible, ou si le nom de la map ou du type de
+    match n'a pas encore ete appris (sauf allow_unknown: 'Unknown', comme r6-dissect).
+    """
+    header = header or read_match_header(match_dir, rec_files)
+    if header is None:
+        return None
+
+    map_name = catalog.name_for('map', header['map_id'])
+    match_type_raw = catalog.name_for('matchType', header['match_type_id'])
+    if not (map_name and match_type_raw) and not allow_unknown:
+        return None
+
+    get_metrics().inc('metadata_total', source='header')
+    players = [{'username': p['username'], 'team': p['team']} for p in header['players']]
+    return build_match_metadata(match_dir, rec_files, map_name or 'Unknown', match_type_raw or 'Unknown',
+                                header['match_type_id'] or 0, header['timestamp'], header['teams'], players)
+
+
+def dissect_match_metadata(catalog, r6_dissect, match_dir, rec_files, cache=None, low_priority=False):
+    """Parser le premier fichier .rec d'un match avec r6-dissect et construire ses metadonnees
+
+    Les noms de map et de type de match sont appris au passage dans le catalogue:
+    les matchs suivants sur la meme map sont lus depuis l'en-tete des .rec.
+    """
+    first_rec = os.path.join(match_dir, rec_files[0])
+
+    try:
+        # Sortie de r6-dissect lue en memoire: aucun fichier partage entre listings paralleles
+        output = dissect_round(r6_dissect, first_rec, timeout=30, cache=cache, low_priority=low_priority)
+        if output is None:
+            return None
+
+        data = loads_json(output)
+
+        # Extraire les informations
+        map_info = data.get('map', {})
+        match_type = data.get('matchType', {})
+        map_name = map_info.get('name', 'Unknown')
+        match_type_raw = match_type.get('name', 'Unknown')
+        match_type_id = match_type.get('id', 0)
+        timestamp = data.get('timestamp', '')
+
+        catalog.learn_name('map', map_info.get('id'), map_info.get('name'))
+        catalog.learn_name('matchType', match_type.get('id'), match_type.get('name'))
+
+        teams = [team.get('name') for team in data.get('teams', []) if team.get('name')]
+        players = [{'username': p.get('username'), 'team': p.get('teamIndex')}
+                   for p in data.get('players', []) if p.get('username')]
+
+        get_metrics().inc('metadata_total', source='dissect')
+        return build_match_metadata(match_dir, rec_files, map_name, match_type_raw, match_type_id, timestamp,
+                                    teams, players)
+
+    except Exception as e:
+        print(f"[ERROR] Erreur lors de l'extraction des metadonnees: {e}")
+        return None
+
+
+def scan_match_dirs(catalog, match_dirs, submit=None):
+    """Metadonnees de chaque dossier de match, catalogue mis a jour (sans save ni prune)
+
+    Seuls les dossiers nouveaux ou modifies sont relus. submit(match_dir, rec_files)
+    lance dissect_match_metadata en parallele et retourne un Future; sans submit
+    (r6-dissect indisponible), un echec n'est pas memorise dans le catalogue.
+    """
+    matches = []
+
+    def collect(pending):
+        for match_dir, rec_files, signature, header, future in pending:
+            metadata = future.result() if future else None
+            # Sans r6-dissect, un echec n'est pas definitif: ne pas le memoriser
+            if metadata or submit is not None:
+                catalog.store(match_dir, signature, metadata)
+            elif header is not None:
+                # Afficher quand meme ce que l'en-tete contient (noms inconnus)
+                metadata = header_match_metadata(catalog, match_dir, rec_files, header, allow_unknown=True)
+
+            if metadata:
+                matches.append(metadata)
+
+    def launch(match_dir, rec_files):
+        return submit(match_dir, rec_files) if submit is not None and rec_files else None
+
+    unresolved = []
+    for match_dir in match_dirs:
+        signature = folder_signature(match_dir)
+        found, metadata = catalog.lookup(match_dir, signature)
+
+        if found:
+            if metadata:
+                matches.append(metadata)
+            continue
+
+        # En-tete du .rec lu directement: r6-dissect seulement si illisible ou map inconnue
+        rec_files = list_rec_files(match_dir)
+        header = read_match_header(match_dir, rec_files) if rec_files else None
+        metadata = header_match_metadata(catalog, match_dir, rec_files, header) if header else None
+        if metadata is not None:
+            catalog.store(match_dir, signature, metadata)
+            matches.append(metadata)
+        else:
+            unresolved.append((match_dir, rec_files, signature, header))
+
+    # Un seul r6-dissect par couple map/type inconnu (extractions en parallele dans le
+    # pool): les noms appris suffisent ensuite pour lire les autres matchs depuis leur en-tete
+    first, later, seen = [], [], set()
+    for match_dir, rec_files, signature, header in unresolved:
+        key = (header['map_id'], header['match_type_id']) if header else None
+        if key is not None and key in seen:
+            later.append((match_dir, rec_files, signature, header))
+            continue
+        seen.add(key)
+        first.append((match_dir, rec_files, signature, header, launch(match_dir, rec_files)))
+    collect(first)
+
+    pending = []
+    for match_dir, rec_files, signature, header in later:
+        metadata = header_match_metadata(catalog, match_dir, rec_files, header)
+        if metadata is not None:
+            catalog.store(match_dir, signature, metadata)
+            matches.append(metadata)
+        else:
+            pending.append((match_dir, rec_files, signature, header, launch(match_dir, rec_files)))
+    collect(pending)
+
+    return matches
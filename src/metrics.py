@@ -0,0 +1,205 @@
+"""
+Metriques du pipeline d'analyse (compteurs et temps par etape)
+Collectees dans tout le processus et exposees au format texte de Prometheus
+(/api/metrics). Chaque job garde aussi son propre detail par etape (JobTimings)
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = 'r6analyst_'
+
+# Etapes chronometrees:
+#   dissect       un r6-dissect (un round, hors cache)
+#   dissect_wait  attente des rounds d'un match (pool r6-dissect, cache compris)
+#   load          reduction de la sortie r6-dissect d'un round en RoundRecord
+#   stats         calcul des stats d'un match
+#   save          enregistrement du resultat (data/results)
+#   merge         fusion des totaux d'un rapport agrege
+#   excel         ecriture d'un classeur Excel (premier telechargement)
+#   export        export CSV / Parquet
+STAGES = ('dissect', 'dissect_wait', 'load', 'stats', 'save', 'merge', 'excel', 'export')
+
+# Bornes des histogrammes de temps (secondes)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# nom (sans prefixe) -> (type Prometheus, aide)
+DEFINITIONS = {
+    'stage_seconds': ('histogram', "Duree des etapes de l'analyse"),
+    'rounds_dissected_total': ('counter', "Rounds passes a r6-dissect (result: ok, failed, timeout)"),
+    'bytes_parsed_total': ('counter', "Octets de JSON de rounds parses"),
+    'rounds_parsed_total': ('counter', "Rounds parses en RoundRecord"),
+    'metadata_total': ('counter', "Metadonnees de matchs extraites (source: header, dissect)"),
+    'matches_analyzed_total': ('counter', "Matchs traites par les jobs (mode: match, aggregate)"),
+    'reports_cached_total': ('counter', "Rapports servis par le cache de rapports (mode: match, aggregate)"),
+    'errors_total': ('counter', "Erreurs par etape (dissect, dissect_match, analyze, job)"),
+    'jobs_total': ('counter', "Jobs termines par etat"),
+    'cache_hits_total': ('counter', "Succes des caches (cache: rounds, reports, aggregates)"),
+    'cache_misses_total': ('counter', "Echecs des caches (cache: rounds, reports, aggregates)"),
+    'cache_bytes': ('gauge', "Taille du cache de rounds sur disque"),
+    'dissect_workers': ('gauge', "Workers du pool r6-dissect"),
+    'dissect_queue_depth': ('gauge', "Rounds en attente d'un worker r6-dissect"),
+    'dissect_running': ('gauge', "r6-dissect en cours"),
+    'jobs_active': ('gauge', "Jobs en attente ou en cours"),
+    'reports': ('gauge', "Rapports disponibles"),
+    'uptime_seconds': ('gauge', "Temps depuis le demarrage du processus"),
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+class Metrics:
+    """Registre thread-safe des compteurs et histogrammes
+
+    Les valeurs tenues ailleurs (stats() des caches, du pool, des jobs) sont lues au
+    moment de l'export par des collecteurs: fonctions sans argument qui retournent
+    des (nom, labels, valeur).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (nom, labels) -> valeur
+        self._histograms = {}  # (nom, labels) -> [compte par borne..., somme, total]
+        self._collectors = []
+        self.started = time.time()
+
+    def inc(self, name, value=1, **labels):
+        """Incrementer un compteur"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Ajouter une mesure a un histogramme"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            values = self._histograms.get(key)
+            if values is None:
+                values = self._histograms[key] = [0] * (len(BUCKETS) + 2)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    values[i] += 1
+            values[-2] += seconds
+            values[-1] += 1
+
+    def observe_stage(self, stage, seconds):
+        self.observe('stage_seconds', seconds, stage=stage)
+
+    @contextmanager
+    def timer(self, stage):
+        """Chronometrer un bloc comme une etape (y compris s'il leve une exception)"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - t0)
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        """Toutes les metriques au format texte de Prometheus (version 0.0.4)"""
+        samples = {}  # nom -> [(labels, valeur)]
+        for collector in self._collectors:
+            try:
+                for name, labels, value in collector():
+                    samples.setdefault(name, []).append((_label_key(labels), value))
+            except Exception as e:
+                print(f"[WARNING] Collecte des metriques incomplete ({e})")
+        samples.setdefault('uptime_seconds', []).append(((), round(time.time() - self.started, 3)))
+
+        with self._lock:
+            for (name, key), value in self._counters.items():
+                samples.setdefault(name, []).append((key, value))
+            histograms = {}
+            for (name, key), values in self._histograms.items():
+                histograms.setdefault(name, []).append((key, list(values)))
+
+        lines = []
+        for name, (kind, help_text) in DEFINITIONS.items():
+            full_name = PREFIX + name
+            if kind == 'histogram':
+                series = sorted(histograms.get(name, []))
+                if not series:
+                    continue
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for key, values in series:
+                    for bound, count in zip(BUCKETS, values):
+                        lines.append(f"{full_name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {count}")
+                    lines.append(f"{full_name}_bucket{_format_labels(key, [('le', '+Inf')])} {values[-1]}")
+                    lines.append(f"{full_name}_sum{_format_labels(key)} {_format_value(float(values[-2]))}")
+                    lines.append(f"{full_name}_count{_format_labels(key)} {values[-1]}")
+                continue
+            series = sorted(samples.get(name, []))
+            if not series:
+                continue
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for key, value in series:
+                lines.append(f"{full_name}{_format_labels(key)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+class JobTimings:
+    """Temps cumules par etape pour un job, reportes aussi dans le registre global
+
+    summary() est joint au resultat de chaque analyse ('timings').
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or get_metrics()
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+        self.registry.observe_stage(stage, seconds)
+
+    @contextmanager
+    def stage(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - t0)
+
+    def summary(self):
+        """{etape: secondes} dans l'ordre de STAGES, plus 'total' (duree du job)"""
+        with self._lock:
+            summary = {stage: round(self._stages[stage], 3) for stage in STAGES if stage in self._stages}
+        summary['total'] = round(time.perf_counter() - self.started, 3)
+        return summary
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Registre partage par tout le processus"""
+    return _metrics
@@ -0,0 +1,474 @@
+"""
+Pipeline d'analyse des matchs: r6-dissect -> moteur de stats -> resultats (result_store)
+Independant de Flask: utilise par les jobs de l'interface web. Le rapport Excel
+n'est ecrit qu'au premier telechargement (ResultStore.excel)
+"""
+
+import os
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+from datetime import datetime
+
+from dissect_pool import gather_rounds
+from aggregate_store import files_signature
+from event_store import EventRecorder
+from jobs import Job, DONE, ERROR, RUNNING
+from match_catalog import normalize_match_path
+from metrics import JobTimings, get_metrics
+from report_cache import report_key
+from round_cache import file_fingerprint
+
+# Intervalle de verification de l'annulation pendant l'attente de r6-dissect
+CANCEL_POLL_INTERVAL = 0.5
+
+
+def load_engine():
+    """Moteur de stats, importe au premier besoin (pandas et NumPy coutent plus que tout le reste du serveur)"""
+    import analyze_match_complete
+    return analyze_match_complete
+
+
+def dissect_version(r6_dissect):
+    """Identite de r6-dissect (taille + mtime): une mise a jour invalide agregats et rapports"""
+    return '-'.join(str(part) for part in file_fingerprint(r6_dissect))
+
+
+def selection_fingerprint(match_path, rounds):
+    """(dossier, signature des .rec selectionnes, numeros de rounds) d'un match pour report_key"""
+    return match_path, files_signature(rec for _, rec in rounds), [idx for idx, _ in rounds]
+
+
+def get_rounds_to_parse(total_rounds, rounds_options):
+    """Determiner quels rounds parser selon les options"""
+    mode = rounds_options.get('mode', 'all')
+
+    if mode == 'all':
+        return set(range(1, total_rounds + 1))
+    elif mode == 'range':
+        start = max(1, rounds_options.get('start', 1))
+        end = min(total_rounds, rounds_options.get('end', total_rounds))
+        return set(range(start, end + 1))
+    elif mode == 'custom':
+        rounds_str = rounds_options.get('rounds', '')
+        rounds_set = set()
+
+        # Parser la chaine (ex: "1,2,3,5-8,12")
+        for part in rounds_str.split(','):
+            part = part.strip()
+            if '-' in part:
+                # Plage (ex: "5-8")
+                start, end = part.split('-')
+                start = max(1, int(start.strip()))
+                end = min(total_rounds, int(end.strip()))
+                rounds_set.update(range(start, end + 1))
+            else:
+                # Nombre unique
+                try:
+                    round_num = int(part)
+                    if 1 <= round_num <= total_rounds:
+                        rounds_set.add(round_num)
+                except ValueError:
+                    continue
+
+        return rounds_set if rounds_set else set(range(1, total_rounds + 1))
+
+    return set(range(1, total_rounds + 1))
+
+
+def build_report_name(match_info):
+    """Nom du rapport d'un match. Format: Map_DateGame_Type_DateAnalyse.xlsx"""
+    map_name = match_info.get('map', 'Unknown').replace(' ', '-')
+    match_category = match_info.get('matchCategory', 'custom').capitalize()
+
+    # Date du match
+    match_date = match_info.get('date', '')
+    if match_date:
+        try:
+            dt = datetime.strptime(match_date, '%Y-%m-%d %H:%M:%S')
+            date_game = dt.strftime('%Y-%m-%d')
+        except ValueError:
+            date_game = match_date.split(' ')[0] if ' ' in match_date else match_date[:10]
+    else:
+        date_game = 'Unknown'
+
+    # Date d'analyse
+    date_analyse = datetime.now().strftime('%Y-%m-%d_%H-%M')
+
+    return f"{map_name}_{date_game}_{match_category}_{date_analyse}.xlsx"
+
+
+def select_rounds(match_path, rounds_options):
+    """Rounds a parser d'un match: liste de (numero, chemin .rec)"""
+    # Parser tous les fichiers .rec du match
+    rec_files = sorted([f for f in os.listdir(match_path) if f.endswith('.rec')])
+
+    # Determiner quels rounds parser selon les options
+    rounds_to_parse = get_rounds_to_parse(len(rec_files), rounds_options)
+
+    return [
+        (idx, os.path.join(match_path, rec_file))
+        for idx, rec_file in enumerate(rec_files, 1)
+        if idx in rounds_to_parse
+    ]
+
+
+def build_aggregate_report_name(matches_count):
+    """Nom du rapport agrege. Format: Agregat_NMatchs_DateAnalyse.xlsx"""
+    date_analyse = datetime.now().strftime('%Y-%m-%d_%H-%M')
+    return f"Agregat_{matches_count}-matchs_{date_analyse}.xlsx"
+
+
+def save_events(events, match_path, match_info, recorder):
+    """Enregistrer les evenements d'un match dans la base (un echec n'interrompt pas l'analyse)"""
+    if events is None or recorder is None:
+        return
+    try:
+        count = events.save_match(
+            normalize_match_path(match_path),
+            recorder,
+            folder=match_info.get('folder') or os.path.basename(match_path),
+            map_name=match_info.get('map'),
+            match_type=match_info.get('matchType'),
+            date=match_info.get('date'),
+        )
+        print(f"[DEBUG] {count} evenements enregistres pour {match_info.get('folder')}")
+    except Exception as e:
+        print(f"[WARNING] Evenements non enregistres pour {match_info.get('folder')} ({e})")
+
+
+def keep_dir_for(keep_root, match_info, match_path):
+    """Dossier ou conserver les roundNN.json d'un match (mode debug), ou None"""
+    if not keep_root:
+        return None
+    path = os.path.join(keep_root, match_info.get('folder') or os.path.basename(match_path))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _wait_rounds(job, submitted_rounds):
+    """Attendre les rounds d'un match en restant reactif a l'annulation"""
+    pending = {future for _, future in submitted_rounds}
+    while pending:
+        if job.cancelled:
+            # Les r6-dissect pas encore demarres ne le seront pas
+            for _, future in submitted_rounds:
+                future.cancel()
+            job.check_cancelled()
+        _, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+
+
+def _track_round(job, match_index, round_num, future):
+    def on_done(f):
+        ok = not f.cancelled() and f.exception() is None and f.result()
+        job.round_done(match_index, round_num, bool(ok))
+    future.add_done_callback(on_done)
+
+
+def analyze_selection(job, matches, rounds_options, analysis_options,
+                      r6_dissect, pool, results, events=None, report_cache=None, keep_root=None):
+    """Analyser une selection de matchs et enregistrer un resultat par match
+
+    job: Job qui recoit la progression (par match et par round) et l'annulation.
+    Tous les rounds de tous les matchs sont soumis d'abord au pool r6-dissect, qui
+    les reduit en memoire des leur sortie, puis chaque match est analyse des que
+    ses rounds sont prets, dans l'ordre.
+    results: ResultStore qui recoit le tableau de chaque match (rapport Excel a la demande).
+    events: EventStore optionnel qui recoit les kills et objectifs de chaque match.
+    report_cache: ReportCache optionnel; un match deja analyse avec les memes rounds
+    et options renvoie son rapport existant sans passer par r6-dissect.
+    keep_root: dossier ou conserver les JSON de rounds (<keep_root>/<match>/roundNN.json,
+    mode debug); par defaut aucun JSON n'est ecrit hors du cache de rounds.
+    Retourne {'reports': [...], 'total': n, 'cached': n, 'timings': {etape: secondes}};
+    leve RuntimeError si aucun match n'aboutit.
+    """
+    if job is None:
+        job = Job()
+    metrics = get_metrics()
+    job_timings = JobTimings(metrics)
+    engine = load_engine()
+    version = dissect_version(r6_dissect) if report_cache is not None else ''
+
+    reports = []
+    cached = 0
+
+    # Phase 1: soumettre tous les rounds selectionnes de tous les matchs au pool r6-dissect
+    submitted_matches = []
+    for match_info in matches:
+        match_path = match_info.get('path')
+
+        if not match_path or not os.path.exists(match_path):
+            continue
+
+        rounds = select_rounds(match_path, rounds_options)
+
+        # Rapport deja genere pour ces rounds et ces options: le renvoyer tel quel
+        key = None
+        if report_cache is not None and rounds:
+            key = report_key('match', [selection_fingerprint(match_path, rounds)], analysis_options,
+                             engine.ENGINE_VERSION, version)
+            entry = report_cache.get(key)
+            if entry is not None:
+                folder = match_info.get('folder')
+                match_index = job.add_match(folder, 0)
+                filename = f"{entry['name']}.xlsx"
+                job.update_match(match_index, status=DONE, cached=True, report=filename)
+                job.emit('match', match=match_index, folder=folder, status=DONE, cached=True, report=filename)
+                reports.append({'filename': filename, 'result': entry['name'], 'match': folder,
+                                'rounds': entry['rounds'], 'cached': True})
+                cached += 1
+                metrics.inc('reports_cached_total', mode='match')
+                continue
+
+        match_index = job.add_match(match_info.get('folder'), len(rounds))
+        submitted_rounds = pool.load_rounds(r6_dissect, rounds, keep_dir=keep_dir_for(keep_root, match_info, match_path),
+                                            timings=job_timings)
+        for idx, future in submitted_rounds:
+            _track_round(job, match_index, idx, future)
+        submitted_matches.append((match_index, match_info, match_path, key, submitted_rounds))
+
+    print(f"[DEBUG] {sum(len(m[4]) for m in submitted_matches)} rounds soumis a r6-dissect "
+          f"({pool.max_workers} workers), {cached} rapport(s) deja generes")
+
+    # Phase 2: recuperer les rounds match par match, dans l'ordre, puis analyser
+    for match_index, match_info, match_path, key, submitted_rounds in submitted_matches:
+        folder = match_info.get('folder')
+        print(f"[DEBUG] Traitement de: {folder}")
+        job.update_match(match_index, status=RUNNING)
+        job.emit('match', match=match_index, folder=folder, status=RUNNING)
+
+        t0 = time.perf_counter()
+        _wait_rounds(job, submitted_rounds)
+        rounds_data = [record for _, record in gather_rounds(submitted_rounds)]
+        t_dissect = time.perf_counter()
+
+        job_timings.add('dissect_wait', t_dissect - t0)
+
+        if not rounds_data:
+            metrics.inc('errors_total', stage='dissect_match')
+            job.update_match(match_index, status=ERROR, error='Aucun round parse')
+            job.emit('match', match=match_index, folder=folder, status=ERROR)
+            continue
+
+        job.check_cancelled()
+        result_name = os.path.splitext(build_report_name(match_info))[0]
+
+        # Analyse en memoire (meme processus): entree et sortie explicites
+        try:
+            recorder = EventRecorder() if events is not None else None
+            result = engine.analyze(rounds_data, analysis_options, on_round=recorder)
+            t_stats = time.perf_counter()
+            if result['dataframe'].empty:
+                raise ValueError('aucun joueur a analyser')
+            result_name = results.save(result_name, result['dataframe'],
+                                       meta={'kind': 'match', 'match': folder, 'rounds': len(rounds_data)})
+            t_report = time.perf_counter()
+        except Exception as e:
+            metrics.inc('errors_total', stage='analyze')
+            print(f"[ERROR] Erreur analyse de {folder}: {e}")
+            job.update_match(match_index, status=ERROR, error=str(e))
+            job.emit('match', match=match_index, folder=folder, status=ERROR, error=str(e))
+            continue
+
+        output_name = f"{result_name}.xlsx"
+        if key is not None:
+            report_cache.put(key, result_name, len(rounds_data))
+        save_events(events, match_path, match_info, recorder)
+
+        job_timings.add('stats', t_stats - t_dissect)
+        job_timings.add('save', t_report - t_stats)
+        metrics.inc('matches_analyzed_total', mode='match')
+        timings = {
+            'dissect_wait': round(t_dissect - t0, 3),
+            'stats': round(t_stats - t_dissect, 3),
+            'save': round(t_report - t_stats, 3),
+        }
+        report = {
+            'filename': output_name,
+            'result': result_name,
+            'match': folder,
+            'rounds': len(rounds_data)
+        }
+        reports.append(report)
+        job.update_match(match_index, status=DONE, timings=timings, report=output_name, rounds=len(rounds_data))
+        job.emit('match', match=match_index, folder=folder, status=DONE,
+                 report=output_name, timings=timings)
+
+    if not reports:
+        raise RuntimeError('Aucun match analyse avec succes')
+
+    return {
+        'reports': reports,
+        'total': len(reports),
+        'cached': cached,
+        'timings': job_timings.summary(),
+    }
+
+
+def aggregate_selection(job, matches, rounds_options, analysis_options,
+                        r6_dissect, pool, results, store, events=None, report_cache=None, keep_root=None):
+    """Analyser une selection de matchs dans un seul rapport agrege
+
+    Les compteurs de chaque match sont persistes dans store (AggregateStore): un
+    match deja analyse avec la meme selection de rounds n'est ni re-dissecte ni
+    re-analyse, seuls les nouveaux matchs sont traites avant la fusion des totaux.
+    results: ResultStore qui recoit les totaux et le detail par match.
+    events: EventStore optionnel qui recoit les kills et objectifs des matchs traites.
+    report_cache: ReportCache optionnel; la meme selection de matchs, de rounds et
+    d'options renvoie le rapport agrege deja genere.
+    keep_root: dossier ou conserver les JSON de rounds (mode debug, voir analyze_selection).
+    Retourne {'reports': [un rapport], 'total': 1, 'matches', 'cached', 'timings'}.
+    """
+    if job is None:
+        job = Job()
+    metrics = get_metrics()
+    job_timings = JobTimings(metrics)
+    engine = load_engine()
+
+    # Une nouvelle version de r6-dissect invalide les agregats partiels
+    version = dissect_version(r6_dissect)
+    partials = []  # (ordre, nom, player_stats, rounds)
+    cached = 0
+
+    # Selection de rounds de chaque match
+    selection = []
+    for match_num, match_info in enumerate(matches):
+        match_path = match_info.get('path')
+
+        if not match_path or not os.path.exists(match_path):
+            continue
+
+        rounds = select_rounds(match_path, rounds_options)
+        if rounds:
+            selection.append((match_num, match_info, match_path, rounds))
+
+    # Rapport agrege deja genere pour cette selection et ces options
+    report_cache_key = None
+    if report_cache is not None and selection:
+        report_cache_key = report_key('aggregate', [selection_fingerprint(match_path, rounds)
+                                                    for _, _, match_path, rounds in selection],
+                                      analysis_options, engine.ENGINE_VERSION, version)
+        entry = report_cache.get(report_cache_key)
+        if entry is not None:
+            filename = f"{entry['name']}.xlsx"
+            print(f"[DEBUG] Agregat: rapport deja genere ({filename})")
+            job.emit('report', report=filename, cached=True)
+            metrics.inc('reports_cached_total', mode='aggregate')
+            return {
+                'reports': [{
+                    'filename': filename,
+                    'result': entry['name'],
+                    'match': f"{len(selection)} matchs",
+                    'rounds': entry['rounds'],
+                    'cached': True,
+                }],
+                'total': 1,
+                'matches': len(selection),
+                'cached': len(selection),
+                'timings': job_timings.summary(),
+            }
+
+    # Phase 1: relire les agregats connus, soumettre les rounds des autres matchs
+    submitted_matches = []
+    for match_num, match_info, match_path, rounds in selection:
+        folder = match_info.get('folder') or os.path.basename(match_path)
+        key = store.key(match_path, files_signature(rec for _, rec in rounds), version)
+        partial = store.get(key)
+        if partial is not None:
+            match_index = job.add_match(folder, 0)
+            job.update_match(match_index, status=DONE, cached=True)
+            job.emit('match', match=match_index, folder=folder, status=DONE, cached=True)
+            partials.append((match_num, folder, engine.deserialize_player_stats(partial['players']),
+                             partial['rounds']))
+            cached += 1
+            continue
+
+        match_index = job.add_match(folder, len(rounds))
+        submitted_rounds = pool.load_rounds(r6_dissect, rounds, keep_dir=keep_dir_for(keep_root, match_info, match_path),
+                                            timings=job_timings)
+        for idx, future in submitted_rounds:
+            _track_round(job, match_index, idx, future)
+        submitted_matches.append((match_num, match_index, match_info, key, submitted_rounds))
+
+    print(f"[DEBUG] Agregat: {cached} match(s) deja calcules, {len(submitted_matches)} a analyser")
+
+    # Phase 2: calculer et persister les compteurs des nouveaux matchs
+    for match_num, match_index, match_info, key, submitted_rounds in submitted_matches:
+        folder = match_info.get('folder') or os.path.basename(match_info['path'])
+        print(f"[DEBUG] Traitement de: {folder}")
+        job.update_match(match_index, status=RUNNING)
+        job.emit('match', match=match_index, folder=folder, status=RUNNING)
+
+        t0 = time.perf_counter()
+        _wait_rounds(job, submitted_rounds)
+        rounds_data = [record for _, record in gather_rounds(submitted_rounds)]
+        t_dissect = time.perf_counter()
+
+        job_timings.add('dissect_wait', t_dissect - t0)
+
+        if not rounds_data:
+            metrics.inc('errors_total', stage='dissect_match')
+            job.update_match(match_index, status=ERROR, error='Aucun round parse')
+            job.emit('match', match=match_index, folder=folder, status=ERROR)
+            continue
+
+        job.check_cancelled()
+        try:
+            recorder = EventRecorder() if events is not None else None
+            player_stats = engine.compute_player_stats(rounds_data, recorder)
+            t_stats = time.perf_counter()
+        except Exception as e:
+            metrics.inc('errors_total', stage='analyze')
+            print(f"[ERROR] Erreur analyse de {folder}: {e}")
+            job.update_match(match_index, status=ERROR, error=str(e))
+            job.emit('match', match=match_index, folder=folder, status=ERROR, error=str(e))
+            continue
+
+        store.put(key, folder, len(rounds_data), engine.serialize_player_stats(player_stats))
+        save_events(events, match_info['path'], match_info, recorder)
+        partials.append((match_num, folder, player_stats, len(rounds_data)))
+
+        job_timings.add('stats', t_stats - t_dissect)
+        metrics.inc('matches_analyzed_total', mode='aggregate')
+        timings = {
+            'dissect_wait': round(t_dissect - t0, 3),
+            'stats': round(t_stats - t_dissect, 3),
+        }
+        job.update_match(match_index, status=DONE, timings=timings)
+        job.emit('match', match=match_index, folder=folder, status=DONE, timings=timings)
+
+    if not partials:
+        raise RuntimeError('Aucun match analyse avec succes')
+
+    # Phase 3: fusionner les totaux et ecrire un seul rapport (detail par match)
+    job.check_cancelled()
+    partials.sort(key=lambda item: item[0])
+    with job_timings.stage('merge'):
+        result = engine.analyze_aggregate([(name, stats, n) for _, name, stats, n in partials], analysis_options)
+    if result['dataframe'].empty:
+        raise RuntimeError('Aucun joueur a analyser')
+
+    t0 = time.perf_counter()
+    result_name = results.save(os.path.splitext(build_aggregate_report_name(len(partials)))[0],
+                               result['dataframe'], breakdown=result['breakdown'],
+                               meta={'kind': 'aggregate', 'match': f"{len(partials)} matchs",
+                                     'rounds': result['rounds']})
+    output_name = f"{result_name}.xlsx"
+    if report_cache_key is not None and len(partials) == len(selection):
+        # Un match en echec n'est pas dans ce rapport: ne pas le servir pour la selection complete
+        report_cache.put(report_cache_key, result_name, result['rounds'])
+    job_timings.add('save', time.perf_counter() - t0)
+    timings = job_timings.summary()
+    job.emit('report', report=output_name, timings={'merge': timings['merge'], 'save': timings['save']})
+
+    return {
+        'reports': [{
+            'filename': output_name,
+            'result': result_name,
+            'match': f"{len(partials)} matchs",
+            'rounds': result['rounds']
+        }],
+        'total': 1,
+        'matches': len(partials),
+        'cached': cached,
+        'timings': job_timings.summary(),
+    }
@@ -0,0 +1,123 @@
+"""
+Compteurs des joueurs sous forme compacte
+Un seul tableau NumPy (joueur, side, compteur) et des noms de joueurs internes:
+la memoire ne depend que du nombre de joueurs et fusionner des agregats
+partiels revient a une addition de tableaux
+"""
+
+import sys
+
+import numpy as np
+
+# Compteurs par joueur et par side (ATK / DEF); GLOBAL = ATK + DEF, calcule a la demande
+STAT_COUNTERS = ('rounds', 'kills', 'deaths', 'headshots', 'teamkills', 'rounds_survived', 'survival_time',
+                 'kost_rounds', 'opening_kills', 'opening_deaths', 'multikills', 'plants', 'diffuses',
+                 'kills_2k', 'kills_3k', 'kills_4k', 'aces', 'trades', 'traded_deaths',
+                 'clutch_attempts', 'clutch_wins')
+STAT_INDEX = {stat: i for i, stat in enumerate(STAT_COUNTERS)}
+# Compteurs non entiers (les autres sont rendus en int64)
+FLOAT_COUNTERS = ('survival_time',)
+
+SIDE_COUNT = 2  # ATK, DEF
+NO_TEAM = -1
+
+
+class PlayerStats:
+    """Compteurs de tous les joueurs d'un match (ou d'une fusion de matchs)
+
+    names: noms des joueurs (interns), dans l'ordre de premiere apparition.
+    index: nom -> ligne.
+    teams: equipe de chaque joueur (teamIndex du premier round joue, NO_TEAM si inconnue).
+    counts: tableau float64 de forme (joueurs, SIDE_COUNT, len(STAT_COUNTERS)).
+    """
+
+    __slots__ = ('names', 'index', 'teams', 'counts')
+
+    def __init__(self, names=(), teams=None, counts=None):
+        self.names = [sys.intern(str(name)) for name in names]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        size = len(self.names)
+        if teams is None:
+            self.teams = np.full(size, NO_TEAM, dtype=np.int16)
+        else:
+            self.teams = np.asarray(teams, dtype=np.int16)
+        if counts is None:
+            self.counts = np.zeros((size, SIDE_COUNT, len(STAT_COUNTERS)))
+        else:
+            self.counts = np.asarray(counts, dtype=float).reshape(size, SIDE_COUNT, len(STAT_COUNTERS))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, username):
+        return username in self.index
+
+    def __repr__(self):
+        return f"PlayerStats({len(self)} joueurs)"
+
+    def get(self, username, stat, side=None):
+        """Valeur d'un compteur pour un joueur (side: 0 ATK, 1 DEF, None pour GLOBAL)"""
+        row = self.counts[self.index[username]]
+        column = row[:, STAT_INDEX[stat]]
+        return column.sum() if side is None else column[side]
+
+    def side(self, side=None):
+        """Tableau (joueurs, compteurs) d'un side, ou GLOBAL (ATK + DEF) si side est None"""
+        return self.counts.sum(axis=1) if side is None else self.counts[:, side, :]
+
+    def subset(self, mask):
+        """Nouveaux PlayerStats limites aux joueurs selectionnes par mask (tableau de booleens)"""
+        rows = np.flatnonzero(mask)
+        stats = PlayerStats.__new__(PlayerStats)
+        stats.names = [self.names[i] for i in rows]
+        stats.index = {name: i for i, name in enumerate(stats.names)}
+        stats.teams = self.teams[rows]
+        stats.counts = self.counts[rows]
+        return stats
+
+    @classmethod
+    def merge(cls, partials):
+        """Additionner plusieurs PlayerStats (une addition de tableaux par partiel)
+
+        L'equipe retenue pour un joueur est celle de son premier match (meme regle
+        qu'entre les rounds d'un match); l'ordre des joueurs est celui de leur
+        premiere apparition.
+        """
+        partials = [partial for partial in partials if len(partial)]
+        index = {}
+        for partial in partials:
+            for name in partial.names:
+                if name not in index:
+                    index[name] = len(index)
+
+        merged = cls(index)
+        rows = [np.fromiter((index[name] for name in partial.names), dtype=np.intp, count=len(partial))
+                for partial in partials]
+        for partial, partial_rows in zip(partials, rows):
+            merged.counts[partial_rows] += partial.counts
+        # Parcours a l'envers: la premiere equipe connue ecrase les suivantes
+        for partial, partial_rows in zip(reversed(partials), reversed(rows)):
+            known = partial.teams != NO_TEAM
+            merged.teams[partial_rows[known]] = partial.teams[known]
+        return merged
+
+    def to_dict(self):
+        """Forme JSON compacte (agregat partiel persiste)"""
+        return {
+            'stats': list(STAT_COUNTERS),
+            'players': list(self.names),
+            'teams': self.teams.tolist(),
+            'counts': self.counts.reshape(len(self), -1).tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse de to_dict(); les compteurs absents de data restent a 0"""
+        names = data.get('players') or []
+        stats = cls(names, data.get('teams'))
+        if names:
+            saved = np.asarray(data['counts'], dtype=float).reshape(len(names), SIDE_COUNT, -1)
+            for i, stat in enumerate(data.get('stats', STAT_COUNTERS)):
+                if stat in STAT_INDEX:
+                    stats.counts[:, :, STAT_INDEX[stat]] = saved[:, :, i]
+        return stats
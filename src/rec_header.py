@@ -0,0 +1,201 @@
+"""
+Lecture native de l'en-tete des fichiers .rec (sans r6-dissect)
+Seul le debut du fichier est lu: la section d'en-tete contient les proprietes du
+match (worldid, matchtype, datetime, noms d'equipes, joueurs) sous forme de paires
+cle/valeur. Si le fichier est compresse en zstd, le module optionnel zstandard
+(ou compression.zstd de Python 3.14) decompresse uniquement ce debut
+"""
+
+import re
+from datetime import datetime, timezone
+
+try:
+    import zstandard  # optionnel: replays compresses en zstd
+except ImportError:
+    zstandard = None
+
+if zstandard is None:
+    try:
+        from compression import zstd as _zstd  # Python 3.14+
+    except ImportError:
+        _zstd = None
+else:
+    _zstd = None
+
+HEADER_MAGIC = b'dissect'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+HEAD_BYTES = 64 * 1024        # octets lus (ou decompresses) au debut du fichier
+MAX_COMPRESSED = 1024 * 1024  # octets compresses lus au plus pour obtenir HEAD_BYTES
+MAX_VALUE = 4096              # taille max d'une valeur de l'en-tete
+MAX_GAP = 64                  # octets max entre deux paires: au-dela, fin de l'en-tete
+
+# Chaine de l'en-tete: longueur sur 8 octets (little-endian) puis les octets
+_KEY = re.compile(rb'[\x01-\x40]\x00{7}')
+_KEY_NAME = re.compile(rb'[a-z][a-z0-9_]*\Z')
+
+# Formats de la propriete datetime rencontres dans les replays
+_DATETIME_FORMATS = ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d-%H-%M-%S', '%Y-%m-%d_%H-%M-%S')
+
+
+class HeaderError(ValueError):
+    """En-tete .rec absent, compresse sans decompresseur disponible, ou incomplet"""
+
+
+def zstd_backend():
+    """Nom du decompresseur zstd utilise, ou None si aucun n'est installe"""
+    if zstandard is not None:
+        return 'zstandard'
+    return 'compression.zstd' if _zstd is not None else None
+
+
+def _decompressor():
+    if zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj()
+    return _zstd.ZstdDecompressor()
+
+
+def _decompress_head(f, data, start):
+    """Decompresser le debut du flux zstd qui commence a data[start:]"""
+    if zstd_backend() is None:
+        raise HeaderError("replay compresse (zstd): installer zstandard pour lire l'en-tete")
+    decompressor = _decompressor()
+    out = bytearray()
+    chunk = data[start:]
+    read = len(data)
+    try:
+        while chunk and len(out) < HEAD_BYTES:
+            out += decompressor.decompress(chunk)
+            if getattr(decompressor, 'eof', False) or read >= MAX_COMPRESSED:
+                break
+            chunk = f.read(HEAD_BYTES)
+            read += len(chunk)
+    except Exception as e:
+        # Fin de trame ou trame tronquee: garder ce qui a ete decompresse
+        if not out:
+            raise HeaderError(f"flux zstd illisible ({e})") from None
+    return bytes(out)
+
+
+def read_head(rec_path):
+    """Debut du fichier .rec, decompresse si necessaire (au plus ~HEAD_BYTES octets utiles)"""
+    with open(rec_path, 'rb') as f:
+        data = f.read(HEAD_BYTES)
+        if data.startswith(HEADER_MAGIC):
+            return data
+        start = data.find(ZSTD_MAGIC)
+        if start < 0:
+            raise HeaderError("en-tete 'dissect' introuvable")
+        return _decompress_head(f, data, start)
+
+
+def _read_string(data, pos):
+    """(valeur, position suivante) de la chaine qui commence a pos, ou (None, pos)"""
+    end = pos + 8
+    if end > len(data):
+        return None, pos
+    size = int.from_bytes(data[pos:end], 'little')
+    if size > MAX_VALUE or end + size > len(data):
+        return None, pos
+    return data[end:end + size], end + size
+
+
+def parse_properties(data):
+    """Liste des paires (cle, valeur) de la section d'en-tete, dans l'ordre du fichier"""
+    start = data.find(HEADER_MAGIC)
+    if start < 0:
+        raise HeaderError("en-tete 'dissect' introuvable")
+
+    pairs = []
+    pos = start + len(HEADER_MAGIC)
+    while True:
+        m = _KEY.search(data, pos)
+        # Apres la derniere paire, seules des donnees binaires suivent
+        if m is None or (pairs and m.start() - pos > MAX_GAP):
+            break
+        key, key_end = _read_string(data, m.start())
+        if key is None or not _KEY_NAME.match(key):
+            pos = m.start() + 1
+            continue
+        value, value_end = _read_string(data, key_end)
+        if value is None:
+            pos = m.start() + 1
+            continue
+        pairs.append((key.decode('ascii'), value.decode('utf-8', 'replace')))
+        pos = value_end
+    return pairs
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def format_timestamp(value):
+    """Date de l'en-tete au format de r6-dissect (RFC 3339, UTC), ou la valeur brute"""
+    value = (value or '').strip()
+    if value.isdigit():
+        seconds = int(value)
+        if seconds > 10 ** 11:  # millisecondes
+            seconds //= 1000
+        try:
+            return datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        except (OverflowError, OSError, ValueError):
+            return value
+    text = value.rstrip('Z').split('.')[0]
+    for fmt in _DATETIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime('%Y-%m-%dT%H:%M:%SZ')
+        except ValueError:
+            continue
+    return value
+
+
+def read_header(rec_path):
+    """Proprietes du match lues dans l'en-tete d'un .rec
+
+    Retourne {'map_id', 'match_type_id', 'timestamp', 'teams', 'players', 'properties'}.
+    Les noms de la map et du type de match ne sont pas dans l'en-tete: seuls leurs
+    identifiants (ceux du JSON de r6-dissect) sont retournes. Leve HeaderError si
+    l'en-tete est illisible ou ne contient ni worldid ni matchtype.
+    """
+    properties = {}
+    players = []
+    for key, value in parse_properties(read_head(rec_path)):
+        if key == 'playername':
+            players.append({'username': value, 'team': None})
+        elif key == 'team' and players and players[-1]['team'] is None:
+            players[-1]['team'] = _int(value)
+        else:
+            properties.setdefault(key, value)
+
+    map_id = _int(properties.get('worldid'))
+    match_type_id = _int(properties.get('matchtype'))
+    if map_id is None and match_type_id is None:
+        raise HeaderError("en-tete incomplet (ni worldid ni matchtype)")
+
+    return {
+        'map_id': map_id,
+        'match_type_id': match_type_id,
+        'timestamp': format_timestamp(properties.get('datetime')),
+        'teams': [properties[k] for k in ('teamname0', 'teamname1') if properties.get(k)],
+        'players': players,
+        'properties': properties,
+    }
+
+
+def encode_header(properties, players=()):
+    """Section d'en-tete au format lu par read_header (replays synthetiques des benchmarks)"""
+    def string(value):
+        raw = str(value).encode('utf-8')
+        return len(raw).to_bytes(8, 'little') + raw
+
+    out = bytearray(HEADER_MAGIC + b'\x00' * 7)
+    for key, value in properties.items():
+        out += string(key) + string(value)
+    for player in players:
+        out += string('playername') + string(player['username'])
+        out += string('team') + string(player['team'])
+    return bytes(out)
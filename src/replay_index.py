@@ -0,0 +1,182 @@
+"""
+Index en memoire des matchs du dossier MatchReplay (/api/replays)
+Les metadonnees du catalogue sont triees une fois par critere, filtrees cote serveur
+(map, categorie, dates, nombre de rounds) et servies par pages: l'interface ne
+recoit que les matchs qu'elle affiche
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+
+CATEGORIES = ('ranked', 'scrim', 'custom')
+
+# Critere de tri -> (cle, ordre par defaut)
+SORTS = {
+    'date': (lambda m: m.get('date') or '', 'desc'),
+    'map': (lambda m: (m.get('map') or '').lower(), 'asc'),
+    'rounds': (lambda m: m.get('numRounds') or 0, 'desc'),
+}
+
+MAX_CACHED_QUERIES = 32
+
+
+class ReplayQueryError(ValueError):
+    """Parametre de filtre, de tri ou de pagination invalide"""
+
+
+def _split(value):
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+def _int_arg(args, name, minimum=0):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return max(int(value), minimum)
+    except ValueError:
+        raise ReplayQueryError(f"{name}: entier attendu") from None
+
+
+def _date_arg(args, name):
+    value = (args.get(name) or '').strip()
+    if not value:
+        return None
+    # Meme format que 'date' des metadonnees: comparaison de chaines
+    if len(value) < 10 or value[4] != '-' or value[7] != '-' or not value[:4].isdigit():
+        raise ReplayQueryError(f"{name}: date attendue (AAAA-MM-JJ)")
+    return value.replace('T', ' ')
+
+
+def parse_query(args):
+    """Filtres et tri d'une requete /api/replays (args: request.args ou dict)
+
+    map, category: listes separees par des virgules; date_from, date_to: AAAA-MM-JJ
+    (bornes incluses); min_rounds, max_rounds; sort: date, map ou rounds; order: asc, desc.
+    """
+    categories = [c.lower() for c in _split(args.get('category'))]
+    unknown = [c for c in categories if c not in CATEGORIES]
+    if unknown:
+        raise ReplayQueryError(f"categorie inconnue: {', '.join(unknown)}")
+
+    sort = args.get('sort') or 'date'
+    if sort not in SORTS:
+        raise ReplayQueryError(f"tri inconnu: {sort}")
+    order = args.get('order') or SORTS[sort][1]
+    if order not in ('asc', 'desc'):
+        raise ReplayQueryError(f"ordre inconnu: {order}")
+
+    return {
+        'maps': tuple(sorted(m.lower() for m in _split(args.get('map')))),
+        'categories': tuple(sorted(categories)),
+        'date_from': _date_arg(args, 'date_from'),
+        'date_to': _date_arg(args, 'date_to'),
+        'min_rounds': _int_arg(args, 'min_rounds'),
+        'max_rounds': _int_arg(args, 'max_rounds'),
+        'sort': sort,
+        'order': order,
+    }
+
+
+def _matches(match, query):
+    if query['maps'] and (match.get('map') or '').lower() not in query['maps']:
+        return False
+    if query['categories'] and match.get('matchCategory') not in query['categories']:
+        return False
+    date = match.get('date') or ''
+    if query['date_from'] and date < query['date_from']:
+        return False
+    # Borne haute incluse: une date seule couvre toute la journee
+    if query['date_to'] and date[:len(query['date_to'])] > query['date_to']:
+        return False
+    rounds = match.get('numRounds') or 0
+    if query['min_rounds'] is not None and rounds < query['min_rounds']:
+        return False
+    if query['max_rounds'] is not None and rounds > query['max_rounds']:
+        return False
+    return True
+
+
+class ReplayIndex:
+    """Matchs du dernier scan, tries par critere, avec un cache des requetes recentes
+
+    replace() est appele apres chaque scan du dossier; les pages suivantes d'une meme
+    requete sont servies depuis le cache sans refiltrer (defilement de l'interface).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = uuid.uuid4().hex[:8]
+        self.replay_path = None
+        self._matches = {}  # dossier -> metadonnees
+        self._sorted = {}  # (tri, ordre) -> liste triee
+        self._queries = OrderedDict()  # requete -> matchs filtres et tries
+        self._maps = []
+        self.version = 0
+
+    def replace(self, replay_path, matches):
+        """Remplacer le contenu de l'index par le resultat d'un scan (sans effet si identique)"""
+        by_folder = {match['folder']: match for match in matches}
+        with self._lock:
+            if replay_path == self.replay_path and by_folder == self._matches:
+                return False
+            self.replay_path = replay_path
+            self._matches = by_folder
+            self._sorted = {}
+            self._queries.clear()
+            self._maps = sorted({m.get('map') for m in matches if m.get('map')}, key=str.lower)
+            self.version += 1
+            return True
+
+    def etag(self):
+        return f"replays-{self._generation}-{self.version}"
+
+    def _sorted_locked(self, sort, order):
+        key = (sort, order)
+        ordered = self._sorted.get(key)
+        if ordered is None:
+            # Base: date decroissante, puis dossier; les autres tris sont stables sur cette base
+            base = sorted(self._matches.values(), key=lambda m: (m.get('date') or '', m['folder']), reverse=True)
+            if sort == 'date':
+                ordered = base if order == 'desc' else base[::-1]
+            else:
+                ordered = sorted(base, key=SORTS[sort][0], reverse=(order == 'desc'))
+            self._sorted[key] = ordered
+        return ordered
+
+    def _filtered_locked(self, query):
+        key = tuple(sorted(query.items()))
+        result = self._queries.get(key)
+        if result is not None:
+            self._queries.move_to_end(key)
+            return result
+        ordered = self._sorted_locked(query['sort'], query['order'])
+        result = [m for m in ordered if _matches(m, query)]
+        self._queries[key] = result
+        if len(self._queries) > MAX_CACHED_QUERIES:
+            self._queries.popitem(last=False)
+        return result
+
+    def query(self, query, offset=0, limit=None, fields=None):
+        """(matchs de la page, total filtre, etag); fields: cles a conserver (toutes si None)"""
+        with self._lock:
+            result = self._filtered_locked(query)
+            end = None if limit is None else offset + limit
+            page = result[offset:end]
+            total = len(result)
+            etag = self.etag()
+        if fields:
+            page = [{k: m[k] for k in fields if k in m} for m in page]
+        else:
+            page = [dict(m) for m in page]
+        return page, total, etag
+
+    def facets(self):
+        """Valeurs disponibles pour les filtres de l'interface"""
+        with self._lock:
+            counts = {category: 0 for category in CATEGORIES}
+            for match in self._matches.values():
+                if match.get('matchCategory') in counts:
+                    counts[match['matchCategory']] += 1
+            return {'maps': list(self._maps), 'categories': counts, 'count': len(self._matches)}
@@ -0,0 +1,159 @@
+"""
+Surveillance du dossier MatchReplay en arriere-plan
+Les nouveaux matchs sont catalogues et pre-dissectes des qu'ils sont complets,
+sans jamais concurrencer les analyses lancees depuis l'interface
+"""
+
+import os
+import threading
+import time
+
+from match_catalog import folder_signature
+
+DEFAULT_INTERVAL = 10  # secondes entre deux scans
+DEFAULT_SETTLE = 30    # secondes sans changement des .rec avant de traiter un match
+
+
+class ReplayWatcher:
+    """Scanne replay_path par polling et traite chaque dossier Match-* stabilise
+
+    get_replay_path(): dossier a surveiller (relu a chaque scan, la config peut changer).
+    process_match(match_dir, should_stop): traite un match; retourne False s'il a ete
+    interrompu (il sera repris au scan suivant).
+    is_known(match_dir, signature): au premier scan, les matchs deja connus ne sont pas retraites.
+    is_busy(): vrai pendant une analyse interactive; le watcher attend qu'elle se termine.
+    Un match est traite quand la signature de ses .rec (tailles, mtimes) n'a pas
+    change depuis settle secondes: un replay en cours d'ecriture n'est pas touche.
+    """
+
+    def __init__(self, get_replay_path, process_match, is_known=None, is_busy=None,
+                 interval=DEFAULT_INTERVAL, settle=DEFAULT_SETTLE):
+        self.get_replay_path = get_replay_path
+        self.process_match = process_match
+        self.is_known = is_known or (lambda match_dir, signature: False)
+        self.is_busy = is_busy or (lambda: False)
+        self.interval = interval
+        self.settle = settle
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        # dossier -> {'signature', 'changed' (horodatage du dernier changement), 'done' (signature traitee)}
+        self._seen = {}
+        self._first_scan = True
+        self.processed = 0
+        self.last_scan = None
+        self.paused = False
+        self.current = None
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='replay-watcher', daemon=True)
+        self._thread.start()
+        print(f"[OK] Surveillance des replays demarree (scan toutes les {self.interval}s)")
+
+    def stop(self, wait=False):
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.scan_once()
+            except Exception as e:
+                print(f"[ERROR] Surveillance des replays: {e}")
+            self._stop.wait(self.interval)
+
+    def _should_stop(self):
+        return self._stop.is_set() or self.is_busy()
+
+    def scan_once(self, now=None):
+        """Un passage: detecter les matchs nouveaux ou modifies, traiter ceux qui sont stables"""
+        now = time.time() if now is None else now
+        replay_path = self.get_replay_path()
+        self.last_scan = now
+        if not replay_path or not os.path.isdir(replay_path):
+            return []
+
+        ready = []
+        present = set()
+        with os.scandir(replay_path) as entries:
+            for entry in entries:
+                if not (entry.is_dir() and entry.name.startswith('Match-')):
+                    continue
+                try:
+                    signature = folder_signature(entry.path)
+                except OSError:
+                    continue
+                if not signature:
+                    continue
+                present.add(entry.path)
+
+                with self._lock:
+                    state = self._seen.get(entry.path)
+                    if state is None:
+                        # Date du dernier .rec ecrit: un match termine depuis longtemps est pret tout de suite
+                        state = {'signature': signature, 'changed': max(rec[2] for rec in signature) / 1e9, 'done': None}
+                        self._seen[entry.path] = state
+                        if self._first_scan and self.is_known(entry.path, signature):
+                            state['done'] = signature
+                    elif state['signature'] != signature:
+                        # Replay encore en cours d'ecriture
+                        state['signature'] = signature
+                        state['changed'] = now
+
+                    if state['done'] != signature and now - state['changed'] >= self.settle:
+                        ready.append((entry.name, entry.path, signature))
+
+        with self._lock:
+            for path in set(self._seen) - present:
+                del self._seen[path]
+            self._first_scan = False
+
+        # Les matchs les plus recents d'abord: ce sont eux qu'on va ouvrir
+        ready.sort(reverse=True)
+        processed = []
+        for name, match_dir, signature in ready:
+            if self._should_stop():
+                self.paused = not self._stop.is_set()
+                break
+            self.paused = False
+            self.current = name
+            try:
+                done = self.process_match(match_dir, self._should_stop)
+            except Exception as e:
+                print(f"[ERROR] Surveillance: echec sur {name} ({e})")
+                done = True
+            finally:
+                self.current = None
+            if done:
+                with self._lock:
+                    if match_dir in self._seen:
+                        self._seen[match_dir]['done'] = signature
+                self.processed += 1
+                processed.append(name)
+        else:
+            self.paused = False
+
+        return processed
+
+    def status(self):
+        with self._lock:
+            pending = sum(1 for state in self._seen.values() if state['done'] != state['signature'])
+            watched = len(self._seen)
+        return {
+            'running': self.is_running(),
+            'interval': self.interval,
+            'settle': self.settle,
+            'watched': watched,
+            'pending': pending,
+            'processed': self.processed,
+            'paused': self.paused,
+            'current': self.current,
+            'last_scan': self.last_scan,
+        }
@@ -0,0 +1,126 @@
+"""
+Cache des rapports generes, indexe par les entrees et les options de l'analyse
+Relancer une analyse identique (memes matchs, rounds, joueurs, sides et stats)
+renvoie le resultat deja enregistre au lieu d'en generer un doublon
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from match_catalog import normalize_match_path
+
+# Incrementer pour invalider les index ecrits par une version incompatible
+REPORT_CACHE_VERSION = 2
+
+
+def options_fingerprint(analysis_options):
+    """Forme canonique (ordre stable) des options du moteur qui influent sur le rapport"""
+    sides = analysis_options.get('sides') or {}
+    return {
+        'stats': sorted(analysis_options.get('stats') or []),
+        'sides': {side: bool(sides.get(side, True)) for side in ('atk', 'def', 'global')},
+        'players_mode': analysis_options.get('players_mode') or 'all',
+        'players': sorted(analysis_options.get('players') or []),
+    }
+
+
+def report_key(kind, matches, analysis_options, engine_version, dissect_version=''):
+    """Cle d'un rapport
+
+    matches: liste de (dossier du match, signature des .rec selectionnes, numeros de rounds).
+    La signature couvre les noms, tailles et mtimes des .rec: un match modifie ou
+    une autre selection de rounds donne une autre cle, comme un changement de
+    version du moteur ou de r6-dissect.
+    """
+    raw = json.dumps([
+        REPORT_CACHE_VERSION,
+        str(engine_version),
+        dissect_version,
+        kind,
+        [[normalize_match_path(match_dir), signature, sorted(rounds)] for match_dir, signature, rounds in matches],
+        options_fingerprint(analysis_options),
+    ])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    """Index cle -> resultat deja genere (voir result_store), persiste dans un fichier JSON
+
+    Une entree n'est servie que si son resultat existe encore dans results_folder:
+    le supprimer suffit a le faire regenerer a la prochaine analyse.
+    """
+
+    def __init__(self, path, results_folder):
+        self.path = path
+        self.results_folder = results_folder
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Charger l'index depuis le disque (index vide si absent ou invalide)"""
+        entries = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == REPORT_CACHE_VERSION:
+                    entries = data.get('reports', {})
+        except Exception as e:
+            print(f"[WARNING] Index des rapports illisible, reconstruction ({e})")
+
+        with self._lock:
+            self._entries = entries
+
+    def _save_locked(self):
+        payload = {'version': REPORT_CACHE_VERSION, 'reports': dict(self._entries)}
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARNING] Impossible d'enregistrer l'index des rapports ({e})")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get(self, key):
+        """Entree {'name', 'rounds', 'created'} du resultat, ou None s'il est inconnu ou supprime"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not os.path.exists(os.path.join(self.results_folder, f"{entry['name']}.json")):
+                # Resultat supprime depuis: oublier l'entree
+                del self._entries[key]
+                self._save_locked()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(entry)
+
+    def put(self, key, name, rounds):
+        """Enregistrer le resultat genere pour key"""
+        with self._lock:
+            self._entries[key] = {
+                'name': name,
+                'rounds': rounds,
+                'created': time.time(),
+            }
+            self._save_locked()
+
+    def clear(self):
+        """Oublier tous les resultats (les fichiers ne sont pas supprimes)"""
+        with self._lock:
+            self._entries = {}
+            self._save_locked()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
@@ -0,0 +1,154 @@
+"""
+Index en memoire des rapports (resultats d'analyse et anciens classeurs Excel)
+/reports est servi depuis cet index: pas de listdir ni de stat par fichier a chaque
+requete. Il est mis a jour quand un resultat est ecrit, exporte ou supprime; un
+changement fait a la main dans les dossiers est detecte via leur mtime
+"""
+
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+
+class ReportIndex:
+    """Liste triee des rapports avec un numero de version pour les requetes conditionnelles
+
+    Chaque modification incremente version: etag() change, et les lecteurs bloques
+    dans wait() sont reveilles (long-polling de l'interface).
+    """
+
+    def __init__(self, results, reports_folder, check_interval=2.0):
+        self.results = results
+        self.reports_folder = reports_folder
+        self.check_interval = check_interval
+        # Change a chaque demarrage: un ETag d'une session precedente ne correspond jamais
+        self._generation = uuid.uuid4().hex[:8]
+        self._cond = threading.Condition(threading.RLock())
+        self._entries = {}  # nom du rapport (sans extension) -> resume
+        self._order = {}  # nom -> cle de tri (date affichee a la seconde, puis mtime du fichier)
+        self._sorted = []
+        self._folder_mtimes = None
+        self._last_check = 0.0
+        self.version = 0
+        self.rescans = 0
+        results.add_listener(self.update)
+        self.rebuild()
+
+    # -- construction -----------------------------------------------------
+
+    def _folder_state(self):
+        state = []
+        for folder in (self.results.results_folder, self.reports_folder):
+            try:
+                state.append(os.stat(folder).st_mtime_ns)
+            except OSError:
+                state.append(None)
+        return state
+
+    def _legacy_entry(self, name):
+        """Classeur Excel sans resultat (upload legacy, versions precedentes)"""
+        try:
+            st = os.stat(self.results.excel_file(name))
+        except OSError:
+            return None
+        return {
+            'filename': f"{name}.xlsx",
+            'name': None,
+            'excel': True,
+            'size': st.st_size,
+            'created': datetime.fromtimestamp(st.st_ctime).strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+    def _entry(self, name):
+        """(resume, cle de tri) d'un rapport, ou (None, None) s'il n'existe plus"""
+        entry = self.results.summary(name) or self._legacy_entry(name)
+        if entry is None:
+            return None, None
+        path = os.path.join(self.results.results_folder, f"{name}.json") if entry['name'] else self.results.excel_file(name)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = 0
+        return entry, (entry['created'], mtime)
+
+    def _publish_locked(self):
+        names = sorted(self._entries, key=self._order.__getitem__, reverse=True)
+        self._sorted = [self._entries[name] for name in names]
+        self.version += 1
+        self._cond.notify_all()
+
+    def rebuild(self):
+        """Relire les deux dossiers (demarrage, ou modification faite hors de l'application)"""
+        with self._cond:
+            state = self._folder_state()
+            names = set()
+            for folder, ext in ((self.results.results_folder, '.json'), (self.reports_folder, '.xlsx')):
+                if os.path.exists(folder):
+                    names.update(entry.name[:-len(ext)] for entry in os.scandir(folder) if entry.name.endswith(ext))
+            entries = {}
+            order = {}
+            for name in names:
+                entry, key = self._entry(name)
+                if entry is not None:
+                    entries[name] = entry
+                    order[name] = key
+            self.rescans += 1
+            self._folder_mtimes = state
+            self._last_check = time.monotonic()
+            if entries != self._entries or not self.version:
+                self._entries = entries
+                self._order = order
+                self._publish_locked()
+
+    def check(self, force=False):
+        """Reconstruire l'index si un dossier a change (au plus tous les check_interval secondes)"""
+        with self._cond:
+            if not force and time.monotonic() - self._last_check < self.check_interval:
+                return
+            self._last_check = time.monotonic()
+            if self._folder_state() != self._folder_mtimes:
+                self.rebuild()
+
+    def update(self, name):
+        """Resultat ou classeur ecrit, exporte ou supprime: mettre a jour son entree"""
+        with self._cond:
+            entry, key = self._entry(name)
+            if entry != self._entries.get(name):
+                if entry is None:
+                    del self._entries[name]
+                    del self._order[name]
+                else:
+                    self._entries[name] = entry
+                    self._order[name] = key
+                self._publish_locked()
+            # Modification connue: pas besoin de tout relire
+            self._folder_mtimes = self._folder_state()
+
+    # -- lecture ----------------------------------------------------------
+
+    def etag(self):
+        return f"reports-{self._generation}-{self.version}"
+
+    def page(self, offset=0, limit=None):
+        """(rapports du plus recent au plus ancien, total, etag)"""
+        self.check()
+        with self._cond:
+            end = None if limit is None else offset + limit
+            return [dict(entry) for entry in self._sorted[offset:end]], len(self._sorted), self.etag()
+
+    def wait(self, etag, timeout):
+        """Attendre (jusqu'a timeout) que l'index ne corresponde plus a etag; retourne l'etag courant"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self.check()
+                remaining = deadline - time.monotonic()
+                if self.etag() != etag or remaining <= 0:
+                    return self.etag()
+                self._cond.wait(min(remaining, self.check_interval))
+
+    def stats(self):
+        with self._cond:
+            return {'reports': len(self._entries), 'version': self.version, 'rescans': self.rescans}
@@ -0,0 +1,168 @@
+"""
+Ecriture des rapports Excel en flux (mode write-only d'openpyxl)
+Styles nommes partages par toutes les cellules, une seule passe sur les lignes
+pour "Stats Completes" et les feuilles par equipe
+"""
+
+import math
+import re
+
+SHEET_ALL = 'Stats Completes'
+TEAM_OURS = 'VOTRE EQUIPE'
+TEAM_ENEMY = 'EQUIPE ENNEMIE'
+
+# Couleurs
+HEADER_COLOR = "1F4E78"   # Bleu marine
+ATK_COLOR = "E74C3C"      # Rouge
+DEF_COLOR = "27AE60"      # Vert
+GLOBAL_COLOR = "F39C12"   # Orange
+TEAM0_COLOR = "DAEEF3"    # Bleu très clair
+TEAM1_COLOR = "F2DCDB"    # Rouge très clair
+
+HEADER_HEIGHT = 30
+MAX_SHEET_TITLE = 31  # limite Excel
+
+
+def column_width(col_name):
+    """Largeur par défaut selon le type de colonne"""
+    if col_name == 'Joueur':
+        return 20
+    elif col_name == 'Equipe':
+        return 18
+    elif 'Temps Vie' in col_name:
+        return 12
+    elif 'Rating' in col_name or 'KOST' in col_name:
+        return 10
+    return 9
+
+
+def header_style_name(col_name):
+    """Style nommé de l'en-tête selon le side de la colonne"""
+    if 'ATK' in col_name:
+        return 'r6_header_atk'
+    elif 'DEF' in col_name:
+        return 'r6_header_def'
+    elif 'GLOBAL' in col_name:
+        return 'r6_header_global'
+    return 'r6_header'
+
+
+def register_styles(wb):
+    """Déclarer une fois par classeur les styles nommés utilisés par le rapport"""
+    from openpyxl.styles import NamedStyle, Font, PatternFill, Alignment, Border, Side, DEFAULT_FONT
+
+    side = Side(style='thin', color='000000')
+    border = Border(left=side, right=side, top=side, bottom=side)
+    center = Alignment(horizontal='center', vertical='center')
+
+    def fill(color):
+        return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+    header_font = Font(color="FFFFFF", bold=True, size=11)
+    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    for name, color in [('r6_header', HEADER_COLOR), ('r6_header_atk', ATK_COLOR),
+                        ('r6_header_def', DEF_COLOR), ('r6_header_global', GLOBAL_COLOR)]:
+        wb.add_named_style(NamedStyle(name=name, font=header_font, fill=fill(color),
+                                      alignment=header_alignment, border=border))
+
+    # Cellules de données: bordure + centrage; Joueur en gras et Joueur/Equipe colorés par équipe
+    wb.add_named_style(NamedStyle(name='r6_cell', font=DEFAULT_FONT, alignment=center, border=border))
+    player_font = Font(bold=True, size=10)
+    for team, color in [(0, TEAM0_COLOR), (1, TEAM1_COLOR)]:
+        wb.add_named_style(NamedStyle(name=f'r6_player_{team}', font=player_font, fill=fill(color),
+                                      alignment=center, border=border))
+        wb.add_named_style(NamedStyle(name=f'r6_team_{team}', font=DEFAULT_FONT, fill=fill(color),
+                                      alignment=center, border=border))
+
+
+def _styled_cell(ws, value, style):
+    from openpyxl.cell import WriteOnlyCell
+
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+def _new_sheet(wb, title, columns):
+    """Créer une feuille en flux: largeurs, volet figé et en-tête (avant toute ligne)"""
+    from openpyxl.utils import get_column_letter
+
+    ws = wb.create_sheet(title)
+    for col_idx, col_name in enumerate(columns, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = column_width(col_name)
+    ws.freeze_panes = 'A2'
+    ws.row_dimensions[1].height = HEADER_HEIGHT
+    ws.append([_styled_cell(ws, col_name, header_style_name(col_name)) for col_name in columns])
+    return ws
+
+
+def _clean(value):
+    # NaN -> cellule vide (comme pandas.to_excel)
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def sheet_title(name, used):
+    """Titre de feuille valide pour Excel (31 caracteres, sans []:*?/\\) et unique dans le classeur"""
+    base = re.sub(r'[\[\]:*?/\\]', '-', str(name)).strip("'") or 'Match'
+    title = base[:MAX_SHEET_TITLE]
+    n = 2
+    while title.lower() in used:
+        suffix = f" ({n})"
+        title = base[:MAX_SHEET_TITLE - len(suffix)] + suffix
+        n += 1
+    used.add(title.lower())
+    return title
+
+
+def _append_rows(df, sheets_for_team):
+    """Ecrire chaque ligne du DataFrame dans les feuilles retournees par sheets_for_team(equipe)"""
+    columns = list(df.columns)
+    team_col = columns.index('Equipe') if 'Equipe' in columns else None
+    n_cols = len(columns)
+
+    for values in df.itertuples(index=False, name=None):
+        team = values[team_col] if team_col is not None else None
+        # Alterner les couleurs par équipe (colonnes Joueur et Equipe)
+        team_idx = 0 if team == TEAM_OURS else 1
+        first_styles = (f'r6_player_{team_idx}', f'r6_team_{team_idx}')
+
+        for ws in sheets_for_team(team):
+            ws.append([
+                _styled_cell(ws, _clean(values[i]), first_styles[i] if i < 2 else 'r6_cell')
+                for i in range(n_cols)
+            ])
+
+
+def write_report(df, output_file, breakdown=None):
+    """Ecrire le rapport Excel (stats completes + une feuille par equipe)
+
+    Chaque ligne du DataFrame est lue une seule fois et envoyée à la feuille
+    complète et à la feuille de son équipe; rien n'est gardé en mémoire côté
+    openpyxl, le temps d'écriture est linéaire en nombre de lignes.
+    breakdown: liste optionnelle de (nom, DataFrame) ajoutés en feuilles de détail
+    (rapport agrégé: une feuille par match).
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    register_styles(wb)
+
+    columns = [str(c) for c in df.columns]
+    teams = set(df['Equipe']) if 'Equipe' in df.columns else set()
+    used_titles = {SHEET_ALL.lower(), TEAM_OURS.lower(), TEAM_ENEMY.lower()}
+
+    all_sheet = _new_sheet(wb, SHEET_ALL, columns)
+    team_sheets = {}
+    for team in (TEAM_OURS, TEAM_ENEMY):
+        if team in teams:
+            team_sheets[team] = _new_sheet(wb, team, columns)
+
+    _append_rows(df, lambda team: (all_sheet, team_sheets[team]) if team in team_sheets else (all_sheet,))
+
+    for name, match_df in breakdown or []:
+        ws = _new_sheet(wb, sheet_title(name, used_titles), [str(c) for c in match_df.columns])
+        _append_rows(match_df, lambda team: (ws,))
+
+    wb.save(output_file)
@@ -0,0 +1,261 @@
+"""
+Resultats des analyses, persistes en JSON et exportes a la demande
+Le tableau du moteur est enregistre une fois (data/results/<nom>.json); l'interface
+l'affiche directement et les exports (Excel, CSV, Parquet) ne sont generes que
+lorsqu'on les demande. Le classeur Excel est garde dans data/reports une fois ecrit
+"""
+
+import io
+import json
+import os
+import threading
+import time
+
+from metrics import get_metrics
+
+# Incrementer si le format des fichiers de resultats change
+RESULT_VERSION = 1
+
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+EXPORT_MIMETYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class ExportUnavailable(RuntimeError):
+    """Format d'export dont la bibliotheque optionnelle n'est pas installee"""
+
+
+def table_payload(df):
+    """{'columns', 'data'} d'un DataFrame (NaN -> null), pret pour json.dump"""
+    return json.loads(df.to_json(orient='split', index=False))
+
+
+def table_frame(table):
+    """Inverse de table_payload()"""
+    import pandas as pd
+    return pd.DataFrame(table['data'], columns=table['columns'])
+
+
+class ResultStore:
+    """Tableaux de resultats par nom de rapport (sans extension) dans results_folder
+
+    Le nom d'un resultat est celui de son rapport Excel (Map_DateGame_Type_DateAnalyse):
+    /download/<nom>.xlsx genere le classeur au premier telechargement.
+    """
+
+    def __init__(self, results_folder, reports_folder):
+        self.results_folder = results_folder
+        self.reports_folder = reports_folder
+        self._lock = threading.Lock()
+        self._excel_lock = threading.Lock()
+        # nom -> (mtime du fichier, resume): /reports ne relit pas chaque tableau
+        self._summaries = {}
+        self._listeners = []
+        os.makedirs(results_folder, exist_ok=True)
+        os.makedirs(reports_folder, exist_ok=True)
+
+    def _path(self, name):
+        # Les noms viennent des URLs: pas de chemin
+        if not name or os.path.basename(name) != name or name.startswith('.'):
+            raise ValueError(f"nom de resultat invalide: {name!r}")
+        return os.path.join(self.results_folder, f"{name}.json")
+
+    def add_listener(self, callback):
+        """callback(nom) appele apres chaque ecriture ou suppression d'un resultat ou de son classeur"""
+        self._listeners.append(callback)
+
+    def _notify(self, name):
+        # Hors des verrous du store: un listener peut relire le store
+        for callback in self._listeners:
+            try:
+                callback(name)
+            except Exception as e:
+                print(f"[WARNING] Notification du resultat {name} echouee ({e})")
+
+    def excel_file(self, name):
+        """Chemin du classeur Excel d'un resultat (existant ou non)"""
+        return os.path.join(self.reports_folder, f"{name}.xlsx")
+
+    def exists(self, name):
+        try:
+            return os.path.exists(self._path(name))
+        except ValueError:
+            return False
+
+    def _taken(self, name):
+        return os.path.exists(self._path(name)) or os.path.exists(self.excel_file(name))
+
+    def save(self, name, df, breakdown=None, meta=None):
+        """Enregistrer le tableau d'une analyse (ecriture atomique), retourne le nom retenu
+
+        Les noms sont a la minute pres: un nom deja pris (resultat ou rapport Excel)
+        recoit un suffixe _2, _3... au lieu d'ecraser un rapport existant.
+        breakdown: liste optionnelle de (nom, DataFrame) (detail par match d'un agregat).
+        """
+        payload = {
+            'version': RESULT_VERSION,
+            'created': time.time(),
+            'meta': meta or {},
+            'table': table_payload(df),
+            'breakdown': [{'name': str(match_name), 'table': table_payload(match_df)}
+                          for match_name, match_df in breakdown or []],
+        }
+        with self._lock:
+            final_name = name
+            suffix = 2
+            while self._taken(final_name):
+                final_name = f"{name}_{suffix}"
+                suffix += 1
+            payload['name'] = final_name
+            path = self._path(final_name)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        self._notify(final_name)
+        return final_name
+
+    def load(self, name):
+        """Resultat complet (meta, table, breakdown) ou None s'il est absent ou illisible"""
+        try:
+            with open(self._path(name), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Resultat {name} illisible ({e})")
+            return None
+        if data.get('version') != RESULT_VERSION:
+            return None
+        return data
+
+    def summary(self, name, data=None):
+        """Description courte d'un resultat (liste des rapports)"""
+        try:
+            st = os.stat(self._path(name))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            cached = self._summaries.get(name)
+        if cached is not None and cached[0] == st.st_mtime_ns:
+            summary = dict(cached[1])
+        else:
+            data = data if data is not None else self.load(name)
+            if data is None:
+                return None
+            meta = data.get('meta', {})
+            summary = {
+                'name': name,
+                'filename': f"{name}.xlsx",
+                'created': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data.get('created', 0))),
+                'size': st.st_size,
+                'players': len(data['table']['data']),
+                'matches': [entry['name'] for entry in data.get('breakdown', [])],
+                **{key: meta[key] for key in ('kind', 'match', 'rounds') if key in meta},
+            }
+            with self._lock:
+                self._summaries[name] = (st.st_mtime_ns, dict(summary))
+        # Le classeur peut etre ecrit ou supprime a tout moment
+        summary['excel'] = os.path.exists(self.excel_file(name))
+        return summary
+
+    def list(self):
+        """Resumes de tous les resultats, du plus recent au plus ancien"""
+        summaries = []
+        for entry in os.scandir(self.results_folder):
+            if entry.name.endswith('.json'):
+                summary = self.summary(entry.name[:-5])
+                if summary is not None:
+                    summaries.append(summary)
+        summaries.sort(key=lambda item: item['created'], reverse=True)
+        return summaries
+
+    def frames(self, name):
+        """(DataFrame des totaux, [(nom, DataFrame)] du detail) d'un resultat, ou None"""
+        data = self.load(name)
+        if data is None:
+            return None
+        return table_frame(data['table']), [(entry['name'], table_frame(entry['table']))
+                                            for entry in data.get('breakdown', [])]
+
+    def excel(self, name):
+        """Chemin du classeur Excel du resultat, ecrit au premier appel (None si resultat inconnu)"""
+        excel_path = self.excel_file(name)
+        if os.path.exists(excel_path):
+            return excel_path
+        with self._excel_lock:
+            if os.path.exists(excel_path):
+                return excel_path
+            frames = self.frames(name)
+            if frames is None:
+                return None
+            from report_writer import write_report
+
+            df, breakdown = frames
+            tmp_path = f"{excel_path}.{os.getpid()}.tmp.xlsx"
+            try:
+                with get_metrics().timer('excel'):
+                    write_report(df, tmp_path, breakdown=breakdown)
+                os.replace(tmp_path, excel_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            print(f"[OK] Rapport Excel genere: {os.path.basename(excel_path)}")
+        self._notify(name)
+        return excel_path
+
+    def delete(self, name):
+        """Supprimer un resultat et son classeur Excel (ou un ancien classeur seul), True si trouve"""
+        removed = False
+        with self._lock:
+            for path in (self._path(name), self.excel_file(name)):
+                try:
+                    os.remove(path)
+                    removed = True
+                except FileNotFoundError:
+                    pass
+            self._summaries.pop(name, None)
+        if removed:
+            self._notify(name)
+        return removed
+
+    def export(self, name, fmt, table=None):
+        """Export d'un resultat: (contenu en bytes, type MIME, nom de fichier), ou None si inconnu
+
+        fmt: 'csv' ou 'parquet' (Excel: voir excel()). table: nom d'un match du detail
+        d'un agregat, sinon le tableau des totaux. Leve ValueError (format ou table
+        inconnus) et ExportUnavailable (Parquet sans pyarrow ni fastparquet).
+        """
+        if fmt not in ('csv', 'parquet'):
+            raise ValueError(f"format d'export inconnu: {fmt}")
+        frames = self.frames(name)
+        if frames is None:
+            return None
+        df, breakdown = frames
+        filename = name
+        if table:
+            matches = dict(breakdown)
+            if table not in matches:
+                raise ValueError(f"table inconnue: {table}")
+            df = matches[table]
+            filename = f"{name}_{table}"
+
+        buffer = io.BytesIO()
+        with get_metrics().timer('export'):
+            if fmt == 'csv':
+                # BOM: Excel detecte l'UTF-8 (accents des noms de joueurs)
+                buffer.write(df.to_csv(index=False).encode('utf-8-sig'))
+            else:
+                try:
+                    df.to_parquet(buffer, index=False)
+                except ImportError:
+                    raise ExportUnavailable("export Parquet indisponible: installer pyarrow (pip install pyarrow)") from None
+        return buffer.getvalue(), EXPORT_MIMETYPES[fmt], f"{filename}.{fmt}"
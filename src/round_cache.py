@@ -0,0 +1,206 @@
+"""
+Cache des rounds parses par r6-dissect, adresse par le contenu du .rec
+Re-analyser un match avec d'autres options ne relance pas r6-dissect
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Empreintes de .rec gardees en memoire: au moins MEMO_MIN_ENTRIES, sinon
+# MEMO_PER_ENTRY fois le nombre d'entrees du cache (LRU, comme le cache sur disque)
+MEMO_MIN_ENTRIES = 1024
+MEMO_PER_ENTRY = 2
+
+
+def file_fingerprint(path):
+    """(taille, mtime) d'un fichier"""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class RoundCache:
+    """JSON de rounds indexes par empreinte du .rec (taille + mtime + hash du contenu)
+    et par version de r6-dissect, avec une taille maximale et eviction LRU.
+
+    Les fichiers sont stockes dans cache_dir/<cle>.json; la date d'acces (mtime du
+    fichier cache) sert d'horloge LRU et survit aux redemarrages.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # cle -> [taille, derniere utilisation]
+        self._index = {}
+        self._total_bytes = 0
+        # (chemin, taille, mtime) -> hash du contenu: un .rec inchange n'est hashe qu'une fois
+        # (LRU borne par _memo_limit: un serveur qui tourne longtemps voit tous les .rec)
+        self._content_hashes = OrderedDict()
+        # (chemin, taille, mtime) -> version de r6-dissect
+        self._versions = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Reconstruire l'index depuis le dossier du cache"""
+        with self._lock:
+            self._index = {}
+            self._total_bytes = 0
+            for entry in os.scandir(self.cache_dir):
+                if not entry.name.endswith('.json'):
+                    # Fichier temporaire d'une ecriture interrompue
+                    if entry.name.endswith('.tmp'):
+                        os.remove(entry.path)
+                    continue
+                st = entry.stat()
+                self._index[entry.name[:-5]] = [st.st_size, st.st_mtime]
+                self._total_bytes += st.st_size
+
+    def _memo_limit(self):
+        return max(MEMO_MIN_ENTRIES, MEMO_PER_ENTRY * len(self._index))
+
+    def _memo_get(self, memo, memo_key):
+        with self._memo_lock:
+            value = memo.get(memo_key)
+            if value is not None:
+                memo.move_to_end(memo_key)
+            return value
+
+    def _memo_put(self, memo, memo_key, value):
+        limit = self._memo_limit()
+        with self._memo_lock:
+            memo[memo_key] = value
+            memo.move_to_end(memo_key)
+            # Les empreintes les moins recemment utilisees (ou d'un .rec modifie depuis) en premier
+            while len(memo) > limit:
+                memo.popitem(last=False)
+
+    def _content_hash(self, rec_path):
+        size, mtime = file_fingerprint(rec_path)
+        memo_key = (rec_path, size, mtime)
+        digest = self._memo_get(self._content_hashes, memo_key)
+        if digest is None:
+            h = hashlib.blake2b(digest_size=20)
+            with open(rec_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            self._memo_put(self._content_hashes, memo_key, digest)
+        return size, mtime, digest
+
+    def dissect_version(self, r6_dissect):
+        """Identite de l'executable r6-dissect (taille + mtime + hash): change a chaque mise a jour"""
+        size, mtime = file_fingerprint(r6_dissect)
+        memo_key = (r6_dissect, size, mtime)
+        version = self._memo_get(self._versions, memo_key)
+        if version is None:
+            version = '-'.join(str(part) for part in self._content_hash(r6_dissect))
+            self._memo_put(self._versions, memo_key, version)
+        return version
+
+    def key(self, rec_path, r6_dissect):
+        """Cle de cache d'un round: empreinte du .rec + version de r6-dissect"""
+        size, mtime, digest = self._content_hash(rec_path)
+        raw = f"{size}:{mtime}:{digest}:{self.dissect_version(r6_dissect)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """JSON du round en cache (bytes), ou None si absent"""
+        path = self._path(key)
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Marquer comme recemment utilise
+            os.utime(path)
+        except OSError:
+            # Fichier supprime a la main: oublier l'entree
+            with self._lock:
+                entry = self._index.pop(key, None)
+                if entry:
+                    self._total_bytes -= entry[0]
+                self.misses += 1
+            return None
+
+        with self._lock:
+            entry = self._index.get(key)
+            if entry:
+                entry[1] = os.path.getmtime(path)
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Ajouter le JSON d'un round (bytes) au cache puis evincer les plus anciens si la taille max est depassee"""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARNING] Impossible d'ajouter le round au cache ({e})")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        st = os.stat(path)
+        with self._lock:
+            previous = self._index.get(key)
+            if previous:
+                self._total_bytes -= previous[0]
+            self._index[key] = [st.st_size, st.st_mtime]
+            self._total_bytes += st.st_size
+            self._evict_locked()
+
+    def _evict_locked(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        # Les moins recemment utilises en premier
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self._index[key]
+            self._total_bytes -= size
+
+    def clear(self):
+        """Vider completement le cache"""
+        with self._lock:
+            for key in list(self._index):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._index = {}
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._index),
+                'memo_entries': len(self._content_hashes),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
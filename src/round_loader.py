@@ -0,0 +1,237 @@
+"""
+Lecture selective des rounds JSON de r6-dissect
+Seuls les champs utilises par le moteur (teams, players, matchFeedback, stats)
+sont extraits et valides, une fois, dans un RoundRecord; le JSON complet du
+round est libere aussitot. orjson est utilise s'il est installe
+"""
+
+import json
+from collections import namedtuple
+
+try:
+    import orjson  # optionnel: parse plus rapide que json
+except ImportError:
+    orjson = None
+
+# Sides indexes par entier: evite les comparaisons de chaines a chaque event
+ATK, DEF = 0, 1
+
+MULTIKILL_WINDOW = 10  # secondes max entre deux kills d'un meme joueur pour un multi-kill
+TRADE_WINDOW = 10      # secondes max entre la mort d'un joueur et celle de son tueur pour un trade
+DEFUSER_TIMER = 45     # secondes du minuteur du defuseur (compte a rebours apres la plante)
+
+# Enregistrement compact d'un round, construit en un seul passage sur matchFeedback
+RoundRecord = namedtuple('RoundRecord', [
+    'sides',        # username -> ATK / DEF
+    'teams',        # username -> teamIndex
+    'kills',        # liste de (killer, victim, headshot, timeInSeconds) dans l'ordre des events
+    'death_times',  # victim -> timeInSeconds de sa (derniere) mort
+    'first_kill',   # (killer, victim) du premier kill, ou None
+    'plants',       # liste de (username, timeInSeconds) des plantes completes
+    'defuses',      # liste de (username, timeInSeconds) des diffuses completes
+    'stats',        # liste de (username, kills, died)
+    'winner',       # teamIndex de l'equipe gagnante, ou None si inconnu
+    'trades',       # par kill (meme ordre que kills): True si le kill venge un coequipier (trade)
+    'quick_kills',  # par kill: True si le tueur avait deja tue moins de MULTIKILL_WINDOW secondes avant
+    'traded',       # joueurs dont la mort a ete tradee
+    'clutches',     # liste de (username, adversaires): dernier en vie de son equipe face a 1..5 joueurs
+])
+
+
+class RoundFormatError(ValueError):
+    """Round JSON qui ne respecte pas le schema attendu par le moteur"""
+
+
+def json_backend():
+    """Nom de la bibliotheque utilisee pour parser les rounds"""
+    return 'orjson' if orjson is not None else 'json'
+
+
+def loads_json(data):
+    """Parser du JSON en bytes (sortie de r6-dissect); leve ValueError si le JSON est invalide"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_json(path):
+    """Parser un fichier JSON (orjson si disponible); leve ValueError si le JSON est invalide"""
+    with open(path, 'rb') as f:
+        return loads_json(f.read())
+
+
+def _expect_list(round_data, key, required=True):
+    value = round_data.get(key)
+    if value is None and not required:
+        return []
+    if not isinstance(value, list):
+        raise RoundFormatError(f"'{key}' absent ou invalide")
+    return value
+
+
+def build_round_record(round_data):
+    """Construire le RoundRecord d'un round JSON r6-dissect (un seul passage sur les events)
+
+    Leve RoundFormatError si un champ utilise par le moteur manque ou a le mauvais type.
+    """
+    if not isinstance(round_data, dict):
+        raise RoundFormatError("le round n'est pas un objet JSON")
+    round_teams = _expect_list(round_data, 'teams')
+    round_players = _expect_list(round_data, 'players')
+    feedback = _expect_list(round_data, 'matchFeedback', required=False)
+    round_stats = _expect_list(round_data, 'stats', required=False)
+
+    # Chemin du champ en cours de lecture, pour le message d'erreur
+    where = 'teams'
+    try:
+        # Déterminer qui est ATK et qui est DEF
+        team_sides = [ATK if team['role'] == 'Attack' else DEF for team in round_teams]  # "Attack" ou "Defense"
+
+        # Mapper chaque joueur à son side dans ce round
+        sides = {}
+        teams = {}
+        for i, player in enumerate(round_players):
+            where = f'players[{i}]'
+            username = player['username']
+            team_index = player['teamIndex']
+            if not isinstance(team_index, int) or not 0 <= team_index < len(team_sides):
+                raise RoundFormatError(f"{where}: teamIndex invalide ({team_index!r})")
+            sides[username] = team_sides[team_index]
+            teams[username] = team_index
+
+        kills = []
+        kill_clock = []
+        death_times = {}
+        first_kill = None
+        plants = []
+        defuses = []
+        # Horloge monotone du round: timeInSeconds est un compte a rebours qui repart
+        # du minuteur du defuseur apres la plante. Ses baisses font avancer l'horloge; apres
+        # une plante, un temps d'au plus DEFUSER_TIMER est ce minuteur, qu'il monte ou
+        # descende par rapport au temps precedent: le temps ecoule depuis la plante est
+        # DEFUSER_TIMER - timeInSeconds. Un temps superieur apres la plante montre que le
+        # compte a rebours du round continue (pas de minuteur): retour aux baisses
+        clock = 0.0
+        last_time = None
+        plant_clock = None
+
+        for i, event in enumerate(feedback):
+            where = f'matchFeedback[{i}]'
+            event_type = event['type']['name']
+            time_sec = event.get('timeInSeconds')
+            if isinstance(time_sec, (int, float)):
+                if plant_clock is not None and time_sec <= DEFUSER_TIMER:
+                    clock = max(clock, plant_clock + DEFUSER_TIMER - time_sec)
+                else:
+                    plant_clock = None
+                    if last_time is not None and time_sec < last_time:
+                        clock += last_time - time_sec
+                last_time = time_sec
+
+            if event_type == 'Kill':
+                killer = event['username']
+                victim = event['target']
+                time_sec = event['timeInSeconds']
+
+                if first_kill is None:
+                    first_kill = (killer, victim)
+
+                kills.append((killer, victim, event['headshot'], time_sec))
+                kill_clock.append(clock)
+                death_times[victim] = time_sec
+
+            elif event_type == 'DefuserPlantComplete':
+                plants.append((event['username'], event.get('timeInSeconds')))
+                plant_clock = clock
+
+            elif event_type == 'DefuserDisableComplete':
+                defuses.append((event['username'], event.get('timeInSeconds')))
+
+        stats = []
+        for i, stat in enumerate(round_stats):
+            where = f'stats[{i}]'
+            stats.append((stat['username'], stat['kills'], stat['died']))
+
+        where = 'teams'
+        winners = [i for i, team in enumerate(round_teams) if team.get('won')]
+    except (KeyError, TypeError) as e:
+        raise RoundFormatError(f"{where}: champ manquant ou invalide ({e})") from None
+
+    winner = winners[0] if len(winners) == 1 else None
+    trades, quick_kills, traded, clutches = scan_kills(kills, kill_clock, sides, teams, len(team_sides))
+    return RoundRecord(sides, teams, kills, death_times, first_kill, plants, defuses, stats,
+                       winner, trades, quick_kills, traded, clutches)
+
+
+def scan_kills(kills, kill_clock, sides, teams, team_count=2):
+    """Trades, multi-kills et clutchs d'un round, en un seul passage sur les kills dans l'ordre
+
+    kills: (killer, victim, headshot, time) dans l'ordre des events; kill_clock: horloge
+    monotone (secondes ecoulees) de chaque kill.
+    Un kill est un trade s'il tue, moins de TRADE_WINDOW secondes apres, un joueur
+    qui venait de tuer un coequipier du tueur: la mort de ce coequipier est tradee.
+    Un joueur est en clutch quand il devient le dernier en vie de son equipe alors
+    qu'au moins un adversaire est en vie (1vX, X = adversaires encore en vie).
+    Retourne (trades, quick_kills, traded, clutches), voir RoundRecord.
+    """
+    trades = []
+    quick_kills = []
+    traded = []
+    clutches = []
+
+    alive = [set() for _ in range(team_count)]
+    for username, team_index in teams.items():
+        alive[team_index].add(username)
+    in_clutch = [False] * team_count
+    recent_victims = {}  # tueur -> [(horloge, victime)] de ses kills d'adversaires
+    last_kill = {}       # tueur -> horloge de son dernier kill
+
+    for (killer, victim, _, _), now in zip(kills, kill_clock):
+        killer_side = sides.get(killer)
+        victim_side = sides.get(victim)
+
+        # Multi-kill: meme fenetre que l'ancien tri des temps de kill
+        previous = last_kill.get(killer)
+        quick_kills.append(previous is not None and now - previous <= MULTIKILL_WINDOW)
+        last_kill[killer] = now
+
+        # Trade: la victime avait tue un coequipier du tueur il y a moins de TRADE_WINDOW secondes
+        avenged = []
+        if killer_side is not None and victim_side is not None and killer_side != victim_side:
+            avenged = [dead for when, dead in recent_victims.pop(victim, ())
+                       if now - when <= TRADE_WINDOW and sides.get(dead) == killer_side]
+            recent_victims.setdefault(killer, []).append((now, victim))
+        else:
+            recent_victims.pop(victim, None)
+        trades.append(bool(avenged))
+        traded.extend(avenged)
+
+        # Joueurs en vie et clutchs
+        victim_team = teams.get(victim)
+        if victim_team is None or victim not in alive[victim_team]:
+            continue
+        alive[victim_team].discard(victim)
+        for team_index, players in enumerate(alive):
+            if len(players) == 1 and not in_clutch[team_index]:
+                opponents = sum(len(other) for other_index, other in enumerate(alive) if other_index != team_index)
+                if opponents:
+                    in_clutch[team_index] = True
+                    clutches.append((next(iter(players)), opponents))
+
+    return trades, quick_kills, traded, clutches
+
+
+def load_round(path):
+    """Lire un fichier roundNN.json et le reduire a son RoundRecord
+
+    Leve ValueError (JSON invalide ou RoundFormatError) et OSError (lecture).
+    """
+    return build_round_record(read_json(path))
+
+
+def parse_round(data):
+    """Reduire le JSON d'un round (bytes, sortie de r6-dissect) a son RoundRecord
+
+    Leve ValueError (JSON invalide ou RoundFormatError).
+    """
+    return build_round_record(loads_json(data))
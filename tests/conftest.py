@@ -0,0 +1,14 @@
+"""
+Configuration pytest: les modules du moteur (src/) sont importes directement,
+comme depuis web/app.py et les benchmarks
+"""
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(BASE_DIR, 'src')
+BENCH_DIR = os.path.join(BASE_DIR, 'benchmarks')
+for path in (SRC_DIR, BENCH_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,131 @@
+"""
+Agregats partiels par match (rapport agrege en ligne de commande)
+"""
+
+import json
+import os
+
+import pandas as pd
+
+import analyze_match_complete as engine
+import synthetic
+from aggregate_store import AggregateStore, files_signature
+from analyze_match_complete import analyze, analyze_aggregate, load_match_partials, load_rounds, round_files
+
+ROSTER = [('alice', 0), ('bob', 0), ('carol', 1), ('dave', 1)]
+
+
+def make_round(n):
+    """Round JSON minimal au format de r6-dissect; les sides s'inversent a chaque round"""
+    attack = n % 2
+    kills = [('alice', 'carol', 170 - n), ('dave', 'bob', 150 - n)] if n % 3 else [('carol', 'alice', 160)]
+    dead = {victim for _, victim, _ in kills}
+    return {
+        'teams': [{'name': 'BLUE', 'role': 'Attack' if attack == 0 else 'Defense'},
+                  {'name': 'ORANGE', 'role': 'Attack' if attack == 1 else 'Defense'}],
+        'players': [{'username': name, 'teamIndex': team} for name, team in ROSTER],
+        'matchFeedback': [{'type': {'name': 'Kill'}, 'username': killer, 'target': victim,
+                           'headshot': n % 2 == 0, 'timeInSeconds': time_sec}
+                          for killer, victim, time_sec in kills],
+        'stats': [{'username': name, 'kills': sum(killer == name for killer, _, _ in kills), 'died': name in dead}
+                  for name, _ in ROSTER],
+    }
+
+
+def write_rounds(match_dir, rounds_data):
+    os.makedirs(match_dir, exist_ok=True)
+    for i, round_data in enumerate(rounds_data, 1):
+        with open(os.path.join(match_dir, f"round{i:02d}.json"), 'w', encoding='utf-8') as f:
+            json.dump(round_data, f)
+
+
+def test_partial_is_reused_until_rounds_change(tmp_path):
+    match_dir = str(tmp_path / 'match')
+    write_rounds(match_dir, [make_round(n) for n in range(1, 7)])
+    store = AggregateStore(str(tmp_path / 'aggregates'))
+
+    (name, first, rounds), = load_match_partials([match_dir], store)
+    assert (name, rounds) == ('match', 6)
+    assert store.stats() == {'hits': 0, 'misses': 1}
+
+    (_, again, _), = load_match_partials([match_dir], store)
+    assert store.stats()['hits'] == 1
+    pd.testing.assert_frame_equal(analyze_aggregate([(name, again, rounds)])['dataframe'],
+                                  analyze_aggregate([(name, first, rounds)])['dataframe'])
+
+    # Un round qui change invalide l'agregat
+    os.remove(os.path.join(match_dir, 'round06.json'))
+    (_, _, rounds), = load_match_partials([match_dir], store)
+    assert rounds == 5
+    assert store.stats()['misses'] == 2
+
+
+def test_aggregate_equals_report_of_all_rounds(tmp_path):
+    first_dir, second_dir = str(tmp_path / 'first'), str(tmp_path / 'second')
+    write_rounds(first_dir, [make_round(n) for n in range(1, 5)])
+    write_rounds(second_dir, [make_round(n) for n in range(5, 12)])
+    store = AggregateStore(str(tmp_path / 'aggregates'))
+
+    # Un seul match: memes totaux que le rapport classique
+    single = analyze_aggregate(load_match_partials([first_dir], store))
+    pd.testing.assert_frame_equal(single['dataframe'], analyze(load_rounds(first_dir))['dataframe'])
+
+    result = analyze_aggregate(load_match_partials([first_dir, second_dir], store))
+    expected = analyze(load_rounds(first_dir) + load_rounds(second_dir))
+    assert (result['matches'], result['rounds']) == (2, 11)
+    assert [name for name, _ in result['breakdown']] == ['first', 'second']
+    pd.testing.assert_frame_equal(result['dataframe'], expected['dataframe'])
+
+
+def test_round_files_are_the_files_load_rounds_reads(tmp_path):
+    match_dir = str(tmp_path / 'match')
+    _, rounds_data = synthetic.generate_season(matches=1, rounds=15, seed=4)[0]
+    write_rounds(match_dir, rounds_data)
+    os.remove(os.path.join(match_dir, 'round03.json'))
+    open(os.path.join(match_dir, 'round05.json'), 'w').close()  # vide
+    os.remove(os.path.join(match_dir, 'round14.json'))  # la recherche s'arrete apres le 13e
+
+    numbers = [i for i, _ in round_files(match_dir)]
+    assert numbers == [1, 2, 4] + list(range(6, 14))
+    assert len(load_rounds(match_dir)) == len(numbers)
+
+
+def test_partial_ignores_files_load_rounds_does_not_read(tmp_path):
+    match_dir = str(tmp_path / 'match')
+    _, rounds_data = synthetic.generate_season(matches=1, rounds=6, seed=8)[0]
+    write_rounds(match_dir, rounds_data)
+    store = AggregateStore(str(tmp_path / 'aggregates'))
+
+    (name, first, rounds), = load_match_partials([match_dir], store)
+    assert rounds == 6
+
+    # Fichiers sans rapport avec l'analyse: l'agregat partiel reste valide
+    for extra in ('round99.json', 'round_notes.json', 'rounds.json'):
+        with open(os.path.join(match_dir, extra), 'w') as f:
+            f.write('{}')
+    hits = store.stats()['hits']
+    (_, again, _), = load_match_partials([match_dir], store)
+    assert store.stats()['hits'] == hits + 1
+    assert again.to_dict() == first.to_dict()
+
+    # Un round lu qui change invalide l'agregat
+    os.remove(os.path.join(match_dir, 'round06.json'))
+    (_, _, rounds), = load_match_partials([match_dir], store)
+    assert rounds == 5
+
+
+def test_engine_version_invalidates_partials(tmp_path, monkeypatch):
+    match_dir = str(tmp_path / 'match')
+    _, rounds_data = synthetic.generate_season(matches=1, rounds=3, seed=5)[0]
+    write_rounds(match_dir, rounds_data)
+    store = AggregateStore(str(tmp_path / 'aggregates'))
+    signature = files_signature(path for _, path in round_files(match_dir))
+
+    key = store.key(match_dir, signature)
+    store.put(key, 'match', 3, {})
+    assert store.get(key) is not None
+
+    # Moteur modifie: nouvelle cle, et l'agregat deja enregistre n'est plus relu
+    monkeypatch.setattr(engine, 'ENGINE_VERSION', engine.ENGINE_VERSION + 1)
+    assert store.key(match_dir, signature) != key
+    assert store.get(key) is None
@@ -0,0 +1,114 @@
+"""
+run_dissect: JSON lu sur stdout, repli sur -o et fichier temporaire, erreurs de r6-dissect,
+priorite reduite en travail de fond
+"""
+
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+
+import pytest
+
+import dissect_pool
+from dissect_pool import run_dissect
+
+ROUND_JSON = b'{"matchFeedback": []}'
+
+STDOUT_TOOL = """
+import sys
+sys.stdout.write(open(sys.argv[1]).read())
+"""
+
+# Version de l'outil qui n'ecrit le JSON que dans le fichier passe par -o
+FILE_TOOL = """
+import shutil, sys
+args = sys.argv[1:]
+if '-o' in args:
+    shutil.copyfile(args[0], args[args.index('-o') + 1])
+else:
+    print('Parsed ' + args[0])
+"""
+
+FAILING_TOOL = """
+import sys
+sys.stderr.write('unsupported replay version\\n')
+sys.exit(3)
+"""
+
+# Ecrit sa valeur de nice, une fois la priorite baissee par le processus parent
+NICE_TOOL = """
+import json, os, sys, time
+time.sleep(0.5)
+sys.stdout.write(json.dumps({'nice': os.nice(0)}))
+"""
+
+SLOW_TOOL = """
+import time
+time.sleep(30)
+"""
+
+
+def make_tool(tmp_path, name, source):
+    path = tmp_path / name
+    path.write_text(f"#!{sys.executable}\n{source}")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+@pytest.fixture
+def rec(tmp_path):
+    path = tmp_path / 'R01.rec'
+    path.write_bytes(ROUND_JSON)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def fresh_tool_modes(monkeypatch):
+    monkeypatch.setattr(dissect_pool, '_stdout_tools', set())
+    monkeypatch.setattr(dissect_pool, '_file_output_tools', set())
+
+
+pytestmark = pytest.mark.skipif(os.name == 'nt', reason='outils factices en scripts shebang')
+
+
+def test_reads_json_from_stdout(tmp_path, rec):
+    tool = make_tool(tmp_path, 'r6-dissect', STDOUT_TOOL)
+    assert run_dissect(tool, rec) == ROUND_JSON
+    assert tool in dissect_pool._stdout_tools
+
+
+def test_falls_back_to_output_file(tmp_path, rec, monkeypatch):
+    temp_dir = tmp_path / 'tmp'
+    temp_dir.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(temp_dir))
+    tool = make_tool(tmp_path, 'r6-dissect', FILE_TOOL)
+    assert run_dissect(tool, rec) == ROUND_JSON
+    assert tool in dissect_pool._file_output_tools
+    # Mode retenu: directement -o, sans fichier temporaire laisse derriere
+    assert run_dissect(tool, rec) == ROUND_JSON
+    assert os.listdir(temp_dir) == []
+
+
+def test_failure_logs_stderr(tmp_path, rec, capsys):
+    tool = make_tool(tmp_path, 'r6-dissect', FAILING_TOOL)
+    assert run_dissect(tool, rec) is None
+    out = capsys.readouterr().out
+    assert '(code 3)' in out and 'unsupported replay version' in out
+    assert tool not in dissect_pool._file_output_tools
+
+
+def test_low_priority_lowers_niceness(tmp_path, rec):
+    tool = make_tool(tmp_path, 'r6-dissect', NICE_TOOL)
+    expected = min(os.nice(0) + dissect_pool.LOW_PRIORITY_NICE, 19)
+    assert json.loads(run_dissect(tool, rec, low_priority=True)) == {'nice': expected}
+    assert json.loads(run_dissect(tool, rec)) == {'nice': os.nice(0)}
+
+
+def test_low_priority_timeout_kills_tool(tmp_path, rec):
+    tool = make_tool(tmp_path, 'r6-dissect', SLOW_TOOL)
+    started = time.monotonic()
+    assert run_dissect(tool, rec, timeout=0.5, low_priority=True) is None
+    assert time.monotonic() - started < 10
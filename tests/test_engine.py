@@ -0,0 +1,138 @@
+"""
+Moteur de stats: le calcul vectorise (flatten_rounds + stats_from_tables) donne
+les memes compteurs et le meme rapport qu'une boucle Python round par round
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+from analyze_match_complete import (DEFAULT_STATS, KILL_TIERS, ROUND_DURATION, build_dataframe, build_options,
+                                    compute_player_stats)
+from player_stats import STAT_INDEX, PlayerStats
+from round_loader import build_round_record
+
+
+def synthetic_records(seed, matches=3, rounds=12):
+    """RoundRecords de matchs synthetiques, avec une equipe gagnante tiree au hasard par round"""
+    rng = random.Random(seed)
+    records = []
+    for _, rounds_data in synthetic.generate_season(matches=matches, rounds=rounds, seed=seed):
+        for round_data in rounds_data:
+            round_data['teams'][rng.randint(0, 1)]['won'] = True
+            records.append(build_round_record(round_data))
+    return records
+
+
+def loop_player_stats(records):
+    """Reference: compteurs calcules event par event, round par round"""
+    names, teams, counts = [], {}, {}
+
+    def add(username, side, stat, value=1):
+        if side is None:
+            return
+        counts.setdefault(username, np.zeros((2, len(STAT_INDEX))))[side, STAT_INDEX[stat]] += value
+
+    for record in records:
+        sides = record.sides
+        for username, team in record.teams.items():
+            if username not in teams:
+                names.append(username)
+                teams[username] = team
+                counts.setdefault(username, np.zeros((2, len(STAT_INDEX))))
+
+        round_kills = {}
+        quick_killers = set()
+        for seq, ((killer, victim, headshot, _), trade, quick) in enumerate(
+                zip(record.kills, record.trades, record.quick_kills)):
+            killer_side = sides.get(killer)
+            victim_side = sides.get(victim)
+            add(killer, killer_side, 'kills')
+            add(killer, killer_side, 'headshots', bool(headshot))
+            add(killer, killer_side, 'teamkills', victim_side == killer_side)
+            add(killer, killer_side, 'trades', trade)
+            if quick and killer:
+                quick_killers.add(killer)
+            if killer_side is not None and victim_side is not None and killer_side != victim_side:
+                round_kills[killer] = round_kills.get(killer, 0) + 1
+            if seq == 0:
+                if killer:
+                    add(killer, killer_side, 'opening_kills')
+                if victim:
+                    add(victim, victim_side, 'opening_deaths')
+
+        for killer in quick_killers:
+            add(killer, sides.get(killer), 'multikills')
+        for killer, count in round_kills.items():
+            for tier, stat in KILL_TIERS:
+                add(killer, sides.get(killer), stat, min(count, KILL_TIERS[-1][0]) == tier)
+
+        for username in record.traded:
+            add(username, sides.get(username), 'traded_deaths')
+        for username, _ in record.clutches:
+            add(username, sides.get(username), 'clutch_attempts')
+            add(username, sides.get(username), 'clutch_wins', record.teams[username] == record.winner)
+
+        objective = set()
+        for username, _ in record.plants:
+            add(username, sides.get(username), 'plants')
+            objective.add(username)
+        for username, _ in record.defuses:
+            add(username, sides.get(username), 'diffuses')
+            objective.add(username)
+
+        death_times = {}
+        for _, victim, _, time_sec in record.kills:
+            death_times[victim] = time_sec
+        for username, kills, died in record.stats:
+            side = sides.get(username)
+            add(username, side, 'rounds')
+            add(username, side, 'deaths', bool(died))
+            add(username, side, 'rounds_survived', not died)
+            if died:
+                add(username, side, 'survival_time', ROUND_DURATION - death_times[username]
+                    if username in death_times else 0)
+            else:
+                add(username, side, 'survival_time', ROUND_DURATION)
+            kost = kills > 0 or not died or username in objective or username in record.traded
+            add(username, side, 'kost_rounds', kost)
+
+    return PlayerStats(names, [teams[name] for name in names], np.stack([counts[name] for name in names]))
+
+
+@pytest.mark.parametrize('seed', [3, 11, 29])
+def test_vectorised_counters_match_round_loop(seed):
+    records = synthetic_records(seed)
+    vectorised = compute_player_stats(records)
+    reference = loop_player_stats(records)
+
+    assert vectorised.names == reference.names
+    assert vectorised.teams.tolist() == reference.teams.tolist()
+    np.testing.assert_allclose(vectorised.counts, reference.counts)
+
+
+@pytest.mark.parametrize('seed', [3, 11])
+def test_vectorised_report_matches_round_loop(seed):
+    records = synthetic_records(seed)
+    options = build_options(stats=DEFAULT_STATS + ['teamkills'])
+    expected = build_dataframe(loop_player_stats(records), options)
+    actual = build_dataframe(compute_player_stats(records), options)
+
+    pd.testing.assert_frame_equal(actual, expected)
+    for stat_column in ('Kills', 'KOST%', 'Temps Vie', 'HS%', 'Opening K', 'Multi-kills', 'Trades',
+                        'Clutchs', 'Plantes', 'Teamkills', 'Rating'):
+        assert f'GLOBAL {stat_column}' in actual.columns
+
+
+def test_global_kost_is_atk_plus_def():
+    records = synthetic_records(5, matches=1)
+    df = build_dataframe(compute_player_stats(records), build_options())
+
+    assert (df['GLOBAL Rounds KOST'] == df['ATK Rounds KOST'] + df['DEF Rounds KOST']).all()
+    assert df['GLOBAL Rounds KOST'].sum() > 0
+    rounds = df['ATK Rounds'] + df['DEF Rounds']
+    expected = [round(kost / total * 100, 1) for kost, total in zip(df['GLOBAL Rounds KOST'], rounds)]
+    assert df['GLOBAL KOST%'].tolist() == expected
@@ -0,0 +1,106 @@
+"""
+En-tete natif des .rec: proprietes, joueurs, date, fichiers tronques ou sans en-tete
+"""
+
+import pytest
+
+import rec_header
+from rec_header import HEAD_BYTES, HeaderError, encode_header, format_timestamp, parse_properties, read_header
+
+# En-tete tel qu'ecrit en debut de .rec: 'dissect', octets de version, puis des chaines
+# (longueur sur 8 octets little-endian + octets), separees par des octets binaires
+HEADER = (
+    b'dissect\x00\x07\x00\x00\x00\x00\x00\x00\x00'
+    b'\x07\x00\x00\x00\x00\x00\x00\x00version' b'\x01\x00\x00\x00\x00\x00\x00\x007'
+    b'\x07\x00\x00\x00\x00\x00\x00\x00worldid' b'\x0a\x00\x00\x00\x00\x00\x00\x001819327465'
+    b'\x00\x00\x00\x01'
+    b'\x09\x00\x00\x00\x00\x00\x00\x00matchtype' b'\x01\x00\x00\x00\x00\x00\x00\x008'
+    b'\x08\x00\x00\x00\x00\x00\x00\x00datetime' b'\x18\x00\x00\x00\x00\x00\x00\x002024-01-29T16:45:12.118Z'
+    b'\x09\x00\x00\x00\x00\x00\x00\x00teamname0' b'\x04\x00\x00\x00\x00\x00\x00\x00BLUE'
+    b'\x09\x00\x00\x00\x00\x00\x00\x00teamname1' b'\x06\x00\x00\x00\x00\x00\x00\x00ORANGE'
+    b'\x0a\x00\x00\x00\x00\x00\x00\x00playername' b'\x05\x00\x00\x00\x00\x00\x00\x00alice'
+    b'\x04\x00\x00\x00\x00\x00\x00\x00team' b'\x01\x00\x00\x00\x00\x00\x00\x000'
+    b'\x0a\x00\x00\x00\x00\x00\x00\x00playername' b'\x03\x00\x00\x00\x00\x00\x00\x00bob'
+    b'\x04\x00\x00\x00\x00\x00\x00\x00team' b'\x01\x00\x00\x00\x00\x00\x00\x001'
+)
+# Donnees du round apres l'en-tete: binaire, dont une fausse longueur de chaine
+BODY = b'\xff' * (rec_header.MAX_GAP + 1) + b'\x05\x00\x00\x00\x00\x00\x00\x00noise' + b'\x00\xfe' * 512
+
+
+def write(tmp_path, data, name='Match-R01.rec'):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_read_header_fixture(tmp_path):
+    header = read_header(write(tmp_path, HEADER + BODY))
+
+    assert header['map_id'] == 1819327465
+    assert header['match_type_id'] == 8
+    assert header['timestamp'] == '2024-01-29T16:45:12Z'
+    assert header['teams'] == ['BLUE', 'ORANGE']
+    assert header['players'] == [{'username': 'alice', 'team': 0}, {'username': 'bob', 'team': 1}]
+    assert 'noise' not in header['properties']
+
+
+def test_encode_header_matches_fixture_layout():
+    properties = dict(parse_properties(HEADER))
+    properties.pop('playername')
+    properties.pop('team')
+    players = [{'username': 'alice', 'team': 0}, {'username': 'bob', 'team': 1}]
+    assert parse_properties(encode_header(properties, players)) == parse_properties(HEADER)
+
+
+@pytest.mark.parametrize('size', [len(b'dissect') + 3, HEADER.index(b'worldid') + 10])
+def test_truncated_file_raises(tmp_path, size):
+    # Coupe avant ou au milieu de worldid: ni worldid ni matchtype lisibles
+    with pytest.raises(HeaderError):
+        read_header(write(tmp_path, HEADER[:size]))
+
+
+def test_truncated_after_worldid_keeps_what_was_read(tmp_path):
+    header = read_header(write(tmp_path, HEADER[:HEADER.index(b'matchtype') + 4]))
+    assert header['map_id'] == 1819327465
+    assert header['match_type_id'] is None
+    assert header['players'] == []
+
+
+def test_missing_magic_raises(tmp_path):
+    with pytest.raises(HeaderError, match='introuvable'):
+        read_header(write(tmp_path, b'\x00' * 16 + HEADER[len(b'dissect'):]))
+    with pytest.raises(HeaderError):
+        read_header(write(tmp_path, b''))
+
+
+def test_zstd_header(tmp_path):
+    if rec_header.zstd_backend() != 'zstandard':
+        pytest.skip('zstandard non installe')
+    compressor = rec_header.zstandard.ZstdCompressor()
+    data = compressor.compress(HEADER + BODY)
+    assert read_header(write(tmp_path, data))['map_id'] == 1819327465
+    # Fichier tronque dans la trame suivante: l'en-tete reste lisible
+    rest = compressor.compress(BODY * (HEAD_BYTES // len(BODY) + 1))
+    assert read_header(write(tmp_path, data + rest[:len(rest) // 2]))['match_type_id'] == 8
+    # Trame de l'en-tete elle-meme tronquee
+    with pytest.raises(HeaderError):
+        read_header(write(tmp_path, data[:8]))
+
+
+def test_compressed_without_backend_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(rec_header, 'zstd_backend', lambda: None)
+    with pytest.raises(HeaderError, match='zstandard'):
+        read_header(write(tmp_path, rec_header.ZSTD_MAGIC + b'\x00' * 32))
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2024-01-29T16:45:12.118Z', '2024-01-29T16:45:12Z'),
+    ('2024-01-29 16:45:12', '2024-01-29T16:45:12Z'),
+    ('2024-01-29_16-45-12', '2024-01-29T16:45:12Z'),
+    ('1706546712', '2024-01-29T16:45:12Z'),
+    ('1706546712118', '2024-01-29T16:45:12Z'),
+    ('hier', 'hier'),
+    (None, ''),
+])
+def test_format_timestamp(value, expected):
+    assert format_timestamp(value) == expected
@@ -0,0 +1,110 @@
+"""
+Index des replays: parse_query, filtres, tri, pagination et invalidation par scan
+"""
+
+import pytest
+
+from replay_index import ReplayIndex, ReplayQueryError, parse_query
+
+MATCHES = [
+    {'folder': 'Match-1', 'map': 'Bank', 'matchCategory': 'ranked', 'date': '2024-01-01 20:00:00', 'numRounds': 9},
+    {'folder': 'Match-2', 'map': 'Villa', 'matchCategory': 'scrim', 'date': '2024-01-02 10:00:00', 'numRounds': 12},
+    {'folder': 'Match-3', 'map': 'bank', 'matchCategory': 'custom', 'date': '2024-01-02 23:59:59', 'numRounds': 7},
+    {'folder': 'Match-4', 'map': 'Chalet', 'matchCategory': 'ranked', 'date': '2024-01-03 00:00:00', 'numRounds': 12},
+    {'folder': 'Match-5', 'map': None, 'matchCategory': None, 'date': None, 'numRounds': None},
+]
+
+
+@pytest.fixture
+def index():
+    replays = ReplayIndex()
+    replays.replace('C:/MatchReplay', [dict(m) for m in MATCHES])
+    return replays
+
+
+def folders(index, offset=0, limit=None, **args):
+    page, _, _ = index.query(parse_query(args), offset, limit)
+    return [m['folder'] for m in page]
+
+
+def test_parse_query_defaults_and_normalisation():
+    query = parse_query({'map': 'Villa, bank,', 'category': 'Ranked,scrim', 'date_to': '2024-01-02T10:00'})
+    assert query['maps'] == ('bank', 'villa')
+    assert query['categories'] == ('ranked', 'scrim')
+    assert query['date_to'] == '2024-01-02 10:00'
+    assert (query['sort'], query['order']) == ('date', 'desc')
+    assert parse_query({'sort': 'map'})['order'] == 'asc'
+    assert parse_query({'min_rounds': '-3'})['min_rounds'] == 0
+
+
+@pytest.mark.parametrize('args', [
+    {'category': 'ranked,tournament'},
+    {'sort': 'kills'},
+    {'order': 'up'},
+    {'min_rounds': 'douze'},
+    {'date_from': '02/01/2024'},
+    {'date_to': '2024-1-2'},
+])
+def test_parse_query_errors(args):
+    with pytest.raises(ReplayQueryError):
+        parse_query(args)
+
+
+def test_filters(index):
+    assert folders(index, map='BANK') == ['Match-3', 'Match-1']
+    assert folders(index, category='ranked') == ['Match-4', 'Match-1']
+    assert folders(index, min_rounds='9', max_rounds='11') == ['Match-1']
+    assert folders(index, date_from='2024-01-02') == ['Match-4', 'Match-3', 'Match-2']
+
+
+def test_date_to_is_inclusive(index):
+    # Une date seule couvre toute la journee, jusqu'a 23:59:59
+    assert folders(index, date_to='2024-01-02') == ['Match-3', 'Match-2', 'Match-1', 'Match-5']
+    assert folders(index, date_from='2024-01-02', date_to='2024-01-02') == ['Match-3', 'Match-2']
+    assert folders(index, date_to='2024-01-02T10:00') == ['Match-2', 'Match-1', 'Match-5']
+
+
+def test_sorting(index):
+    assert folders(index) == ['Match-4', 'Match-3', 'Match-2', 'Match-1', 'Match-5']
+    assert folders(index, order='asc') == ['Match-5', 'Match-1', 'Match-2', 'Match-3', 'Match-4']
+    # Egalites departagees par la date decroissante
+    assert folders(index, sort='map') == ['Match-5', 'Match-3', 'Match-1', 'Match-4', 'Match-2']
+    assert folders(index, sort='rounds') == ['Match-4', 'Match-2', 'Match-1', 'Match-3', 'Match-5']
+
+
+def test_pagination_and_fields(index):
+    query = parse_query({})
+    page, total, _ = index.query(query, offset=1, limit=2)
+    assert total == 5
+    assert [m['folder'] for m in page] == ['Match-3', 'Match-2']
+    assert index.query(query, offset=4, limit=2)[0][0]['folder'] == 'Match-5'
+    assert index.query(query, offset=10, limit=2)[:2] == ([], 5)
+
+    page, _, _ = index.query(query, limit=1, fields=['folder', 'map', 'missing'])
+    assert page == [{'folder': 'Match-4', 'map': 'Chalet'}]
+    # Copies: modifier une page ne touche pas l'index
+    page[0]['map'] = 'Oregon'
+    assert index.query(query, limit=1)[0][0]['map'] == 'Chalet'
+
+
+def test_replace_invalidates_cached_queries(index):
+    query = parse_query({'map': 'villa'})
+    _, total, etag = index.query(query)
+    assert total == 1
+
+    assert not index.replace('C:/MatchReplay', [dict(m) for m in MATCHES])
+    assert index.query(query)[2] == etag
+
+    added = {'folder': 'Match-6', 'map': 'Villa', 'matchCategory': 'ranked', 'date': '2024-01-04', 'numRounds': 8}
+    assert index.replace('C:/MatchReplay', MATCHES + [added])
+    _, total, new_etag = index.query(query)
+    assert total == 2 and new_etag != etag
+
+
+def test_facets(index):
+    facets = index.facets()
+    # Tri sans casse; 'Bank' et 'bank' restent deux valeurs distinctes
+    assert [name.lower() for name in facets['maps']] == ['bank', 'bank', 'chalet', 'villa']
+    assert set(facets['maps']) == {'Bank', 'bank', 'Chalet', 'Villa'}
+    assert facets['categories'] == {'ranked': 2, 'scrim': 1, 'custom': 1}
+    assert facets['count'] == 5
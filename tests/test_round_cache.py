@@ -0,0 +1,58 @@
+"""
+Cache de rounds: cles par contenu du .rec, eviction LRU et memoire des empreintes bornee
+"""
+
+import os
+
+import round_cache
+from round_cache import RoundCache
+
+
+def write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return str(path)
+
+
+def test_key_depends_on_content_and_dissect_version(tmp_path):
+    cache = RoundCache(str(tmp_path / 'cache'))
+    tool = write(tmp_path / 'r6-dissect.exe', b'v1')
+    rec = write(tmp_path / 'a.rec', b'round a')
+
+    key = cache.key(rec, tool)
+    assert cache.key(rec, tool) == key
+    assert cache.get(key) is None
+    cache.put(key, b'{"round": 1}')
+    assert cache.get(key) == b'{"round": 1}'
+
+    write(tmp_path / 'a.rec', b'round a, rewritten')
+    rewritten = cache.key(rec, tool)
+    assert rewritten != key
+    write(tmp_path / 'r6-dissect.exe', b'v2 of the tool')
+    assert cache.key(rec, tool) != rewritten
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = RoundCache(str(tmp_path / 'cache'), max_bytes=25)
+    cache.put('old', b'x' * 10)
+    cache.put('recent', b'y' * 10)
+    os.utime(cache._path('old'), (1, 1))
+    cache._index['old'][1] = 1
+    cache.put('new', b'z' * 10)
+
+    assert cache.get('old') is None
+    assert cache.get('recent') == b'y' * 10
+    assert cache.stats()['bytes'] == 20
+
+
+def test_fingerprint_memo_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(round_cache, 'MEMO_MIN_ENTRIES', 5)
+    cache = RoundCache(str(tmp_path / 'cache'))
+    tool = write(tmp_path / 'r6-dissect.exe', b'v1')
+    recs = [write(tmp_path / f"{i}.rec", str(i).encode()) for i in range(20)]
+
+    keys = [cache.key(rec, tool) for rec in recs]
+    assert len(cache._content_hashes) <= 5
+    assert len(cache._versions) == 1
+    # Empreinte oubliee: recalculee, meme cle
+    assert cache.key(recs[0], tool) == keys[0]
@@ -0,0 +1,111 @@
+"""
+Horloge des rounds (plante, minuteur du defuseur), trades, multi-kills et clutchs
+"""
+
+from round_loader import (ATK, DEF, DEFUSER_TIMER, MULTIKILL_WINDOW, TRADE_WINDOW,
+                          build_round_record, scan_kills)
+
+ROSTER = [('a1', 0), ('a2', 0), ('a3', 0), ('d1', 1), ('d2', 1), ('d3', 1)]
+
+
+def make_round(feed, roster=ROSTER):
+    return {
+        'teams': [{'role': 'Attack', 'won': True}, {'role': 'Defense', 'won': False}],
+        'players': [{'username': name, 'teamIndex': team} for name, team in roster],
+        'matchFeedback': feed,
+        'stats': [],
+    }
+
+
+def kill(killer, victim, time_sec):
+    return {'type': {'name': 'Kill'}, 'username': killer, 'target': victim,
+            'headshot': False, 'timeInSeconds': time_sec}
+
+
+def plant(time_sec, username='a1'):
+    return {'type': {'name': 'DefuserPlantComplete'}, 'username': username, 'timeInSeconds': time_sec}
+
+
+def test_kill_plant_kill_keeps_time_across_plant():
+    # Kill a 5 s du minuteur du defuseur: 40 s apres la plante, bien apres les premiers kills
+    record = build_round_record(make_round([
+        kill('a1', 'd1', 100), kill('d2', 'a2', 99), plant(95), kill('a1', 'd2', 5),
+    ]))
+    assert record.quick_kills == [False, False, False]
+    assert record.trades == [False, False, False]
+    assert record.traded == []
+
+    # Minuteur a 40, sous le temps de la plante: 5 s apres la plante, 9 s apres la mort de a2
+    record = build_round_record(make_round([
+        kill('a1', 'd1', 100), kill('d2', 'a2', 99), plant(95), kill('a3', 'd2', 40),
+    ]))
+    assert 95 - 40 > TRADE_WINDOW
+    assert record.trades == [False, False, True]
+    assert record.traded == ['a2']
+
+
+def test_plant_above_defuser_timer_then_event_on_timer():
+    # Plante a 70 s du round, kill a 44 s du minuteur: 1 s apres la plante, pas 26
+    record = build_round_record(make_round([kill('a1', 'd1', 75), plant(70), kill('a1', 'd2', 44)]))
+    assert 70 - 44 > MULTIKILL_WINDOW
+    assert record.quick_kills == [False, True]
+
+
+def test_defuser_timer_reset_measures_time_since_plant():
+    # Plante a 25 s du round, puis minuteur du defuseur a 40: 5 s depuis la plante
+    record = build_round_record(make_round([kill('a1', 'd1', 30), plant(25), kill('a1', 'd2', 40)]))
+    assert 5 + (DEFUSER_TIMER - 40) <= MULTIKILL_WINDOW
+    assert record.quick_kills == [False, True]
+
+    # Minuteur presque ecoule: bien plus tard que le premier kill
+    record = build_round_record(make_round([kill('a1', 'd1', 30), plant(25), kill('a1', 'd2', 2)]))
+    assert record.quick_kills == [False, False]
+
+
+def test_round_countdown_after_plant_without_defuser_timer():
+    # Temps superieur a DEFUSER_TIMER apres la plante: le compte a rebours du round continue
+    record = build_round_record(make_round([
+        kill('a1', 'd1', 100), plant(95), kill('a1', 'd2', 60), kill('a1', 'd3', 40),
+    ]))
+    assert record.quick_kills == [False, False, False]
+
+
+def test_timer_jump_without_plant_is_ignored():
+    record = build_round_record(make_round([kill('a1', 'd1', 100), kill('a1', 'd2', 150)]))
+    assert record.quick_kills == [False, True]
+
+
+def test_trade_window():
+    record = build_round_record(make_round([
+        kill('d1', 'a1', 120), kill('a2', 'd1', 120 - TRADE_WINDOW),
+        kill('d2', 'a3', 90), kill('a2', 'd2', 90 - TRADE_WINDOW - 1),
+    ]))
+    assert record.trades == [False, True, False, False]
+    assert record.traded == ['a1']
+
+
+def test_clutch_detection():
+    record = build_round_record(make_round([
+        kill('d1', 'a1', 150), kill('d1', 'a2', 140), kill('a3', 'd1', 130),
+    ]))
+    # a3 seul contre 3 defenseurs, puis aucun autre clutch
+    assert record.clutches == [('a3', 3)]
+
+
+def test_clutch_both_teams_and_teamkill():
+    record = build_round_record(make_round([
+        kill('a1', 'a2', 150),  # teamkill: a1 et a3 restent
+        kill('d1', 'a3', 140),  # a1 seul contre 3
+        kill('a1', 'd1', 130), kill('a1', 'd2', 120),  # d3 seul contre a1
+    ]))
+    assert record.clutches == [('a1', 3), ('d3', 1)]
+
+
+def test_scan_kills_uses_clock_not_countdown():
+    sides = {'a1': ATK, 'd1': DEF, 'd2': DEF}
+    teams = {'a1': 0, 'd1': 1, 'd2': 1}
+    kills = [('a1', 'd1', False, 40), ('a1', 'd2', False, 44)]
+    _, quick_kills, _, _ = scan_kills(kills, [0.0, 3.0], sides, teams)
+    assert quick_kills == [False, True]
+    _, quick_kills, _, _ = scan_kills(kills, [0.0, MULTIKILL_WINDOW + 1.0], sides, teams)
+    assert quick_kills == [False, False]
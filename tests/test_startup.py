@@ -0,0 +1,22 @@
+"""
+Demarrage du serveur: importer web/app.py ne charge pas le moteur (pandas, NumPy)
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(BASE_DIR, 'src')
+WEB_DIR = os.path.join(BASE_DIR, 'web')
+DEFERRED = ['pandas', 'numpy', 'analyze_match_complete']
+
+
+def test_import_app_defers_engine():
+    # Nouvel interpreteur: les autres tests ont deja importe le moteur dans celui-ci
+    code = (f"import sys\nsys.path[:0] = [{WEB_DIR!r}, {SRC_DIR!r}]\nimport app\n"
+            f"import json\nprint(json.dumps([m for m in {DEFERRED!r} if m in sys.modules]))")
+    proc = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    assert json.loads(proc.stdout.strip().splitlines()[-1]) == []
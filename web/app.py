@@ -3,17 +3,17 @@ R6 Siege Match Stats Analyzer - Web Interface
 Server Flask pour l'interface web avec auto-detection des replays
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context
+import io
 import os
 import sys
-import subprocess
 import json
 import shutil
-from datetime import datetime
+import threading
+import time
 from pathlib import Path
 import zipfile
 import string
-import re
 
 # Determine base directory (works for both script and compiled exe)
 if getattr(sys, 'frozen', False):
@@ -31,6 +31,26 @@ else:
     TOOLS_DIR = os.path.join(BASE_DIR, 'tools')
     SRC_DIR = os.path.join(BASE_DIR, 'src')
 
+# Les modules du moteur (src/) sont importes directement
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from match_catalog import MatchCatalog, folder_signature
+from dissect_pool import get_dissect_pool, dissect_round, pool_stats
+from round_cache import RoundCache, DEFAULT_MAX_BYTES
+from match_metadata import (list_rec_files, header_match_metadata, dissect_match_metadata,
+                            scan_match_dirs)
+from aggregate_store import AggregateStore
+from report_cache import ReportCache
+from result_store import ResultStore, ExportUnavailable, EXPORT_FORMATS
+from report_index import ReportIndex
+from replay_index import ReplayIndex, ReplayQueryError, parse_query
+from event_store import EventStore, FILTERS as EVENT_FILTERS
+from replay_watcher import ReplayWatcher, DEFAULT_INTERVAL, DEFAULT_SETTLE
+from jobs import JobManager
+from metrics import get_metrics
+from pipeline import analyze_selection, aggregate_selection, load_engine
+
 app = Flask(__name__, template_folder=TEMPLATE_DIR)
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max
 app.config['BASE_DIR'] = BASE_DIR
@@ -38,7 +58,13 @@ app.config['BUNDLE_DIR'] = BUNDLE_DIR
 app.config['UPLOAD_FOLDER'] = os.path.join(BASE_DIR, 'data', 'uploads')
 app.config['MATCH_DATA_FOLDER'] = os.path.join(BASE_DIR, 'data', 'match_data')
 app.config['REPORTS_FOLDER'] = os.path.join(BASE_DIR, 'data', 'reports')
+app.config['RESULTS_FOLDER'] = os.path.join(BASE_DIR, 'data', 'results')
+app.config['ROUND_CACHE_FOLDER'] = os.path.join(BASE_DIR, 'data', 'cache', 'rounds')
+app.config['AGGREGATES_FOLDER'] = os.path.join(BASE_DIR, 'data', 'aggregates')
+app.config['REPORT_INDEX_FILE'] = os.path.join(BASE_DIR, 'data', 'cache', 'reports.json')
 app.config['CONFIG_FILE'] = os.path.join(BASE_DIR, 'data', 'config.json')
+app.config['CATALOG_FILE'] = os.path.join(BASE_DIR, 'data', 'catalog.json')
+app.config['EVENTS_DB'] = os.path.join(BASE_DIR, 'data', 'events.db')
 app.config['TOOLS_DIR'] = TOOLS_DIR
 app.config['SRC_DIR'] = SRC_DIR
 
@@ -46,6 +72,18 @@ app.config['SRC_DIR'] = SRC_DIR
 for folder in [app.config['UPLOAD_FOLDER'], app.config['MATCH_DATA_FOLDER'], app.config['REPORTS_FOLDER']]:
     os.makedirs(folder, exist_ok=True)
 
+# Catalogue des metadonnees de matchs (persiste entre les redemarrages)
+match_catalog = MatchCatalog(app.config['CATALOG_FILE'])
+
+# Jobs d'analyse en arriere-plan (POST /api/analyze)
+job_manager = JobManager(max_concurrent=2)
+
+# Intervalle des commentaires de maintien de connexion du flux SSE (secondes)
+SSE_HEARTBEAT_INTERVAL = 15
+
+# Attente maximale d'un long-polling de /reports (secondes)
+REPORTS_MAX_WAIT = 30
+
 
 def load_config():
     """Charger la configuration depuis le fichier JSON"""
@@ -129,54 +167,162 @@ def get_available_stats():
         'survival': {'label': 'Survie (temps, rounds)', 'default': True},
         'headshots': {'label': 'Headshots / HS%', 'default': True},
         'opening': {'label': 'Opening Kills/Deaths', 'default': True},
-        'multikills': {'label': 'Multi-kills', 'default': True},
+        'multikills': {'label': 'Multi-kills / 2K-Ace', 'default': True},
+        'trades': {'label': 'Trades', 'default': True},
+        'clutches': {'label': 'Clutchs (1vX)', 'default': True},
         'plants': {'label': 'Plantes / Defuses', 'default': True},
         'teamkills': {'label': 'Teamkills', 'default': False},
         'rating': {'label': 'Rating', 'default': True},
     }
 
 
-def get_rounds_to_parse(total_rounds, rounds_options):
-    """Determiner quels rounds parser selon les options"""
-    mode = rounds_options.get('mode', 'all')
-    
-    if mode == 'all':
-        return set(range(1, total_rounds + 1))
-    elif mode == 'range':
-        start = max(1, rounds_options.get('start', 1))
-        end = min(total_rounds, rounds_options.get('end', total_rounds))
-        return set(range(start, end + 1))
-    elif mode == 'custom':
-        rounds_str = rounds_options.get('rounds', '')
-        rounds_set = set()
-        
-        # Parser la chaine (ex: "1,2,3,5-8,12")
-        for part in rounds_str.split(','):
-            part = part.strip()
-            if '-' in part:
-                # Plage (ex: "5-8")
-                start, end = part.split('-')
-                start = max(1, int(start.strip()))
-                end = min(total_rounds, int(end.strip()))
-                rounds_set.update(range(start, end + 1))
-            else:
-                # Nombre unique
-                try:
-                    round_num = int(part)
-                    if 1 <= round_num <= total_rounds:
-                        rounds_set.add(round_num)
-                except ValueError:
-                    continue
-        
-        return rounds_set if rounds_set else set(range(1, total_rounds + 1))
-    
-    return set(range(1, total_rounds + 1))
+def build_engine_options(enabled_stats, players_options, sides_options):
+    """Traduire les options de l'interface en options du moteur d'analyse"""
+    players_mode = players_options.get('mode')
+    players = players_options.get('players') or []
 
+    if players_mode not in ('team', 'specific') or (players_mode == 'specific' and not players):
+        players_mode = None
 
-def get_match_metadata(match_dir):
-    """Extraire les metadonnees d'un match depuis le premier fichier .rec"""
-    rec_files = sorted([f for f in os.listdir(match_dir) if f.endswith('.rec')])
+    return load_engine().build_options(
+        stats=enabled_stats,
+        players_mode=players_mode,
+        players=players,
+        include_atk=sides_options.get('atk', True),
+        include_def=sides_options.get('def', True),
+        include_global=sides_options.get('global', True),
+    )
+
+
+_round_cache = None
+_round_cache_lock = threading.Lock()
+
+
+def get_round_cache():
+    """Cache des rounds parses (taille max: 'round_cache_max_mb' dans config.json)"""
+    global _round_cache
+    with _round_cache_lock:
+        if _round_cache is None:
+            max_mb = load_config().get('round_cache_max_mb')
+            max_bytes = int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES
+            _round_cache = RoundCache(app.config['ROUND_CACHE_FOLDER'], max_bytes)
+        return _round_cache
+
+
+_aggregate_store = None
+_aggregate_store_lock = threading.Lock()
+
+
+def get_aggregate_store():
+    """Agregats partiels par match du mode 'rapport agrege' (data/aggregates)"""
+    global _aggregate_store
+    with _aggregate_store_lock:
+        if _aggregate_store is None:
+            _aggregate_store = AggregateStore(app.config['AGGREGATES_FOLDER'])
+        return _aggregate_store
+
+
+_report_cache = None
+_report_cache_lock = threading.Lock()
+
+
+def get_report_cache():
+    """Index des rapports deja generes par entrees et options (data/cache/reports.json)"""
+    global _report_cache
+    with _report_cache_lock:
+        if _report_cache is None:
+            _report_cache = ReportCache(app.config['REPORT_INDEX_FILE'], app.config['RESULTS_FOLDER'])
+        return _report_cache
+
+
+_result_store = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """Tableaux de resultats des analyses (data/results), exports Excel/CSV/Parquet a la demande"""
+    global _result_store
+    with _result_store_lock:
+        if _result_store is None:
+            _result_store = ResultStore(app.config['RESULTS_FOLDER'], app.config['REPORTS_FOLDER'])
+        return _result_store
+
+
+_report_index = None
+_report_index_lock = threading.Lock()
+
+
+def get_report_index():
+    """Liste des rapports en memoire (/reports), mise a jour a chaque resultat ecrit ou supprime"""
+    global _report_index
+    with _report_index_lock:
+        if _report_index is None:
+            _report_index = ReportIndex(get_result_store(), app.config['REPORTS_FOLDER'])
+        return _report_index
+
+
+_replay_index = None
+_replay_index_lock = threading.Lock()
+
+
+def get_replay_index():
+    """Matchs du dernier scan de MatchReplay (/api/replays: filtres, tri, pagination)"""
+    global _replay_index
+    with _replay_index_lock:
+        if _replay_index is None:
+            _replay_index = ReplayIndex()
+        return _replay_index
+
+
+_event_store = None
+_event_store_lock = threading.Lock()
+
+
+def get_event_store():
+    """Base SQLite des kills et objectifs de tous les matchs analyses (data/events.db)"""
+    global _event_store
+    with _event_store_lock:
+        if _event_store is None:
+            _event_store = EventStore(app.config['EVENTS_DB'])
+        return _event_store
+
+
+def get_dissect_pool_for_app():
+    """Pool r6-dissect partage (taille: 'dissect_workers' dans config.json, sinon nombre de coeurs)"""
+    return get_dissect_pool(load_config().get('dissect_workers'), cache=get_round_cache())
+
+
+def collect_metrics():
+    """Valeurs lues a chaque export de /api/metrics (caches, pool r6-dissect, jobs, rapports)
 
+    Seuls les objets deja crees sont lus: un export ne charge aucun cache.
+    """
+    samples = [('jobs_active', {}, job_manager.active_count())]
+    for name, cache in (('rounds', _round_cache), ('reports', _report_cache), ('aggregates', _aggregate_store)):
+        if cache is not None:
+            stats = cache.stats()
+            samples.append(('cache_hits_total', {'cache': name}, stats['hits']))
+            samples.append(('cache_misses_total', {'cache': name}, stats['misses']))
+    if _round_cache is not None:
+        samples.append(('cache_bytes', {'cache': 'rounds'}, _round_cache.stats()['bytes']))
+    pool = pool_stats()
+    if pool is not None:
+        samples.append(('dissect_workers', {}, pool['workers']))
+        samples.append(('dissect_queue_depth', {}, pool['queued']))
+        samples.append(('dissect_running', {}, pool['running']))
+    if _report_index is not None:
+        samples.append(('reports', {}, _report_index.stats()['reports']))
+    return samples
+
+
+get_metrics().add_collector(collect_metrics)
+
+
+def submit_match_metadata(match_dir, rec_files):
+    """Lancer l'extraction des metadonnees d'un match dans le pool r6-dissect
+
+    Retourne un Future (resultat: dict ou None), ou None si l'extraction est impossible.
+    """
     if not rec_files:
         return None
 
@@ -187,67 +333,121 @@ def get_match_metadata(match_dir):
     if not os.path.exists(r6_dissect):
         return None
 
-    # Parser le premier fichier pour les metadonnees
-    first_rec = os.path.join(match_dir, rec_files[0])
-    temp_json = os.path.join(app.config['MATCH_DATA_FOLDER'], 'temp_metadata.json')
+    return get_dissect_pool_for_app().submit(dissect_match_metadata, match_catalog, r6_dissect, match_dir,
+                                             rec_files, cache=get_round_cache())
 
-    try:
-        result = subprocess.run(
-            [r6_dissect, first_rec, '-o', temp_json],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
 
-        if not os.path.exists(temp_json) or os.path.getsize(temp_json) == 0:
-            return None
+def get_match_metadata(match_dir):
+    """Extraire les metadonnees d'un match depuis le premier fichier .rec (en-tete, sinon r6-dissect)"""
+    rec_files = list_rec_files(match_dir)
+    metadata = header_match_metadata(match_catalog, match_dir, rec_files) if rec_files else None
+    if metadata is not None:
+        return metadata
+    future = submit_match_metadata(match_dir, rec_files)
+    return future.result() if future else None
+
+
+def prewarm_match(match_dir, should_stop):
+    """Surveillance: cataloguer un nouveau match et remplir le cache de ses rounds
+
+    Un seul r6-dissect a la fois, en priorite basse; s'arrete des qu'une analyse
+    interactive demarre (retourne False, le match sera repris au scan suivant).
+    """
+    r6_dissect = os.path.join(app.config['TOOLS_DIR'], 'r6-dissect.exe')
+    if not os.path.exists(r6_dissect):
+        return False
 
-        with open(temp_json, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    folder = os.path.basename(match_dir)
+    rec_files = list_rec_files(match_dir)
+    if not rec_files:
+        return True
 
-        # Nettoyer le fichier temporaire
-        os.remove(temp_json)
+    signature = folder_signature(match_dir)
+    found, _ = match_catalog.lookup(match_dir, signature)
+    if not found:
+        metadata = header_match_metadata(match_catalog, match_dir, rec_files)
+        if metadata is None:
+            metadata = dissect_match_metadata(match_catalog, r6_dissect, match_dir, rec_files,
+                                              cache=get_round_cache(), low_priority=True)
+        if metadata is not None:
+            match_catalog.store(match_dir, signature, metadata)
+            match_catalog.save()
+
+    cache = get_round_cache()
+    for rec_file in rec_files:
+        if should_stop():
+            print(f"[DEBUG] Surveillance: {folder} en pause (analyse en cours)")
+            return False
+        dissect_round(r6_dissect, os.path.join(match_dir, rec_file), timeout=60, cache=cache, low_priority=True)
+
+    print(f"[OK] Surveillance: {folder} pret ({len(rec_files)} rounds)")
+    return True
+
+
+replay_watcher = None
+_replay_watcher_lock = threading.Lock()
+
+
+def start_replay_watcher():
+    """Demarrer la surveillance du dossier MatchReplay (intervalle/delai: 'watch_interval'/'watch_settle')"""
+    global replay_watcher
+    with _replay_watcher_lock:
+        if replay_watcher is None or not replay_watcher.is_running():
+            config = load_config()
+            replay_watcher = ReplayWatcher(
+                get_replay_path=lambda: load_config().get('replay_path'),
+                process_match=prewarm_match,
+                is_known=lambda match_dir, signature: match_catalog.lookup(match_dir, signature)[0],
+                is_busy=lambda: job_manager.active_count() > 0,
+                interval=config.get('watch_interval') or DEFAULT_INTERVAL,
+                settle=config.get('watch_settle') or DEFAULT_SETTLE,
+            )
+            replay_watcher.start()
+        return replay_watcher
 
-        # Extraire les informations
-        map_name = data.get('map', {}).get('name', 'Unknown')
-        match_type_raw = data.get('matchType', {}).get('name', 'Unknown')
-        match_type_id = data.get('matchType', {}).get('id', 0)
-        timestamp = data.get('timestamp', '')
 
-        # Nombre de rounds (fichiers .rec)
-        num_rounds = len(rec_files)
+def stop_replay_watcher():
+    with _replay_watcher_lock:
+        if replay_watcher is not None:
+            replay_watcher.stop()
 
-        # Classification du type de match
-        if match_type_id == 2 or (num_rounds >= 4 and num_rounds <= 9):
-            match_category = 'ranked'
-        elif num_rounds == 12:
-            match_category = 'scrim'
-        else:
-            match_category = 'custom'
-
-        # Parser le timestamp du nom de dossier (Match-YYYY-MM-DD_HH-MM-SS-XX)
-        folder_name = os.path.basename(match_dir)
-        match_date = None
-        match_pattern = re.match(r'Match-(\d{4}-\d{2}-\d{2})_(\d{2})-(\d{2})-(\d{2})', folder_name)
-        if match_pattern:
-            date_str = match_pattern.group(1)
-            time_str = f"{match_pattern.group(2)}:{match_pattern.group(3)}:{match_pattern.group(4)}"
-            match_date = f"{date_str} {time_str}"
-
-        return {
-            'folder': folder_name,
-            'path': match_dir,
-            'map': map_name,
-            'matchType': match_type_raw,
-            'matchCategory': match_category,
-            'numRounds': num_rounds,
-            'date': match_date or timestamp,
-            'timestamp': timestamp
-        }
 
-    except Exception as e:
-        print(f"[ERROR] Erreur lors de l'extraction des metadonnees: {e}")
-        return None
+# Delai avant le prechargement du moteur: le serveur repond d'abord a la premiere page
+ENGINE_WARMUP_DELAY = 2
+
+
+def warm_up_engine(delay=ENGINE_WARMUP_DELAY):
+    """Importer le moteur (pandas, NumPy) et openpyxl en arriere-plan, apres le demarrage du serveur
+
+    La premiere analyse n'attend plus ces imports; lister les replays ne les a jamais attendus.
+    """
+    def run():
+        time.sleep(delay)
+        start = time.perf_counter()
+        try:
+            load_engine()
+            import openpyxl  # noqa: F401 (rapport Excel)
+        except Exception as e:
+            print(f"[WARNING] Prechargement du moteur impossible: {e}")
+            return
+        print(f"[DEBUG] Moteur precharge en {time.perf_counter() - start:.2f}s")
+
+    thread = threading.Thread(target=run, name='engine-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def start_background_services():
+    """Services optionnels lances avec le serveur
+
+    Surveillance si 'watch_replays' est active; prechargement du moteur sauf si
+    'preload_engine' vaut false.
+    """
+    config = load_config()
+    if config.get('preload_engine', True):
+        warm_up_engine()
+    if config.get('watch_replays'):
+        start_replay_watcher()
 
 
 @app.route('/')
@@ -281,10 +481,12 @@ def config_route():
         if not os.path.exists(replay_path):
             return jsonify({'error': 'Dossier MatchReplay introuvable dans le chemin specifie'}), 400
 
-        config = {
+        # Conserver les autres reglages (workers, cache, surveillance...)
+        config = load_config()
+        config.update({
             'game_path': game_path,
             'replay_path': replay_path
-        }
+        })
 
         if save_config(config):
             return jsonify({'success': True, 'config': config})
@@ -309,9 +511,37 @@ def stats_options():
     return jsonify(get_available_stats())
 
 
+def scan_replays(replay_path):
+    """Synchroniser le catalogue avec le dossier MatchReplay, retourne les metadonnees de tous les matchs
+
+    Seuls les dossiers nouveaux ou modifies sont re-analyses (match_metadata.scan_match_dirs).
+    """
+    dissect_available = os.path.exists(os.path.join(app.config['TOOLS_DIR'], 'r6-dissect.exe'))
+
+    try:
+        match_dirs = [os.path.join(replay_path, item) for item in os.listdir(replay_path)
+                      if item.startswith('Match-') and os.path.isdir(os.path.join(replay_path, item))]
+        matches = scan_match_dirs(match_catalog, match_dirs,
+                                  submit=submit_match_metadata if dissect_available else None)
+
+        # Oublier les dossiers supprimes du MatchReplay
+        match_catalog.prune(replay_path, match_dirs)
+    finally:
+        match_catalog.save()
+
+    return matches
+
+
 @app.route('/api/replays')
 def list_replays():
-    """Scanner le dossier MatchReplay et retourner la liste des matchs"""
+    """Lister les matchs du dossier MatchReplay, filtres et tries cote serveur
+
+    Filtres: map, category (listes separees par des virgules), date_from, date_to
+    (AAAA-MM-JJ), min_rounds, max_rounds; tri: sort (date, map, rounds) et order.
+    Pagination: offset, limit (tous les matchs si absent); fields limite les cles
+    retournees. Le dossier est re-scanne pour une premiere page (offset 0) sauf avec
+    refresh=0: les pages suivantes et les changements de filtres sont servis par l'index.
+    """
     config = load_config()
 
     if not config.get('replay_path'):
@@ -322,35 +552,82 @@ def list_replays():
     if not os.path.exists(replay_path):
         return jsonify({'error': 'Dossier MatchReplay introuvable'}), 404
 
-    matches = []
-
-    # Scanner tous les dossiers Match-*
     try:
-        for item in os.listdir(replay_path):
-            item_path = os.path.join(replay_path, item)
-
-            if os.path.isdir(item_path) and item.startswith('Match-'):
-                metadata = get_match_metadata(item_path)
-
-                if metadata:
-                    matches.append(metadata)
-    except Exception as e:
-        print(f"[ERROR] Erreur lors du scan: {e}")
-        return jsonify({'error': f'Erreur lors du scan: {str(e)}'}), 500
+        query = parse_query(request.args)
+        limit = request.args.get('limit')
+        limit = max(int(limit), 0) if limit not in (None, '') else None
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ReplayQueryError as e:
+        return jsonify({'error': str(e)}), 400
+    except ValueError:
+        return jsonify({'error': 'Parametre numerique invalide'}), 400
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    refresh = request.args.get('refresh', '1' if offset == 0 else '0') not in ('0', 'false')
+
+    index = get_replay_index()
+    if refresh or index.replay_path != replay_path:
+        try:
+            index.replace(replay_path, scan_replays(replay_path))
+        except Exception as e:
+            print(f"[ERROR] Erreur lors du scan: {e}")
+            return jsonify({'error': f'Erreur lors du scan: {str(e)}'}), 500
 
-    # Trier par date (plus recent en premier)
-    matches.sort(key=lambda x: x.get('date', ''), reverse=True)
+    matches, total, version = index.query(query, offset, limit, fields or None)
+    facets = index.facets()
+    next_offset = offset + len(matches)
 
-    return jsonify({
+    response = jsonify({
         'matches': matches,
-        'total': len(matches),
+        'total': total,
+        'count': facets['count'],
+        'offset': offset,
+        'limit': limit,
+        'next_offset': next_offset if next_offset < total else None,
+        'maps': facets['maps'],
+        'categories': facets['categories'],
+        'version': version,
         'replay_path': replay_path
     })
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/api/replays/rebuild', methods=['POST'])
+def rebuild_replays_catalog():
+    """Vider le catalogue des metadonnees et re-scanner tous les matchs"""
+    match_catalog.clear()
+    match_catalog.save()
+    return list_replays()
+
+
+@app.route('/api/watcher', methods=['GET', 'POST'])
+def watcher_route():
+    """GET: etat de la surveillance des replays
+       POST {'enabled': bool}: activer/desactiver (persiste dans la config)"""
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        enabled = bool(data.get('enabled'))
+        config = load_config()
+        config['watch_replays'] = enabled
+        if not save_config(config):
+            return jsonify({'error': 'Erreur lors de la sauvegarde'}), 500
+        if enabled:
+            start_replay_watcher()
+        else:
+            stop_replay_watcher()
+
+    status = replay_watcher.status() if replay_watcher is not None else {'running': False}
+    status['enabled'] = bool(load_config().get('watch_replays'))
+    return jsonify(status)
 
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_matches():
-    """Analyser les matchs selectionnes"""
+    """Lancer l'analyse des matchs selectionnes en arriere-plan
+
+    Retourne immediatement l'identifiant du job (202); la progression se suit
+    sur /api/jobs/<id> (polling) ou /api/jobs/<id>/events (Server-Sent Events).
+    """
     try:
         data = request.get_json()
         selected_matches = data.get('matches', [])
@@ -358,6 +635,9 @@ def analyze_matches():
         rounds_options = data.get('rounds', {'mode': 'all'})
         players_options = data.get('players', {'mode': 'all'})
         sides_options = data.get('sides', {'atk': True, 'def': True, 'global': True})
+        aggregate = bool(data.get('aggregate', False))
+        # force: regenerer le rapport meme si une analyse identique existe deja
+        force = bool(data.get('force', False))
 
         if not selected_matches:
             return jsonify({'error': 'Aucun match selectionne'}), 400
@@ -368,145 +648,52 @@ def analyze_matches():
             if stats_options.get(stat_key, stat_info['default']):
                 enabled_stats.append(stat_key)
 
+        analysis_options = build_engine_options(enabled_stats, players_options, sides_options)
+
         print(f"\n[DEBUG] Analyse de {len(selected_matches)} match(s)")
         print(f"[DEBUG] Stats activees: {enabled_stats}")
         print(f"[DEBUG] Options rounds: {rounds_options}")
         print(f"[DEBUG] Options players: {players_options}")
         print(f"[DEBUG] Options sides: {sides_options}")
+        print(f"[DEBUG] Rapport agrege: {aggregate}")
+        if force:
+            print("[DEBUG] Regeneration forcee (cache de rapports ignore)")
 
-        reports = []
-
-        for match_info in selected_matches:
-            match_path = match_info.get('path')
-
-            if not match_path or not os.path.exists(match_path):
-                continue
-
-            print(f"[DEBUG] Traitement de: {match_info.get('folder')}")
-
-            # Nettoyer les anciens JSON
-            for file in os.listdir(app.config['MATCH_DATA_FOLDER']):
-                filepath = os.path.join(app.config['MATCH_DATA_FOLDER'], file)
-                if file.endswith('.json'):
-                    os.unlink(filepath)
-
-            # Chemin vers r6-dissect.exe
-            tools_dir = app.config['TOOLS_DIR']
-            r6_dissect = os.path.join(tools_dir, 'r6-dissect.exe')
-
-            if not os.path.exists(r6_dissect):
-                return jsonify({'error': 'r6-dissect.exe introuvable'}), 500
-
-            # Parser tous les fichiers .rec du match
-            rec_files = sorted([f for f in os.listdir(match_path) if f.endswith('.rec')])
-
-            # Determiner quels rounds parser selon les options
-            rounds_to_parse = get_rounds_to_parse(len(rec_files), rounds_options)
-
-            parsed_files = []
-            for idx, rec_file in enumerate(rec_files, 1):
-                # Ne parser que les rounds selectionnes
-                if idx not in rounds_to_parse:
-                    continue
-
-                rec_path = os.path.join(match_path, rec_file)
-                json_filename = f"round{idx:02d}.json"
-                json_path = os.path.join(app.config['MATCH_DATA_FOLDER'], json_filename)
-
-                result = subprocess.run(
-                    [r6_dissect, rec_path, '-o', json_path],
-                    capture_output=True,
-                    text=True
-                )
-
-                if os.path.exists(json_path) and os.path.getsize(json_path) > 0:
-                    parsed_files.append(json_filename)
-
-            if not parsed_files:
-                continue
-
-            # Generer le nom de sortie
-            # Format: Map_DateGame_Type_DateAnalyse.xlsx
-            map_name = match_info.get('map', 'Unknown').replace(' ', '-')
-            match_category = match_info.get('matchCategory', 'custom').capitalize()
-
-            # Date du match
-            match_date = match_info.get('date', '')
-            if match_date:
-                try:
-                    dt = datetime.strptime(match_date, '%Y-%m-%d %H:%M:%S')
-                    date_game = dt.strftime('%Y-%m-%d')
-                except:
-                    date_game = match_date.split(' ')[0] if ' ' in match_date else match_date[:10]
-            else:
-                date_game = 'Unknown'
-
-            # Date d'analyse
-            date_analyse = datetime.now().strftime('%Y-%m-%d_%H-%M')
-
-            output_name = f"{map_name}_{date_game}_{match_category}_{date_analyse}.xlsx"
-
-            # Executer le script d'analyse Python
-            src_dir = app.config['SRC_DIR']
-            analyze_script = os.path.join(src_dir, 'analyze_match_complete.py')
-
-            # Changer temporairement le repertoire de travail
-            original_dir = os.getcwd()
-            project_root = app.config['BASE_DIR']
-            os.chdir(project_root)
-
-            # Construire la commande avec les options de stats
-            cmd = [sys.executable, analyze_script, '--output-name', output_name]
-            if enabled_stats:
-                cmd.extend(['--stats', ','.join(enabled_stats)])
-            
-            # Ajouter les options de filtrage
-            if players_options.get('mode') != 'all':
-                if players_options.get('mode') == 'team':
-                    cmd.extend(['--players-mode', 'team'])
-                elif players_options.get('mode') == 'specific' and players_options.get('players'):
-                    cmd.extend(['--players', ','.join(players_options['players'])])
-            
-            if not sides_options.get('atk', True):
-                cmd.append('--no-atk')
-            if not sides_options.get('def', True):
-                cmd.append('--no-def')
-            if not sides_options.get('global', True):
-                cmd.append('--no-global')
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True
-            )
-
-            os.chdir(original_dir)
-
-            if result.returncode != 0:
-                print(f"[ERROR] Erreur analyse: {result.stderr}")
-                continue
-
-            # Deplacer le rapport vers le dossier reports
-            source_path = os.path.join(project_root, output_name)
-
-            if os.path.exists(source_path):
-                dest_path = os.path.join(app.config['REPORTS_FOLDER'], output_name)
-                shutil.move(source_path, dest_path)
+        # Chemin vers r6-dissect.exe
+        tools_dir = app.config['TOOLS_DIR']
+        r6_dissect = os.path.join(tools_dir, 'r6-dissect.exe')
 
-                reports.append({
-                    'filename': output_name,
-                    'match': match_info.get('folder'),
-                    'rounds': len(parsed_files)
-                })
+        if not os.path.exists(r6_dissect):
+            return jsonify({'error': 'r6-dissect.exe introuvable'}), 500
 
-        if not reports:
-            return jsonify({'error': 'Aucun match analyse avec succes'}), 500
+        job_args = (
+            selected_matches,
+            rounds_options,
+            analysis_options,
+            r6_dissect,
+            get_dissect_pool_for_app(),
+            get_result_store(),
+        )
+        report_cache = None if force else get_report_cache()
+        # Debug: conserver le JSON de chaque round dans data/match_data/<match>/
+        keep_root = app.config['MATCH_DATA_FOLDER'] if load_config().get('keep_round_json') else None
+        if aggregate:
+            # Un seul rapport pour tous les matchs (totaux + detail par match)
+            job = job_manager.submit(aggregate_selection, *job_args, get_aggregate_store(),
+                                     events=get_event_store(), report_cache=report_cache,
+                                     keep_root=keep_root, kind='aggregate')
+        else:
+            job = job_manager.submit(analyze_selection, *job_args, events=get_event_store(),
+                                     report_cache=report_cache, keep_root=keep_root)
+        print(f"[DEBUG] Job d'analyse {job.id} lance")
 
         return jsonify({
             'success': True,
-            'reports': reports,
-            'total': len(reports)
-        })
+            'job_id': job.id,
+            'status_url': f'/api/jobs/{job.id}',
+            'events_url': f'/api/jobs/{job.id}/events',
+            'cancel_url': f'/api/jobs/{job.id}/cancel'
+        }), 202
 
     except Exception as e:
         import traceback
@@ -515,6 +702,99 @@ def analyze_matches():
         return jsonify({'error': f'Erreur inattendue: {str(e)}'}), 500
 
 
+@app.route('/api/jobs')
+def list_jobs():
+    """Lister les jobs en cours et les derniers termines"""
+    return jsonify({'jobs': job_manager.list()})
+
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Etat et progression d'un job (polling)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job introuvable'}), 404
+    return jsonify(job.snapshot())
+
+
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    """Progression d'un job en Server-Sent Events
+
+    Reprend apres le dernier evenement recu si le navigateur envoie Last-Event-ID
+    (reconnexion automatique d'EventSource). Le flux se termine avec le job.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job introuvable'}), 404
+
+    try:
+        last_seq = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+    except ValueError:
+        last_seq = 0
+
+    def stream():
+        seq = last_seq
+        while True:
+            events = job.events_since(seq, timeout=SSE_HEARTBEAT_INTERVAL)
+            for event_type, data in events:
+                seq = data['seq']
+                yield f"id: {seq}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+            if job.is_finished() and not job.events_since(seq):
+                break
+            if not events:
+                # Commentaire SSE: garde la connexion ouverte a travers les proxys
+                yield ": heartbeat\n\n"
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Demander l'annulation d'un job (les rounds non demarres ne sont pas parses)"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job introuvable'}), 404
+    return jsonify({'success': True, 'status': job.status})
+
+
+@app.route('/api/events')
+def query_events():
+    """Kills, plantes et diffuses de tous les matchs analyses
+
+    Filtres en parametres: player, target, type, side, map, round, opening, headshot,
+    match, match_type; pagination: limit (max 10000), offset.
+    Ex: /api/events?player=X&map=Villa&type=Kill&opening=1
+    """
+    filters = {name: request.args.get(name) for name in EVENT_FILTERS if request.args.get(name) not in (None, '')}
+    try:
+        for name in ('round', 'opening', 'headshot'):
+            if name in filters:
+                filters[name] = int(filters[name])
+        limit = min(int(request.args.get('limit', 1000)), 10000)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'Parametre numerique invalide'}), 400
+
+    events = get_event_store().query_events(limit=limit, offset=offset, **filters)
+    return jsonify({'events': events, 'count': len(events), 'limit': limit, 'offset': offset})
+
+
+@app.route('/api/events/matches')
+def event_matches():
+    """Matchs presents dans la base d'evenements"""
+    store = get_event_store()
+    stats = store.stats()
+    return jsonify({'matches': store.list_matches(), 'total_matches': stats['matches'], 'total_events': stats['events']})
+
+
+@app.route('/api/metrics')
+def export_metrics():
+    """Compteurs et temps par etape du pipeline au format texte de Prometheus"""
+    return Response(get_metrics().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.route('/upload', methods=['POST'])
 def upload_files():
     """Upload des fichiers .rec via drag & drop (methode legacy)"""
@@ -561,12 +841,6 @@ def analyze_match():
     """Analyser les fichiers .rec uploades (methode legacy)"""
     try:
         print("\n[DEBUG] Debut de l'analyse")
-        # Nettoyer les anciens JSON
-        for file in os.listdir(app.config['MATCH_DATA_FOLDER']):
-            filepath = os.path.join(app.config['MATCH_DATA_FOLDER'], file)
-            if file.endswith('.json'):
-                os.unlink(filepath)
-        print(f"[DEBUG] Anciens JSON nettoyes")
 
         # Chemin vers r6-dissect.exe
         tools_dir = app.config['TOOLS_DIR']
@@ -577,83 +851,32 @@ def analyze_match():
             print("[ERROR] r6-dissect.exe introuvable!")
             return jsonify({'error': 'r6-dissect.exe introuvable'}), 500
 
-        # Parser tous les fichiers .rec
-        rec_files = sorted([f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.endswith('.rec')])
+        upload_dir = app.config['UPLOAD_FOLDER']
+        rec_files = list_rec_files(upload_dir)
         print(f"[DEBUG] Fichiers .rec trouves: {len(rec_files)}")
 
         if not rec_files:
             return jsonify({'error': 'Aucun fichier .rec a analyser'}), 400
 
-        parsed_files = []
-        for idx, rec_file in enumerate(rec_files, 1):
-            rec_path = os.path.join(app.config['UPLOAD_FOLDER'], rec_file)
-            json_filename = f"round{idx:02d}.json"
-            json_path = os.path.join(app.config['MATCH_DATA_FOLDER'], json_filename)
-
-            # Parser avec r6-dissect
-            result = subprocess.run(
-                [r6_dissect, rec_path, '-o', json_path],
-                capture_output=True,
-                text=True
-            )
-
-            # Verifier que le JSON est valide (taille > 0)
-            if os.path.exists(json_path) and os.path.getsize(json_path) > 0:
-                parsed_files.append(json_filename)
-
-        if not parsed_files:
-            print("[ERROR] Aucun fichier parse avec succes")
-            return jsonify({'error': 'Aucun fichier parse avec succes'}), 500
-
-        print(f"[DEBUG] {len(parsed_files)} fichiers parses avec succes")
-
-        # Executer le script d'analyse Python
-        src_dir = app.config['SRC_DIR']
-        analyze_script = os.path.join(src_dir, 'analyze_match_complete.py')
-        print(f"[DEBUG] Script d'analyse: {analyze_script}")
-
-        # Changer temporairement le repertoire de travail
-        original_dir = os.getcwd()
-        project_root = app.config['BASE_DIR']
-        os.chdir(project_root)
-        print(f"[DEBUG] Repertoire de travail change vers: {project_root}")
-
-        result = subprocess.run(
-            [sys.executable, analyze_script],
-            capture_output=True,
-            text=True
-        )
-
-        os.chdir(original_dir)
-        print(f"[DEBUG] Code retour: {result.returncode}")
-
-        if result.returncode != 0:
-            print(f"[ERROR] Stderr: {result.stderr}")
-            print(f"[ERROR] Stdout: {result.stdout}")
-            return jsonify({
-                'error': 'Erreur lors de l\'analyse',
-                'details': result.stderr
-            }), 500
-
-        # Trouver le fichier Excel genere (le plus recent)
-        project_root = app.config['BASE_DIR']
-        excel_files = [f for f in os.listdir(project_root) if f.startswith('Match_Stats_Complete_') and f.endswith('.xlsx')]
-
-        if not excel_files:
-            return jsonify({'error': 'Aucun rapport Excel genere'}), 500
-
-        # Prendre le plus recent
-        latest_excel = sorted(excel_files)[-1]
-        source_path = os.path.join(project_root, latest_excel)
-        dest_path = os.path.join(app.config['REPORTS_FOLDER'], latest_excel)
+        # Les uploads sont analyses comme un match: meme chemin que /api/analyze (rounds lus
+        # en memoire, resultat enregistre, rapport Excel ecrit au premier telechargement)
+        match_info = (header_match_metadata(match_catalog, upload_dir, rec_files, allow_unknown=True)
+                      or {'folder': os.path.basename(upload_dir), 'path': upload_dir, 'map': 'Upload'})
+        try:
+            outcome = analyze_selection(None, [match_info], {'mode': 'all'}, None, r6_dissect,
+                                        get_dissect_pool_for_app(), get_result_store())
+        except RuntimeError as e:
+            print(f"[ERROR] {e}")
+            return jsonify({'error': str(e)}), 500
 
-        # Copier vers le dossier reports
-        shutil.copy2(source_path, dest_path)
+        report = outcome['reports'][0]
+        get_report_index().update(report['result'])
+        print(f"[DEBUG] {report['rounds']} fichiers parses avec succes")
 
         return jsonify({
             'success': True,
-            'report': latest_excel,
-            'parsed_rounds': len(parsed_files)
+            'report': report['filename'],
+            'parsed_rounds': report['rounds']
         })
 
     except Exception as e:
@@ -668,34 +891,114 @@ def analyze_match():
 
 @app.route('/download/<filename>')
 def download_report(filename):
-    """Telecharger le rapport Excel genere"""
+    """Telecharger le rapport Excel (ecrit au premier telechargement a partir du resultat)"""
     filepath = os.path.join(app.config['REPORTS_FOLDER'], filename)
 
     if not os.path.exists(filepath):
-        return jsonify({'error': 'Fichier introuvable'}), 404
+        name, ext = os.path.splitext(filename)
+        results = get_result_store()
+        if ext != '.xlsx' or not results.exists(name):
+            return jsonify({'error': 'Fichier introuvable'}), 404
+        try:
+            filepath = results.excel(name)
+        except Exception as e:
+            print(f"[ERROR] Generation du rapport Excel {filename}: {e}")
+            return jsonify({'error': f'Erreur lors de la generation du rapport: {str(e)}'}), 500
+        if filepath is None:
+            return jsonify({'error': 'Fichier introuvable'}), 404
 
     return send_file(filepath, as_attachment=True)
 
 
-@app.route('/reports')
-def list_reports():
-    """Lister tous les rapports disponibles"""
-    reports = []
+@app.route('/api/results')
+def list_results():
+    """Resultats d'analyse disponibles (tableaux consultables sans Excel)"""
+    return jsonify({'results': get_result_store().list()})
+
+
+@app.route('/api/results/<name>')
+def get_result(name):
+    """Tableau de resultats d'une analyse: colonnes, lignes et detail par match (agregat)"""
+    results = get_result_store()
+    data = results.load(name) if results.exists(name) else None
+    if data is None:
+        return jsonify({'error': 'Resultat introuvable'}), 404
+    return jsonify({
+        **results.summary(name, data),
+        'meta': data.get('meta', {}),
+        'columns': data['table']['columns'],
+        'rows': data['table']['data'],
+        'breakdown': [{'name': entry['name'], 'columns': entry['table']['columns'], 'rows': entry['table']['data']}
+                      for entry in data.get('breakdown', [])],
+    })
+
 
-    if os.path.exists(app.config['REPORTS_FOLDER']):
-        for filename in os.listdir(app.config['REPORTS_FOLDER']):
-            if filename.endswith('.xlsx'):
-                filepath = os.path.join(app.config['REPORTS_FOLDER'], filename)
-                reports.append({
-                    'filename': filename,
-                    'size': os.path.getsize(filepath),
-                    'created': datetime.fromtimestamp(os.path.getctime(filepath)).strftime('%Y-%m-%d %H:%M:%S')
-                })
+@app.route('/api/results/<name>/export/<fmt>')
+def export_result(name, fmt):
+    """Exporter un resultat en xlsx, csv ou parquet (?table=<match> pour le detail d'un agregat)"""
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'Format inconnu (formats: {", ".join(EXPORT_FORMATS)})'}), 400
+    results = get_result_store()
+    if not results.exists(name):
+        return jsonify({'error': 'Resultat introuvable'}), 404
+    if fmt == 'xlsx':
+        return download_report(f"{name}.xlsx")
 
-    # Trier par date de creation (plus recent en premier)
-    reports.sort(key=lambda x: x['created'], reverse=True)
+    try:
+        exported = results.export(name, fmt, request.args.get('table'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except ExportUnavailable as e:
+        print(f"[WARNING] {e}")
+        return jsonify({'error': str(e)}), 501
+    if exported is None:
+        return jsonify({'error': 'Resultat introuvable'}), 404
+
+    content, mimetype, download_name = exported
+    return send_file(io.BytesIO(content), mimetype=mimetype, as_attachment=True, download_name=download_name)
+
+
+@app.route('/api/results/<name>', methods=['DELETE'])
+def delete_result(name):
+    """Supprimer un resultat et son rapport Excel (ou un ancien rapport Excel seul)"""
+    try:
+        removed = get_result_store().delete(name)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not removed:
+        return jsonify({'error': 'Resultat introuvable'}), 404
+    return jsonify({'success': True, 'name': name})
 
-    return jsonify({'reports': reports})
+
+@app.route('/reports')
+def list_reports():
+    """Lister les rapports disponibles (resultats d'analyse et anciens rapports Excel)
+
+    Servi depuis l'index en memoire, du plus recent au plus ancien. Pagination:
+    limit, offset. Requete conditionnelle: If-None-Match -> 304 si rien n'a change;
+    avec wait=<secondes> (max 30), la reponse attend un changement (long-polling).
+    """
+    try:
+        limit = request.args.get('limit')
+        limit = max(int(limit), 0) if limit not in (None, '') else None
+        offset = max(int(request.args.get('offset', 0)), 0)
+        wait = min(max(float(request.args.get('wait', 0)), 0), REPORTS_MAX_WAIT)
+    except ValueError:
+        return jsonify({'error': 'Parametre numerique invalide'}), 400
+
+    index = get_report_index()
+    index.check(force=True)
+    etag = index.etag()
+    if wait and request.if_none_match.contains(etag):
+        etag = index.wait(etag, wait)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        reports, total, etag = index.page(offset, limit)
+        response = jsonify({'reports': reports, 'total': total, 'offset': offset, 'limit': limit})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 if __name__ == '__main__':
@@ -709,5 +1012,7 @@ if __name__ == '__main__':
     print("Appuyez sur Ctrl+C pour arreter le serveur")
     print("=" * 60)
 
+    start_background_services()
+
     # Note: use_reloader=False to prevent server restart when files change during analysis
     app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False)